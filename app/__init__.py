@@ -3,7 +3,7 @@ from flask import Flask
 from dotenv import load_dotenv
 
 # Importa a instância 'db' do nosso novo arquivo
-from .database import db
+from .database import binds_das_replicas, db, opcoes_do_engine
 
 # 1. Importa a classe Migrate
 from flask_migrate import Migrate
@@ -22,6 +22,58 @@ def create_app():
     # Configura o SQLAlchemy a partir do arquivo .env
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Pool de conexões (tamanho, overflow, timeout, recycle e pre-ping) via .env
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opcoes_do_engine(
+        app.config['SQLALCHEMY_DATABASE_URI'])
+    # Réplicas de leitura (URLs separadas por vírgula): as rotas GET de
+    # treinamentos e alunos leem delas em round-robin. Depois de uma escrita
+    # o cliente lê do primário por REPLICA_LEITURA_PROPRIA_SEGUNDOS.
+    app.config['SQLALCHEMY_BINDS'] = binds_das_replicas(os.getenv('DATABASE_REPLICA_URLS'))
+    app.config['REPLICA_VERIFICACAO_SEGUNDOS'] = float(os.getenv('REPLICA_VERIFICACAO_SEGUNDOS', 5))
+    app.config['REPLICA_LEITURA_PROPRIA_SEGUNDOS'] = int(
+        os.getenv('REPLICA_LEITURA_PROPRIA_SEGUNDOS', 5))
+
+    # Métricas por rota em /metrics (latência, tempo de banco e SQL por requisição)
+    app.config['METRICAS_HABILITADAS'] = os.getenv(
+        'METRICAS_HABILITADAS', 'true').lower() in ('1', 'true', 'sim', 'yes', 'on')
+
+    # Log de consultas lentas das rotas (0 desliga) e tamanho do buffer circular
+    app.config['CONSULTA_LENTA_MS'] = float(os.getenv('CONSULTA_LENTA_MS', 200))
+    app.config['CONSULTAS_LENTAS_MAXIMO'] = int(os.getenv('CONSULTAS_LENTAS_MAXIMO', 200))
+
+    # Cache em memória do catálogo: tamanho máximo (itens) e TTL (segundos)
+    app.config['CATALOGO_CACHE_TAMANHO'] = int(os.getenv('CATALOGO_CACHE_TAMANHO', 256))
+    app.config['CATALOGO_CACHE_TTL'] = float(os.getenv('CATALOGO_CACHE_TTL', 60))
+
+    # Jobs em segundo plano: threads por worker (0 executa na requisição) e
+    # diretório onde ficam os arquivos de resultado
+    app.config['JOBS_WORKERS'] = int(os.getenv('JOBS_WORKERS', 2))
+    app.config['JOBS_DIRETORIO'] = os.getenv(
+        'JOBS_DIRETORIO', os.path.join(app.instance_path, 'jobs'))
+
+    # Serialização JSON com orjson (se instalado); 'false' usa o json da
+    # biblioteca padrão. Nos dois casos as datas saem em ISO 8601.
+    app.config['JSON_RAPIDO'] = os.getenv(
+        'JSON_RAPIDO', 'true').lower() in ('1', 'true', 'sim', 'yes', 'on')
+    from .utils.serializacao import provedor_json
+    app.json = provedor_json(app.config['JSON_RAPIDO'])(app)
+
+    # Compressão das respostas (br se o pacote brotli estiver instalado, ou
+    # gzip): tamanho mínimo do corpo e nível de compressão de cada formato
+    app.config['COMPRESSAO_HABILITADA'] = os.getenv(
+        'COMPRESSAO_HABILITADA', 'true').lower() in ('1', 'true', 'sim', 'yes', 'on')
+    app.config['COMPRESSAO_MINIMO_BYTES'] = int(os.getenv('COMPRESSAO_MINIMO_BYTES', 1024))
+    app.config['COMPRESSAO_NIVEL'] = int(os.getenv('COMPRESSAO_NIVEL', 6))
+    app.config['COMPRESSAO_NIVEL_BROTLI'] = int(os.getenv('COMPRESSAO_NIVEL_BROTLI', 4))
+
+    # Idempotency-Key nos POST: por quanto tempo a resposta fica guardada e
+    # quanto uma repetição espera pela requisição original em andamento
+    app.config['IDEMPOTENCIA_TTL_HORAS'] = float(os.getenv('IDEMPOTENCIA_TTL_HORAS', 24))
+    app.config['IDEMPOTENCIA_ESPERA_SEGUNDOS'] = float(os.getenv('IDEMPOTENCIA_ESPERA_SEGUNDOS', 10))
+
+    # Modo assíncrono (asgi.py): threads que atendem as rotas sem versão
+    # asyncio, encaminhadas ao app Flask
+    app.config['ASGI_THREADS_SINCRONAS'] = int(os.getenv('ASGI_THREADS_SINCRONAS', 10))
 
     # Inicializa o SQLAlchemy com a aplicação Flask
     db.init_app(app)
@@ -33,13 +85,61 @@ def create_app():
     # --- Importação dos Modelos ---
     # É fundamental importar os modelos aqui para que o Alembic (motor do Flask-Migrate)
     # saiba da existência das tabelas Aluno, Treinamento e Turma.
-    from .models import alunos, treinamentos, turmas
+    from .models import alunos, idempotencia, jobs, relatorios, treinamentos, turmas, versoes
+
+    # A busca por instrutor adiciona à tabela 'treinamentos' a estrutura de
+    # busca (FTS5 no SQLite, índice pg_trgm no PostgreSQL) criada pelo create_all.
+    from .services import busca_instrutor
 
     # Importa e registra os Blueprints
     from .routes.treinamentos import treinamentos_bp
     from .routes.alunos import alunos_bp
+    from .routes.interno import interno_bp
+    from .routes.relatorios import relatorios_bp
+    from .routes.jobs import jobs_bp
+    from .routes.metricas import metricas_bp
 
     app.register_blueprint(treinamentos_bp, url_prefix='/treinamentos')
     app.register_blueprint(alunos_bp, url_prefix='/alunos')
+    app.register_blueprint(interno_bp, url_prefix='/interno')
+    app.register_blueprint(relatorios_bp, url_prefix='/relatorios')
+    app.register_blueprint(jobs_bp, url_prefix='/jobs')
+
+    # Listener do orçamento de SQL por rota (verificado só em debug/teste)
+    from .utils.consultas import instalar_orcamento_de_consultas
+    instalar_orcamento_de_consultas(app)
+
+    # Registrado antes das métricas para a verificação de saúde das réplicas
+    # não entrar na contagem de SQL da rota
+    from .utils.replicas import instalar_replicas
+    instalar_replicas(app)
+
+    # A instrumentação por requisição alimenta tanto o /metrics quanto o
+    # log de consultas lentas
+    if app.config['METRICAS_HABILITADAS'] or app.config['CONSULTA_LENTA_MS'] > 0:
+        from .utils.metricas import instalar_metricas
+        instalar_metricas(app)
+    if app.config['METRICAS_HABILITADAS']:
+        app.register_blueprint(metricas_bp)
+
+    if app.config['COMPRESSAO_HABILITADA']:
+        from .utils.compressao import instalar_compressao
+        instalar_compressao(app)
+
+    from .utils.consultas_lentas import consultas_lentas
+    consultas_lentas.configurar(
+        app.config['CONSULTA_LENTA_MS'] if app.config['CONSULTA_LENTA_MS'] > 0 else float('inf'),
+        app.config['CONSULTAS_LENTAS_MAXIMO'])
+
+    from .utils.cache import cache_catalogo
+    cache_catalogo.configurar(app.config['CATALOGO_CACHE_TAMANHO'],
+                              app.config['CATALOGO_CACHE_TTL'])
+
+    # Comando 'flask seed' (dados sintéticos para testes de volume)
+    from .comandos import seed
+    app.cli.add_command(seed)
+
+    from .services.jobs import executor_de_jobs
+    executor_de_jobs.configurar(app, app.config['JOBS_WORKERS'], app.config['JOBS_DIRETORIO'])
 
     return app
@@ -0,0 +1,186 @@
+"""
+Modo assíncrono (ASGI) da API.
+
+As rotas mais acessadas (ver app/assincrono/rotas.py) rodam no event loop
+com o SQLAlchemy asyncio (asyncpg / aiosqlite): enquanto uma espera o banco,
+o worker atende as outras. Todas as demais rotas continuam no app Flask, que
+roda em um pool de threads (a2wsgi), então a API exposta é a mesma do modo
+síncrono. Os modelos são os de app/models, compartilhados pelos dois modos.
+
+As rotas asyncio entram no /metrics, no log de consultas lentas e no
+orçamento de SQL com o mesmo endpoint das rotas do Flask. Elas leem sempre
+do primário: as réplicas (DATABASE_REPLICA_URLS) só atendem as rotas
+encaminhadas ao app Flask.
+
+Uso: uvicorn asgi:app --workers 4
+"""
+import logging
+import time
+
+from a2wsgi import WSGIMiddleware
+from werkzeug.datastructures import Headers
+from werkzeug.exceptions import HTTPException, InternalServerError
+from werkzeug.http import remove_entity_headers
+from werkzeug.sansio.request import Request as RequisicaoWerkzeug
+
+from app import create_app
+from app.assincrono.banco import criar_engine_assincrono, fabrica_de_sessoes
+from app.assincrono.rotas import ROTAS
+from app.database import encerrar_contagem_sql, iniciar_contagem_sql, instalar_contadores_sql
+from app.utils.compressao import comprimir
+from app.utils.consultas import instalar_orcamento_de_consultas
+from app.utils.consultas_lentas import consultas_lentas
+from app.utils.metricas import metricas
+from app.utils.replicas import lembrar_escrita, roteador_de_replicas
+
+logger = logging.getLogger(__name__)
+
+
+def _requisicao(scope):
+    """Requisição Werkzeug (sem I/O) montada do escopo ASGI, com args, Accept etc."""
+    headers = Headers([(nome.decode('latin1'), valor.decode('latin1'))
+                       for nome, valor in scope['headers']])
+    cliente = scope.get('client') or (None,)
+    return RequisicaoWerkzeug(scope['method'], scope.get('scheme', 'http'), scope.get('server'),
+                              scope.get('root_path', ''), scope['path'], scope['query_string'],
+                              headers, cliente[0])
+
+
+class _Corpo:
+    """
+    Corpo da requisição, lido só se a rota precisar. Se a requisição acabar
+    encaminhada ao app Flask depois da leitura, o corpo é entregue de novo.
+    """
+
+    def __init__(self, receive):
+        self._receive = receive
+        self._dados = None
+
+    async def ler(self):
+        if self._dados is None:
+            partes = []
+            while True:
+                mensagem = await self._receive()
+                partes.append(mensagem.get('body', b''))
+                if not mensagem.get('more_body', False):
+                    break
+            self._dados = b''.join(partes)
+        return self._dados
+
+    def receive(self):
+        """O 'receive' a entregar ao app Flask."""
+        if self._dados is None:
+            return self._receive
+        entregue = False
+
+        async def repetir():
+            nonlocal entregue
+            if entregue:
+                return await self._receive()
+            entregue = True
+            return {'type': 'http.request', 'body': self._dados, 'more_body': False}
+        return repetir
+
+
+async def _enviar(resposta, send):
+    headers = resposta.headers
+    if resposta.status_code == 304:
+        headers = headers.copy()
+        remove_entity_headers(headers)
+    await send({'type': 'http.response.start', 'status': resposta.status_code,
+                'headers': [(nome.lower().encode('latin1'), valor.encode('latin1'))
+                            for nome, valor in headers.to_wsgi_list()]})
+    if resposta.status_code != 304:
+        for bloco in resposta.iter_encoded():
+            await send({'type': 'http.response.body', 'body': bloco, 'more_body': True})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+class AppAssincrono:
+    """
+    Aplicação ASGI: despacha as rotas de app/assincrono/rotas.py e encaminha
+    o restante (outras URLs, métodos, HEAD e variações que a rota asyncio
+    não trata) ao app Flask.
+    """
+
+    def __init__(self, app_flask, engine, threads):
+        self.app_flask = app_flask
+        self.engine = engine
+        self.sessoes = fabrica_de_sessoes(engine)
+        self.sincrono = WSGIMiddleware(app_flask, workers=threads)
+        self._rotas = ROTAS.bind('localhost')
+        # Endpoint do Flask de cada rota asyncio, para as métricas e o log de
+        # consultas lentas agruparem os dois modos sob o mesmo nome
+        regras_flask = {(regra.rule, metodo): regra.endpoint
+                         for regra in app_flask.url_map.iter_rules() for metodo in regra.methods}
+        self._endpoints = {
+            regra.endpoint: regras_flask[regra.rule, next(iter(regra.methods - {'HEAD'}))]
+            for regra in ROTAS.iter_rules()}
+
+        config = app_flask.config
+        self._medir = config['METRICAS_HABILITADAS'] or config['CONSULTA_LENTA_MS'] > 0
+        instalar_orcamento_de_consultas(app_flask, engine.sync_engine)
+        if self._medir:
+            instalar_contadores_sql(engine.sync_engine)
+            consultas_lentas.registrar_engine_assincrono(engine)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._ciclo_de_vida(receive, send)
+        if scope['type'] != 'http' or scope['method'] == 'HEAD':
+            return await self.sincrono(scope, receive, send)
+        try:
+            rota, argumentos = self._rotas.match(scope['path'], scope['method'])
+        except HTTPException:
+            return await self.sincrono(scope, receive, send)
+
+        requisicao = _requisicao(scope)
+        corpo = _Corpo(receive)
+        endpoint = self._endpoints[rota]
+        inicio = time.perf_counter()
+        if self._medir:
+            iniciar_contagem_sql(endpoint)
+        with self.app_flask.app_context():
+            try:
+                resposta = await rota(self, requisicao, corpo, **argumentos)
+            except Exception:
+                logger.exception("Erro na rota assíncrona %s %s", scope['method'], scope['path'])
+                resposta = InternalServerError().get_response()
+            finally:
+                instrucoes, tempo_banco = encerrar_contagem_sql()
+            if resposta is not None:
+                self._finalizar(resposta, requisicao)
+                if self.app_flask.config['METRICAS_HABILITADAS']:
+                    metricas.registrar(endpoint, scope['method'], resposta.status_code,
+                                       time.perf_counter() - inicio, instrucoes, tempo_banco)
+
+        if resposta is None:
+            return await self.sincrono(scope, corpo.receive(), send)
+        await _enviar(resposta, send)
+
+    def _finalizar(self, resposta, requisicao):
+        # Os mesmos hooks after_request do app Flask que alteram a resposta
+        if roteador_de_replicas.ativo:
+            lembrar_escrita(resposta, requisicao.method)
+        if self.app_flask.config['COMPRESSAO_HABILITADA']:
+            comprimir(resposta, requisicao)
+
+    async def _ciclo_de_vida(self, receive, send):
+        while True:
+            mensagem = await receive()
+            if mensagem['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif mensagem['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def criar_app_asgi():
+    """
+    Cria o app do modo assíncrono: o app Flask de sempre (create_app) e um
+    engine asyncio para o mesmo DATABASE_URL.
+    """
+    app_flask = create_app()
+    engine = criar_engine_assincrono(app_flask.config['SQLALCHEMY_DATABASE_URI'])
+    return AppAssincrono(app_flask, engine, app_flask.config['ASGI_THREADS_SINCRONAS'])
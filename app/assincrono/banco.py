@@ -0,0 +1,48 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import opcoes_do_engine
+
+# Driver asyncio usado para cada banco do DATABASE_URL
+DRIVERS_ASSINCRONOS = {'postgresql': 'asyncpg', 'sqlite': 'aiosqlite'}
+
+
+def url_assincrona(url):
+    """
+    Converte a URL do DATABASE_URL para o driver asyncio do mesmo banco
+    (postgresql://... -> postgresql+asyncpg://..., sqlite:///x.db ->
+    sqlite+aiosqlite:///x.db).
+    """
+    url = make_url(url)
+    banco = url.get_backend_name()
+    if banco not in DRIVERS_ASSINCRONOS:
+        raise ValueError(f"O modo assíncrono não suporta o banco '{banco}' "
+                         f"(suportados: {', '.join(DRIVERS_ASSINCRONOS)}).")
+    return url.set(drivername=f'{banco}+{DRIVERS_ASSINCRONOS[banco]}')
+
+
+def criar_engine_assincrono(url):
+    """
+    AsyncEngine com as mesmas opções de pool do DATABASE_URL (DB_POOL_SIZE,
+    DB_MAX_OVERFLOW...). O PoolComTelemetria não é usado: o engine asyncio
+    precisa do seu próprio pool (AsyncAdaptedQueuePool).
+    """
+    opcoes = opcoes_do_engine(url)
+    opcoes.pop('poolclass', None)
+    return create_async_engine(url_assincrona(url), **opcoes)
+
+
+async def executar_passos(sessao, passos):
+    """Versão asyncio de app.database.executar_passos, na AsyncSession."""
+    try:
+        passo = next(passos)
+        while True:
+            passo = passos.send(await sessao.execute(*passo))
+    except StopIteration as fim:
+        return fim.value
+
+
+def fabrica_de_sessoes(engine):
+    # Sem expirar no commit: as linhas já lidas continuam acessíveis sem
+    # uma nova ida ao banco (que no asyncio precisaria de await)
+    return async_sessionmaker(engine, expire_on_commit=False)
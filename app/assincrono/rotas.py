@@ -0,0 +1,307 @@
+"""
+Rotas com versão asyncio no modo assíncrono.
+
+São as rotas lidas e escritas no dia de inscrições: a lista de alunos (por
+turma, por ids ou paginada), a inscrição, o catálogo (inteiro, paginado ou
+por vendor), as turmas agendadas (com resumo ou por ids) e os resumos de
+inscritos. Cada uma reproduz o contrato da rota do blueprint (mesmo JSON,
+status, ETag e compressão) com as mesmas consultas e passos dos serviços, e
+devolve None quando a requisição usa algo que só a rota síncrona implementa
+(exportação, Idempotency-Key) ou tem um parâmetro inválido: nesses casos a
+requisição é atendida pelo app Flask, com a mesma resposta de erro do modo
+síncrono.
+"""
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+from werkzeug.routing import Map, Rule
+
+from app.assincrono.banco import executar_passos
+from app.models.alunos import Aluno
+from app.models.treinamentos import Treinamento
+from app.models.turmas import Turma
+from app.routes.alunos import MENSAGENS_DE_CONFLITO, consulta_de_alunos
+from app.routes.treinamentos import (
+    chave_do_catalogo, consulta_de_turmas, consulta_de_turmas_por_id, consulta_do_catalogo,
+    filtros_de_agendados, montar_turma, paginacao_do_catalogo, versao_das_vagas)
+from app.services.inscricoes import (
+    ATUALIZADO, CRIADO, MODOS, MODO_CRIAR, TURMA_NAO_ENCONTRADA, passos_da_inscricao)
+from app.services.resumo import MAXIMO_TURMAS_POR_RESUMO, passos_dos_resumos
+from app.utils.cache import cache_catalogo
+from app.utils.campos import colunas_dos_campos, ler_campos, projetar
+from app.utils.consultas import (
+    MAXIMO_IDS_POR_CONSULTA, orcamento_de_consultas, passos_da_busca_por_ids)
+from app.utils.etag import AGENDA, CATALOGO, calcular_etag, consulta_de_versoes, versoes_em_ordem
+from app.utils.exportacao import formato_de_exportacao
+from app.utils.idempotencia import CABECALHO as CABECALHO_IDEMPOTENCIA
+from app.utils.paginacao import CursorInvalido, paginacao_solicitada, passos_da_paginacao
+from app.utils.parametros import ParametroInvalido, ler_lista_de_ids
+from app.utils.serializacao import registros_de_linhas
+
+
+def _json(dados, status=200):
+    """Equivalente ao jsonify do Flask (mesmo provider, mesmos bytes)."""
+    resposta = current_app.json.response(dados)
+    resposta.status_code = status
+    return resposta
+
+
+async def _versoes(sessao, recursos, adicionais=()):
+    """Nomes e versões do ETag, em uma consulta (ver etag.versoes_atuais)."""
+    nomes = recursos + tuple(nome for nome, _ in adicionais)
+    linhas = (await sessao.execute(consulta_de_versoes(recursos, adicionais))).all()
+    return nomes, versoes_em_ordem(linhas, nomes)
+
+
+def _nao_modificado(etag):
+    resposta = current_app.response_class('', 304)
+    resposta.set_etag(etag)
+    return resposta
+
+
+@orcamento_de_consultas(2)
+async def listar_alunos(app, requisicao, corpo):
+    """GET /alunos/, com turma_id, ids ou paginação (ver alunos.get_alunos)."""
+    args = requisicao.args
+    if formato_de_exportacao(requisicao):
+        return None
+    try:
+        campos = ler_campos(args, Aluno)
+        ids = ler_lista_de_ids(args['ids'], MAXIMO_IDS_POR_CONSULTA) if 'ids' in args else None
+    except ParametroInvalido:
+        return None
+    colunas = colunas_dos_campos(Aluno, campos or Aluno.CAMPOS)
+    turma_id_filtro = args.get('turma_id', type=int)
+
+    async with app.sessoes() as sessao:
+        if ids is not None:
+            encontrados = await executar_passos(sessao, passos_da_busca_por_ids(
+                consulta_de_alunos(campos), Aluno.id, ids, sessao.bind.dialect))
+            return _json({
+                "itens": [encontrados[i].to_dict(campos) for i in ids if i in encontrados],
+                "missing": [i for i in ids if i not in encontrados]
+            })
+
+        if not turma_id_filtro:
+            if not paginacao_solicitada(args):
+                alunos = await sessao.execute(select(*colunas).order_by(Aluno.id))
+                return _json(registros_de_linhas(alunos))
+            try:
+                alunos, next_cursor = await executar_passos(sessao, passos_da_paginacao(
+                    consulta_de_alunos(campos), [Aluno.id], args))
+            except CursorInvalido as e:
+                return _json({"erro": str(e)}, 400)
+            return _json({"itens": [aluno.to_dict(campos) for aluno in alunos],
+                          "next_cursor": next_cursor})
+
+        turma = await sessao.get(Turma, turma_id_filtro, options=[joinedload(Turma.treinamento)])
+        if not turma:
+            return _json({"erro": f"A turma com ID {turma_id_filtro} não foi encontrada."}, 404)
+
+        alunos_da_turma = registros_de_linhas(await sessao.execute(
+            select(*colunas).where(Aluno.turma_id == turma_id_filtro).order_by(Aluno.id)))
+
+    return _json({
+        "nome_treinamento": turma.treinamento.nome_treinamento if turma.treinamento else "N/A",
+        "instrutor_sugerido": turma.treinamento.instrutor_sugerido if turma.treinamento else "N/A",
+        "alunos": alunos_da_turma
+    })
+
+
+async def inscrever(app, requisicao, corpo):
+    """POST /alunos/ (ver alunos.create_aluno)."""
+    if CABECALHO_IDEMPOTENCIA in requisicao.headers or requisicao.mimetype != 'application/json':
+        return None
+    modo = requisicao.args.get('modo', MODO_CRIAR)
+    if modo not in MODOS:
+        return None
+    try:
+        dados = current_app.json.loads(await corpo.ler())
+    except ValueError:
+        return None
+    if not isinstance(dados, dict) or not {'nome', 'email', 'turma_id'} <= dados.keys():
+        return None
+
+    turma_id = dados.get('turma_id')
+    valores = {
+        'nome': dados['nome'],
+        'email': dados['email'],
+        'turma_id': turma_id,
+        'pago': dados.get('pago', False)
+    }
+
+    async with app.sessoes() as sessao:
+        try:
+            resultado, aluno = await executar_passos(
+                sessao, passos_da_inscricao(valores, modo, sessao.bind.dialect.name))
+            if resultado in (CRIADO, ATUALIZADO):
+                await sessao.commit()
+                return _json(aluno._asdict(), 201 if resultado == CRIADO else 200)
+
+            await sessao.rollback()
+            if resultado == TURMA_NAO_ENCONTRADA:
+                return _json({"erro": f"A turma com ID {turma_id} não foi encontrada."}, 404)
+
+            conflito = {"erro": MENSAGENS_DE_CONFLITO[resultado].format(email=dados['email']),
+                        "conflito": resultado}
+            if aluno is not None:
+                conflito.update({"aluno_id": aluno.id, "turma_id": aluno.turma_id})
+            return _json(conflito, 409)
+
+        except Exception as e:
+            await sessao.rollback()
+            return _json({"erro": f"Não foi possível criar o aluno: {str(e)}"}, 500)
+
+
+async def _catalogo(sessao, vendor=None):
+    return [t.to_dict() for t in await sessao.scalars(consulta_do_catalogo(vendor))]
+
+
+# A consulta da versão do catálogo (ETag) + a do catálogo, quando não está em cache
+@orcamento_de_consultas(2)
+async def listar_treinamentos(app, requisicao, corpo):
+    """GET /treinamentos (ver treinamentos.obter_treinamentos)."""
+    args = requisicao.args
+    try:
+        campos = ler_campos(args, Treinamento)
+    except ParametroInvalido:
+        return None
+
+    async with app.sessoes() as sessao:
+        nomes, versoes = await _versoes(sessao, (CATALOGO,))
+        etag = calcular_etag(nomes, versoes, requisicao)
+        if etag in requisicao.if_none_match:
+            return _nao_modificado(etag)
+
+        if paginacao_solicitada(args):
+            try:
+                treinamentos, next_cursor = await executar_passos(
+                    sessao, passos_da_paginacao(*paginacao_do_catalogo(campos), args))
+            except CursorInvalido as e:
+                return _json({"erro": str(e)}, 400)
+            resposta = _json({"itens": [t.to_dict(campos) for t in treinamentos],
+                              "next_cursor": next_cursor})
+        else:
+            treinamentos = await cache_catalogo.obter_ou_aguardar(
+                chave_do_catalogo(versoes[0]), lambda: _catalogo(sessao))
+            resposta = _json(projetar(treinamentos, campos))
+
+    resposta.set_etag(etag)
+    return resposta
+
+
+@orcamento_de_consultas(2)
+async def listar_por_vendor(app, requisicao, corpo, vendor):
+    """GET /treinamentos/<vendor> (ver treinamentos.obter_treinamentos_por_vendor)."""
+    try:
+        campos = ler_campos(requisicao.args, Treinamento)
+    except ParametroInvalido:
+        return None
+
+    async with app.sessoes() as sessao:
+        nomes, versoes = await _versoes(sessao, (CATALOGO,))
+        etag = calcular_etag(nomes, versoes, requisicao)
+        if etag in requisicao.if_none_match:
+            return _nao_modificado(etag)
+        treinamentos = await cache_catalogo.obter_ou_aguardar(
+            chave_do_catalogo(versoes[0], vendor), lambda: _catalogo(sessao, vendor))
+
+    if not treinamentos:
+        return _json({"mensagem": "Nenhum treinamento encontrado para este vendor"}, 404)
+    resposta = _json(projetar(treinamentos, campos))
+    resposta.set_etag(etag)
+    return resposta
+
+
+RECURSOS_AGENDADOS = (CATALOGO, AGENDA)
+
+
+# A consulta das versões (ETag) + a das turmas, como na rota síncrona; com
+# incluir=resumo não há ETag, e a segunda consulta é a dos resumos
+@orcamento_de_consultas(2)
+async def listar_agendados(app, requisicao, corpo):
+    """GET /treinamentos/agendados (ver treinamentos.obter_treinamentos_agendados)."""
+    args = requisicao.args
+    if formato_de_exportacao(requisicao) and 'ids' not in args:
+        return None
+    try:
+        campos = ler_campos(args, Turma)
+        if 'ids' in args:
+            ids = ler_lista_de_ids(args['ids'], MAXIMO_IDS_POR_CONSULTA)
+        else:
+            filtros = filtros_de_agendados(args.get('mes', type=int), args.get('ano', type=int))
+    except ParametroInvalido:
+        return None
+    incluir_resumo = args.get('incluir') == 'resumo'
+
+    async with app.sessoes() as sessao:
+        etag = None
+        if not incluir_resumo:
+            nomes, versoes = await _versoes(sessao, RECURSOS_AGENDADOS, versao_das_vagas(args))
+            etag = calcular_etag(nomes, versoes, requisicao, varia_por_dia=True)
+            if etag in requisicao.if_none_match:
+                return _nao_modificado(etag)
+
+        if 'ids' in args:
+            encontradas = await executar_passos(sessao, passos_da_busca_por_ids(
+                consulta_de_turmas_por_id(campos), Turma.id, ids, sessao.bind.dialect))
+            resposta = _json({
+                "itens": [encontradas[i].to_dict(campos) for i in ids if i in encontradas],
+                "missing": [i for i in ids if i not in encontradas]
+            })
+        else:
+            try:
+                linhas = (await sessao.execute(
+                    consulta_de_turmas(campos, filtros, com_id=incluir_resumo))).all()
+                resultado = registros_de_linhas(linhas, montar_turma(campos))
+                if incluir_resumo:
+                    resumos = await executar_passos(
+                        sessao, passos_dos_resumos([linha.id for linha in linhas]))
+                    for linha, dados in zip(linhas, resultado):
+                        dados['resumo'] = resumos.get(linha.id)
+            except Exception as e:
+                return _json({"erro": f"Ocorreu um erro ao processar a requisição: {str(e)}"}, 500)
+            resposta = _json(resultado)
+
+    if etag is not None:
+        resposta.set_etag(etag)
+    return resposta
+
+
+@orcamento_de_consultas(1)
+async def resumo_da_turma(app, requisicao, corpo, turma_id):
+    """GET /treinamentos/agendados/<id>/resumo (ver treinamentos.obter_resumo_turma)."""
+    async with app.sessoes() as sessao:
+        resumos = await executar_passos(sessao, passos_dos_resumos([turma_id]))
+    if turma_id not in resumos:
+        return _json({"erro": "Turma não encontrada"}, 404)
+    return _json(resumos[turma_id])
+
+
+@orcamento_de_consultas(1)
+async def resumos_das_turmas(app, requisicao, corpo):
+    """GET /treinamentos/agendados/resumo?ids= (ver treinamentos.obter_resumos_turmas)."""
+    try:
+        ids = ler_lista_de_ids(requisicao.args.get('ids'), MAXIMO_TURMAS_POR_RESUMO)
+    except ParametroInvalido:
+        return None
+
+    async with app.sessoes() as sessao:
+        resumos = await executar_passos(sessao, passos_dos_resumos(ids))
+    return _json({
+        "resumos": [resumos[i] for i in ids if i in resumos],
+        "nao_encontradas": [i for i in ids if i not in resumos]
+    })
+
+
+# Mesmas URLs dos blueprints; as demais rotas (e métodos) vão para o app Flask
+ROTAS = Map([
+    Rule('/alunos/', endpoint=listar_alunos, methods=['GET']),
+    Rule('/alunos/', endpoint=inscrever, methods=['POST']),
+    Rule('/treinamentos', endpoint=listar_treinamentos, methods=['GET']),
+    Rule('/treinamentos/<string:vendor>', endpoint=listar_por_vendor, methods=['GET']),
+    Rule('/treinamentos/agendados', endpoint=listar_agendados, methods=['GET']),
+    Rule('/treinamentos/agendados/<int:turma_id>/resumo', endpoint=resumo_da_turma,
+         methods=['GET']),
+    Rule('/treinamentos/agendados/resumo', endpoint=resumos_das_turmas, methods=['GET']),
+])
@@ -0,0 +1,32 @@
+import time
+
+import click
+from flask.cli import with_appcontext
+
+from app.services.carga_sintetica import TAMANHO_LOTE, gerar_dados
+
+
+@click.command('seed')
+@click.option('--treinamentos', default=200, show_default=True, help='Treinamentos no catálogo.')
+@click.option('--turmas', default=5000, show_default=True, help='Turmas agendadas.')
+@click.option('--alunos', default=100000, show_default=True, help='Alunos inscritos.')
+@click.option('--semente', default=42, show_default=True, help='Semente do gerador (dados reprodutíveis).')
+@click.option('--lote', default=TAMANHO_LOTE, show_default=True, help='Linhas por lote gravado.')
+@with_appcontext
+def seed(treinamentos, turmas, alunos, semente, lote):
+    """
+    Popula o banco com dados sintéticos relacionados, em lote, ex:
+    flask seed --alunos 1000000 --turmas 50000
+    """
+    inicio = time.perf_counter()
+
+    def avisar(tabela, total):
+        click.echo(f"\r{tabela}: {total} linhas", nl=False)
+
+    try:
+        gerar_dados(treinamentos, turmas, alunos, semente=semente,
+                    tamanho_lote=lote, avisar=avisar)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(f"\nConcluído em {time.perf_counter() - inicio:.1f}s.")
@@ -1,4 +1,250 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from flask import g, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+
+def _somente_leitura(clause):
+    """SELECT (ou UNION) sem FOR UPDATE: pode ser respondido por uma réplica."""
+    return (getattr(clause, 'is_select', False)
+            and getattr(clause, '_for_update_arg', None) is None)
+
+
+class SessaoComReplicas(Session):
+    """
+    Sessão que envia os SELECTs para a réplica escolhida para a requisição
+    (g.engine_de_leitura, ver app/utils/replicas.py). INSERT/UPDATE/DELETE,
+    flush, SELECT ... FOR UPDATE e SQL textual vão sempre para o primário;
+    depois da primeira escrita, as leituras da mesma sessão também, para a
+    requisição enxergar o que acabou de gravar.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context():
+            leitura = g.get('engine_de_leitura')
+            if leitura is not None:
+                if self._flushing or getattr(clause, 'is_dml', False):
+                    self.info['escreveu'] = True
+                elif not self.info.get('escreveu') and _somente_leitura(clause):
+                    return leitura
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
 
 # Cria uma instância do SQLAlchemy sem associá-la a uma aplicação ainda
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': SessaoComReplicas})
+
+
+def executar_passos(passos):
+    """
+    Executa na sessão as instruções de um gerador de passos. Cada passo é o
+    par (instrucao, parametros) e recebe de volta o Result; o valor que o
+    gerador retorna é o resultado. Os serviços montam assim as operações que
+    o modo assíncrono também executa (com await, ver
+    app/assincrono/banco.py), para as duas versões não se separarem.
+    """
+    try:
+        passo = next(passos)
+        while True:
+            passo = passos.send(db.session.execute(*passo))
+    except StopIteration as fim:
+        return fim.value
+
+
+class TelemetriaPool:
+    """
+    Contadores do pool de conexões deste processo: quantas vezes uma
+    conexão foi pedida, quanto tempo se esperou por ela, quantos pedidos
+    estouraram o pool_timeout e quantas conexões foram invalidadas
+    (ex: pre-ping falhando depois de um failover do PostgreSQL).
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.zerar()
+
+    def zerar(self):
+        with self._trava:
+            self.checkouts = 0
+            self.espera_total = 0.0
+            self.espera_maxima = 0.0
+            self.timeouts = 0
+            self.invalidacoes = 0
+
+    def registrar_espera(self, segundos, estourou=False):
+        with self._trava:
+            if estourou:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.espera_total += segundos
+            self.espera_maxima = max(self.espera_maxima, segundos)
+
+    def registrar_invalidacao(self):
+        with self._trava:
+            self.invalidacoes += 1
+
+    def to_dict(self):
+        with self._trava:
+            media = self.espera_total / self.checkouts if self.checkouts else 0.0
+            return {
+                'checkouts': self.checkouts,
+                'espera_media_ms': round(media * 1000, 3),
+                'espera_maxima_ms': round(self.espera_maxima * 1000, 3),
+                'espera_total_ms': round(self.espera_total * 1000, 3),
+                'timeouts': self.timeouts,
+                'invalidacoes': self.invalidacoes,
+            }
+
+
+telemetria_pool = TelemetriaPool()
+
+
+class PoolComTelemetria(QueuePool):
+    """QueuePool que mede o tempo de espera por uma conexão livre."""
+
+    def connect(self):
+        inicio = time.perf_counter()
+        try:
+            conexao = super().connect()
+        except PoolTimeoutError:
+            telemetria_pool.registrar_espera(time.perf_counter() - inicio, estourou=True)
+            raise
+        telemetria_pool.registrar_espera(time.perf_counter() - inicio)
+        return conexao
+
+
+@event.listens_for(PoolComTelemetria, 'invalidate')
+def _contar_invalidacao(dbapi_connection, connection_record, exception):
+    telemetria_pool.registrar_invalidacao()
+
+
+# --- Contagem de SQL por requisição ---
+# Estado por contexto (contextvars): cada thread de um worker WSGI e cada
+# requisição do modo assíncrono (uma task do event loop) têm o seu, então os
+# listeners do engine somam as instruções e o tempo de banco da requisição
+# atual sem precisar consultar o contexto do Flask a cada execução.
+class _ContagemSql:
+    __slots__ = ('instrucoes', 'tempo', 'endpoint')
+
+    def __init__(self, endpoint):
+        self.instrucoes = 0
+        self.tempo = 0.0
+        self.endpoint = endpoint
+
+
+_sql_da_requisicao = ContextVar('sql_da_requisicao', default=None)
+
+
+# Funções chamadas após cada instrução de uma requisição, com a assinatura
+# (conn, statement, parameters, executemany, duracao, endpoint)
+observadores_de_execucao = []
+
+
+def iniciar_contagem_sql(endpoint=None):
+    _sql_da_requisicao.set(_ContagemSql(endpoint))
+
+
+def encerrar_contagem_sql():
+    """Para a contagem e retorna (instrucoes, segundos_no_banco)."""
+    contagem = _sql_da_requisicao.get()
+    if contagem is None:
+        return 0, 0.0
+    _sql_da_requisicao.set(None)
+    return contagem.instrucoes, contagem.tempo
+
+
+def _antes_da_execucao(conn, cursor, statement, parameters, context, executemany):
+    if _sql_da_requisicao.get() is not None:
+        conn.info.setdefault('inicio_execucao', []).append(time.perf_counter())
+
+
+def _depois_da_execucao(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get('inicio_execucao')
+    contagem = _sql_da_requisicao.get()
+    if inicios and contagem is not None:
+        duracao = time.perf_counter() - inicios.pop()
+        contagem.tempo += duracao
+        contagem.instrucoes += 1
+        for observador in observadores_de_execucao:
+            observador(conn, statement, parameters, executemany, duracao, contagem.endpoint)
+
+
+def instalar_contadores_sql(engine):
+    """Registra no engine os listeners que alimentam a contagem por requisição."""
+    if not event.contains(engine, 'before_cursor_execute', _antes_da_execucao):
+        event.listen(engine, 'before_cursor_execute', _antes_da_execucao)
+        event.listen(engine, 'after_cursor_execute', _depois_da_execucao)
+
+
+def _env_int(nome, padrao):
+    valor = os.getenv(nome)
+    return int(valor) if valor not in (None, '') else padrao
+
+
+def _env_bool(nome, padrao):
+    valor = os.getenv(nome)
+    if valor in (None, ''):
+        return padrao
+    return valor.strip().lower() in ('1', 'true', 'sim', 'yes', 'on')
+
+
+def opcoes_do_engine(url):
+    """
+    Monta o SQLALCHEMY_ENGINE_OPTIONS a partir das variáveis de ambiente:
+
+    - DB_POOL_SIZE: conexões mantidas abertas por worker (padrão 5)
+    - DB_MAX_OVERFLOW: conexões extras permitidas em picos (padrão 10)
+    - DB_POOL_TIMEOUT: segundos esperando uma conexão livre (padrão 30)
+    - DB_POOL_RECYCLE: segundos até reabrir uma conexão (padrão 1800)
+    - DB_POOL_PRE_PING: testa a conexão antes de usar (padrão true)
+
+    Para o SQLite o Flask-SQLAlchemy escolhe o pool adequado, então só
+    recycle e pre-ping são aplicados.
+    """
+    opcoes = {
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+    }
+    if url and not url.startswith('sqlite'):
+        opcoes.update({
+            'poolclass': PoolComTelemetria,
+            'pool_size': _env_int('DB_POOL_SIZE', 5),
+            'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),
+            'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+        })
+    return opcoes
+
+
+def binds_das_replicas(urls):
+    """
+    Monta o SQLALCHEMY_BINDS das réplicas de leitura a partir de
+    DATABASE_REPLICA_URLS (URLs separadas por vírgula). Cada réplica vira o
+    bind 'replica_0', 'replica_1', ... com as mesmas opções de pool do primário.
+    """
+    binds = {}
+    for url in (urls or '').split(','):
+        url = url.strip()
+        if url:
+            binds[f'replica_{len(binds)}'] = {'url': url, **opcoes_do_engine(url)}
+    return binds
+
+
+def estatisticas_do_pool(engine):
+    """Estado atual do pool do engine somado aos contadores acumulados."""
+    pool = engine.pool
+    estado = {'tipo': type(pool).__name__, 'status': pool.status()}
+    # Só o QueuePool (e derivados) tem tamanho/overflow
+    for nome, metodo in [('tamanho', 'size'), ('em_uso', 'checkedout'),
+                         ('ociosas', 'checkedin'), ('overflow', 'overflow')]:
+        if hasattr(pool, metodo):
+            estado[nome] = getattr(pool, metodo)()
+    estado['espera'] = telemetria_pool.to_dict()
+    return estado
@@ -6,6 +6,10 @@ class Aluno(db.Model):
     Representa um aluno inscrito em uma TURMA específica.
     """
     __tablename__ = 'alunos'
+    # Índice usado pelos filtros por turma e pelo resumo de inscritos/pagos
+    __table_args__ = (
+        db.Index('ix_alunos_turma_id_pago', 'turma_id', 'pago'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String(100), nullable=False)
@@ -18,11 +22,8 @@ class Aluno(db.Model):
     def __repr__(self):
         return f'<Aluno {self.nome}>'
 
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'nome': self.nome,
-            'email': self.email,
-            'pago': self.pago,
-            'turma_id': self.turma_id
-        }
+    # Campos do to_dict(), na ordem da resposta (usados também por ?fields=)
+    CAMPOS = ('id', 'nome', 'email', 'pago', 'turma_id')
+
+    def to_dict(self, campos=None):
+        return {campo: getattr(self, campo) for campo in campos or self.CAMPOS}
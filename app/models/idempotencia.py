@@ -0,0 +1,26 @@
+from app.database import db
+
+
+class ChaveIdempotencia(db.Model):
+    """
+    Resposta gravada de um POST enviado com o cabeçalho Idempotency-Key.
+    Enquanto a primeira requisição executa, 'status' fica nulo; repetições
+    da mesma chave esperam por ela e depois recebem a resposta gravada.
+    """
+    __tablename__ = 'chaves_idempotencia'
+
+    chave = db.Column(db.String(255), primary_key=True)
+    # A mesma chave pode ser usada em rotas diferentes
+    rota = db.Column(db.String(255), primary_key=True)
+    # Hash do corpo e da query string: a chave não pode ser reaproveitada
+    # com outro corpo nem com outros parâmetros (ex: ?modo=upsert)
+    impressao = db.Column(db.String(64), nullable=True)
+    status = db.Column(db.Integer, nullable=True)
+    corpo = db.Column(db.LargeBinary, nullable=True)
+    tipo_conteudo = db.Column(db.String(100), nullable=True)
+    cabecalhos = db.Column(db.JSON, nullable=True)
+    criado_em = db.Column(db.DateTime, nullable=False)
+    expira_em = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<ChaveIdempotencia {self.rota} {self.chave} status={self.status}>'
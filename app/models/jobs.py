@@ -0,0 +1,50 @@
+import uuid
+from datetime import datetime, timezone
+
+from app.database import db
+
+# Estados de um job
+PENDENTE = 'pendente'
+EXECUTANDO = 'executando'
+CONCLUIDO = 'concluido'
+FALHOU = 'falhou'
+
+
+def agora():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class Job(db.Model):
+    """
+    Tarefa pesada (exportação, relatório) executada fora da requisição.
+    O id é aleatório porque dá acesso ao arquivo de resultado.
+    """
+    __tablename__ = 'jobs'
+
+    id = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    tipo = db.Column(db.String(50), nullable=False)
+    parametros = db.Column(db.JSON, nullable=False, default=dict)
+    status = db.Column(db.String(20), nullable=False, default=PENDENTE, index=True)
+    progresso = db.Column(db.Integer, nullable=False, default=0)
+    erro = db.Column(db.Text, nullable=True)
+    # Caminho do arquivo gerado, relativo ao diretório de resultados
+    arquivo = db.Column(db.String(255), nullable=True)
+    criado_em = db.Column(db.DateTime, nullable=False, default=agora)
+    iniciado_em = db.Column(db.DateTime, nullable=True)
+    concluido_em = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.tipo} {self.status}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'tipo': self.tipo,
+            'parametros': self.parametros,
+            'status': self.status,
+            'progresso': self.progresso,
+            'erro': self.erro,
+            'criado_em': self.criado_em.isoformat() if self.criado_em else None,
+            'iniciado_em': self.iniciado_em.isoformat() if self.iniciado_em else None,
+            'concluido_em': self.concluido_em.isoformat() if self.concluido_em else None,
+        }
@@ -0,0 +1,34 @@
+from app.database import db
+
+
+class RelatorioInscricoes(db.Model):
+    """
+    Agregado de inscrições por treinamento e mês de início da turma.
+    É derivado de alunos, turmas e treinamentos (ver services/relatorios.py)
+    e lido pelos relatórios, que assim não varrem as tabelas de origem.
+    """
+    __tablename__ = 'relatorio_inscricoes'
+
+    treinamento_id = db.Column(db.Integer, primary_key=True)
+    ano = db.Column(db.Integer, primary_key=True)
+    mes = db.Column(db.Integer, primary_key=True)
+    vendor = db.Column(db.String(100), nullable=False, index=True)
+    nome_treinamento = db.Column(db.String(150), nullable=False)
+    total_inscritos = db.Column(db.Integer, nullable=False, default=0)
+    pagos = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<RelatorioInscricoes {self.treinamento_id} {self.ano}-{self.mes:02d}>'
+
+
+class RelatorioPendente(db.Model):
+    """
+    Turmas cujas inscrições mudaram desde a última atualização do agregado.
+    As rotas de escrita marcam a turma na mesma transação da alteração.
+    """
+    __tablename__ = 'relatorio_pendentes'
+
+    turma_id = db.Column(db.Integer, primary_key=True)
+
+    def __repr__(self):
+        return f'<RelatorioPendente {self.turma_id}>'
@@ -8,6 +8,10 @@ class Treinamento(db.Model):
     """
 
     __tablename__ = 'treinamentos'
+    # Índice usado pela paginação por chave (nome_treinamento, id) do catálogo
+    __table_args__ = (
+        db.Index('ix_treinamentos_nome_treinamento_id', 'nome_treinamento', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     nome_treinamento = db.Column(db.String(150), nullable=False)
@@ -19,10 +23,8 @@ class Treinamento(db.Model):
     def __repr__(self):
         return f'<Treinamento (Catálogo) {self.nome_treinamento}>'
 
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'nome_treinamento': self.nome_treinamento,
-            'vendor': self.vendor,
-            'instrutor_sugerido': self.instrutor_sugerido
-        }
+    # Campos do to_dict(), na ordem da resposta (usados também por ?fields=)
+    CAMPOS = ('id', 'nome_treinamento', 'vendor', 'instrutor_sugerido')
+
+    def to_dict(self, campos=None):
+        return {campo: getattr(self, campo) for campo in campos or self.CAMPOS}
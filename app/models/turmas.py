@@ -8,6 +8,10 @@ class Turma(db.Model):
     """
 
     __tablename__ = 'turmas'
+    # Índice composto usado pela listagem de /agendados (intervalo de datas + status)
+    __table_args__ = (
+        db.Index('ix_turmas_data_inicio_status', 'data_inicio', 'status'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     data_inicio = db.Column(db.Date, nullable=False)
@@ -16,6 +20,17 @@ class Turma(db.Model):
     # Ex: Agendada, Em andamento, Concluída
     status = db.Column(db.String(50), nullable=False, default='Agendada')
 
+    # --- Vagas ---
+    # Limite de alunos da turma (None = sem limite) e contador de vagas já
+    # ocupadas, mantido pelas rotas de inscrição com UPDATE condicional, para
+    # não precisar contar os alunos a cada nova inscrição.
+    limite_vagas = db.Column(db.Integer, nullable=True)
+    vagas_ocupadas = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Incrementada junto com 'vagas_ocupadas', no mesmo UPDATE: o ETag de
+    # /agendados soma as versões das turmas listadas (ver versao_das_vagas),
+    # sem que cada inscrição escreva em uma linha global de versão.
+    versao_vagas = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
     # --- Relações (Chaves Estrangeiras) ---
 
     # 1. Qual treinamento do catálogo esta turma representa?
@@ -32,14 +47,21 @@ class Turma(db.Model):
         nome = self.treinamento.nome_treinamento if self.treinamento else 'N/A'
         return f'<Turma {self.id}: {nome} em {self.data_inicio}>'
 
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'treinamento_id': self.treinamento_id,
-            'data_inicio': self.data_inicio.isoformat(),
-            'horario': self.horario,
-            'local': self.local,
-            'status': self.status,
-            # Você pode até incluir informações do treinamento relacionado
-            'treinamento_info': self.treinamento.to_dict() if self.treinamento else None
-        }
+    # Campos do to_dict(), na ordem da resposta (usados também por ?fields=).
+    # 'treinamento_info' não é coluna: vem do treinamento relacionado.
+    CAMPOS = ('id', 'treinamento_id', 'data_inicio', 'horario', 'local', 'status',
+              'limite_vagas', 'vagas_ocupadas', 'treinamento_info')
+
+    def to_dict(self, campos=None):
+        # Só lê os atributos pedidos: com load_only, ler outra coluna
+        # dispararia uma consulta extra por turma
+        dados = {}
+        for campo in campos or self.CAMPOS:
+            if campo == 'data_inicio':
+                dados[campo] = self.data_inicio.isoformat()
+            elif campo == 'treinamento_info':
+                # Você pode até incluir informações do treinamento relacionado
+                dados[campo] = self.treinamento.to_dict() if self.treinamento else None
+            else:
+                dados[campo] = getattr(self, campo)
+        return dados
@@ -0,0 +1,16 @@
+from app.database import db
+
+
+class VersaoRecurso(db.Model):
+    """
+    Carimbo de versão de um conjunto de dados (ex: 'catalogo', 'agenda').
+    As rotas de escrita incrementam a versão, e as rotas de leitura a usam
+    para gerar o ETag sem precisar consultar os dados em si.
+    """
+    __tablename__ = 'versoes_recursos'
+
+    recurso = db.Column(db.String(50), primary_key=True)
+    versao = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<VersaoRecurso {self.recurso}={self.versao}>'
@@ -1,25 +1,72 @@
 from flask import Blueprint, jsonify, request
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 from app.models.alunos import Aluno
 from app.models.turmas import Turma
 from app.database import db
+from app.services.inscricoes import (
+    ATUALIZADO, CRIADO, EMAIL_DUPLICADO, FORMATO_CSV, FORMATO_NDJSON, INSCRITO_EM_OUTRA_TURMA,
+    MODO_CRIAR, MODOS, TURMA_LOTADA, TURMA_NAO_ENCONTRADA, importar_alunos, inscrever_aluno,
+    ler_linhas, liberar_vagas)
+from app.services.relatorios import marcar_turmas_alteradas
+from app.utils.campos import carregar_apenas, colunas_dos_campos, ler_campos
+from app.utils.exportacao import exportar, formato_de_exportacao
+from app.utils.idempotencia import idempotente
+from app.utils.consultas import MAXIMO_IDS_POR_CONSULTA, buscar_por_ids, orcamento_de_consultas
+from app.utils.paginacao import CursorInvalido, paginacao_solicitada, paginar_por_chave
+from app.utils.parametros import ParametroInvalido, ler_lista_de_ids
+from app.utils.serializacao import registros_de_linhas
 
 alunos_bp = Blueprint('alunos_bp', __name__, url_prefix='/alunos')
 
 
 @alunos_bp.route('/', methods=['GET'])
+@orcamento_de_consultas(2)
 def get_alunos():
     """
     Obtém todos os alunos ou, se um 'turma_id' for fornecido, filtra por essa
     turma e enriquece a resposta com o nome do treinamento e do instrutor.
+    Com 'Accept: application/x-ndjson' ou 'text/csv' a lista é exportada em streaming.
+    Com 'ids=1,2,3' retorna só esses alunos, na ordem pedida.
+    Com 'fields=id,nome' busca e devolve apenas essas colunas.
     """
+    try:
+        campos = ler_campos(request.args, Aluno)
+    except ParametroInvalido as e:
+        return jsonify({"erro": str(e)}), 400
+    colunas = colunas_dos_campos(Aluno, campos or Aluno.CAMPOS)
+
+    # --- BUSCA EM LOTE: ?ids=1,2,3 (uma consulta IN no lugar de N requisições) ---
+    if 'ids' in request.args:
+        try:
+            ids = ler_lista_de_ids(request.args['ids'], MAXIMO_IDS_POR_CONSULTA)
+        except ParametroInvalido as e:
+            return jsonify({"erro": str(e)}), 400
+
+        encontrados = buscar_por_ids(consulta_de_alunos(campos), Aluno.id, ids)
+        return jsonify({
+            "itens": [encontrados[i].to_dict(campos) for i in ids if i in encontrados],
+            "missing": [i for i in ids if i not in encontrados]
+        })
+
     # 1. Tenta obter o 'turma_id' dos argumentos da URL
     turma_id_filtro = request.args.get('turma_id', type=int)
 
+    # --- EXPORTAÇÃO: Accept: application/x-ndjson ou text/csv ---
+    formato = formato_de_exportacao(request)
+    if formato:
+        # Transmite as linhas direto do cursor, sem carregar objetos Aluno
+        consulta = select(*colunas).order_by(Aluno.id)
+        if turma_id_filtro:
+            consulta = consulta.where(Aluno.turma_id == turma_id_filtro)
+        return exportar(consulta, formato, 'alunos')
+
     # --- CASO 1: A ROTA É FILTRADA POR TURMA ---
     if turma_id_filtro:
         # Busca o objeto Turma completo pelo ID fornecido.
-        # Esta é a abordagem mais eficiente.
-        turma = Turma.query.get(turma_id_filtro)
+        # O treinamento vem no mesmo SELECT (joinedload), evitando uma ida extra ao banco.
+        turma = Turma.query.options(
+            joinedload(Turma.treinamento)).get(turma_id_filtro)
 
         # Se a turma com o ID especificado não for encontrada, retorna um erro 404.
         if not turma:
@@ -30,8 +77,9 @@ def get_alunos():
         nome_treinamento = turma.treinamento.nome_treinamento if turma.treinamento else "N/A"
         instrutor_sugerido = turma.treinamento.instrutor_sugerido if turma.treinamento else "N/A"
 
-        # Pega a lista de alunos diretamente do objeto turma
-        alunos_da_turma = [aluno.to_dict() for aluno in turma.alunos]
+        # Lista de alunos da turma direto das linhas do SELECT, sem objetos Aluno
+        alunos_da_turma = registros_de_linhas(db.session.execute(
+            select(*colunas).where(Aluno.turma_id == turma_id_filtro).order_by(Aluno.id)))
 
         # Monta o objeto de resposta JSON com a estrutura especial
         resposta_filtrada = {
@@ -43,56 +91,135 @@ def get_alunos():
         return jsonify(resposta_filtrada)
 
     # --- CASO 2: A ROTA NÃO É FILTRADA ---
+    elif paginacao_solicitada(request.args):
+        # Paginação por chave (id): ex. /alunos/?limit=100&cursor=<next_cursor>
+        try:
+            alunos, next_cursor = paginar_por_chave(
+                consulta_de_alunos(campos), [Aluno.id], request.args)
+        except CursorInvalido as e:
+            return jsonify({"erro": str(e)}), 400
+
+        return jsonify({
+            "itens": [aluno.to_dict(campos) for aluno in alunos],
+            "next_cursor": next_cursor
+        })
+
     else:
-        # Se nenhum filtro foi passado, retorna a lista simples de todos os alunos.
-        alunos = Aluno.query.all()
-        return jsonify([aluno.to_dict() for aluno in alunos])
+        # Se nenhum filtro foi passado, retorna a lista simples de todos os alunos,
+        # serializada direto das linhas do SELECT (sem instanciar objetos Aluno).
+        alunos = db.session.execute(select(*colunas).order_by(Aluno.id))
+        return jsonify(registros_de_linhas(alunos))
+
+
+def consulta_de_alunos(campos):
+    """
+    SELECT ORM dos alunos com só as colunas de 'fields' (busca por ids e
+    paginação), o mesmo no modo asyncio (app/assincrono/rotas.py).
+    """
+    return select(Aluno).options(*carregar_apenas(Aluno, campos))
+
+
+# Mensagens dos conflitos de inscrição (409)
+MENSAGENS_DE_CONFLITO = {
+    EMAIL_DUPLICADO: "O email '{email}' já está cadastrado.",
+    TURMA_LOTADA: "Esta turma já atingiu o limite de vagas.",
+    INSCRITO_EM_OUTRA_TURMA: "O email '{email}' já está inscrito em outra turma.",
+}
+
+
+def _ler_modo():
+    modo = request.args.get('modo', MODO_CRIAR)
+    if modo not in MODOS:
+        raise ParametroInvalido(f"O parâmetro 'modo' deve ser um de: {', '.join(MODOS)}.")
+    return modo
 
 
 @alunos_bp.route('/', methods=['POST'])
+@idempotente()
 def create_aluno():
     """
     Cria um novo aluno e o associa a uma TURMA específica.
+    Com '?modo=upsert', reenviar um aluno já inscrito na mesma turma
+    atualiza 'nome' e 'pago' (200) em vez de responder 409.
     """
     dados = request.get_json()
 
     if not dados or 'nome' not in dados or 'email' not in dados or 'turma_id' not in dados:
         return jsonify({"erro": "Dados incompletos. 'nome', 'email' e 'turma_id' são obrigatórios."}), 400
+    try:
+        modo = _ler_modo()
+    except ParametroInvalido as e:
+        return jsonify({"erro": str(e)}), 400
 
     # 1. Receber o ID da turma
     turma_id = dados.get('turma_id')
+    valores = {
+        'nome': dados['nome'],
+        'email': dados['email'],
+        'turma_id': turma_id,
+        'pago': dados.get('pago', False)
+    }
 
-    # 2. Validar se a turma existe
-    turma_existente = Turma.query.get(turma_id)
-    if not turma_existente:
-        return jsonify({"erro": f"A turma com ID {turma_id} não foi encontrada."}), 404
-        #
+    try:
+        # 2. Gravar o aluno: um INSERT ... SELECT ... WHERE EXISTS valida a
+        #    turma e grava na mesma instrução; e-mail repetido é tratado pelo
+        #    ON CONFLICT, sem exceção. A vaga é reservada na mesma transação.
+        resultado, aluno = inscrever_aluno(valores, modo)
+        if resultado in (CRIADO, ATUALIZADO):
+            db.session.commit()
+            return jsonify(aluno._asdict()), 201 if resultado == CRIADO else 200
+
+        db.session.rollback()
+        if resultado == TURMA_NAO_ENCONTRADA:
+            return jsonify({"erro": f"A turma com ID {turma_id} não foi encontrada."}), 404
 
-    # 3. Validação extra (opcional, mas recomendada): Verificar se a turma não está cheia
-    # if len(turma_existente.alunos) >= turma_existente.limite_vagas:
-    #     return jsonify({"erro": "Esta turma já atingiu o limite de vagas."}), 409 # Conflict
+        # 3. Conflito tipado: o cliente sabe o motivo sem interpretar a mensagem
+        conflito = {"erro": MENSAGENS_DE_CONFLITO[resultado].format(email=dados['email']),
+                    "conflito": resultado}
+        if aluno is not None:
+            conflito.update({"aluno_id": aluno.id, "turma_id": aluno.turma_id})
+        return jsonify(conflito), 409  # Conflict
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"erro": f"Não foi possível criar o aluno: {str(e)}"}), 500
 
-    try:
-        # 4. Criar o Objeto Aluno associado à turma
-        novo_aluno = Aluno(
-            nome=dados['nome'],
-            email=dados['email'],
-            turma_id=turma_id,
-            pago=dados.get('pago', False)
-        )
 
-        db.session.add(novo_aluno)
-        db.session.commit()
+@alunos_bp.route('/bulk', methods=['POST'])
+@idempotente(conferir_corpo=False)
+def create_alunos_em_lote():
+    """
+    Inscreve muitos alunos de uma vez a partir de um CSV (text/csv, com
+    cabeçalho nome,email,turma_id,pago) ou NDJSON (application/x-ndjson,
+    um objeto por linha).
+
+    O corpo é lido em streaming e gravado em lotes; a resposta é um
+    relatório com o total inserido e os erros por linha. Com '?modo=upsert'
+    os alunos já inscritos na mesma turma são atualizados (reenvio).
+    """
+    tipo = request.mimetype
+    if tipo == 'text/csv':
+        formato = FORMATO_CSV
+    elif tipo in ('application/x-ndjson', 'application/jsonl'):
+        formato = FORMATO_NDJSON
+    else:
+        return jsonify({"erro": "Envie o arquivo como 'text/csv' ou 'application/x-ndjson'."}), 415
 
-        return jsonify(novo_aluno.to_dict()), 201
+    try:
+        modo = _ler_modo()
+    except ParametroInvalido as e:
+        return jsonify({"erro": str(e)}), 400
 
+    try:
+        relatorio = importar_alunos(ler_linhas(request.stream, formato), modo=modo)
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({"erro": "O arquivo deve estar codificado em UTF-8."}), 400
     except Exception as e:
         db.session.rollback()
-        # Verificar se o erro é de violação de unicidade (email duplicado)
-        if 'UNIQUE constraint failed' in str(e) or 'duplicate key value' in str(e):
-            return jsonify({"erro": f"O email '{dados['email']}' já está cadastrado."}), 409
+        return jsonify({"erro": f"Não foi possível importar os alunos: {str(e)}"}), 500
 
-        return jsonify({"erro": f"Não foi possível criar o aluno: {str(e)}"}), 500
+    return jsonify(relatorio.to_dict()), 200
 
 
 @alunos_bp.route('/<int:aluno_id>', methods=['PUT'])
@@ -111,6 +238,7 @@ def update_aluno(aluno_id):
         aluno.email = dados['email']
     if 'pago' in dados:
         aluno.pago = dados['pago']
+        marcar_turmas_alteradas(aluno.turma_id)
 
     db.session.commit()
 
@@ -124,6 +252,8 @@ def delete_aluno(aluno_id):
         return jsonify({"erro": "Aluno não encontrado"}), 404
 
     db.session.delete(aluno)
+    liberar_vagas(aluno.turma_id)
+    marcar_turmas_alteradas(aluno.turma_id)
     db.session.commit()
 
     return jsonify({"mensagem": "Aluno excluído com sucesso"}), 200
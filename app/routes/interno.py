@@ -0,0 +1,58 @@
+from flask import Blueprint, jsonify, request
+
+from app.database import db, estatisticas_do_pool
+from app.utils.cache import cache_catalogo
+from app.utils.consultas_lentas import consultas_lentas
+from app.utils.replicas import roteador_de_replicas
+
+# Rotas internas de diagnóstico (não expor publicamente no proxy)
+interno_bp = Blueprint('interno', __name__, url_prefix='/interno')
+
+
+@interno_bp.route('/cache', methods=['GET'])
+def obter_estatisticas_cache():
+    """
+    Retorna os contadores do cache do catálogo deste worker
+    (acertos, falhas, expirados, descartados e invalidações).
+    """
+    return jsonify({"catalogo": cache_catalogo.estatisticas()})
+
+
+@interno_bp.route('/pool', methods=['GET'])
+def obter_estatisticas_pool():
+    """
+    Retorna o estado do pool de conexões deste worker (conexões em uso,
+    ociosas, overflow) e o tempo de espera acumulado por uma conexão.
+    """
+    return jsonify(estatisticas_do_pool(db.engine))
+
+
+@interno_bp.route('/replicas', methods=['GET'])
+def obter_estatisticas_replicas():
+    """
+    Retorna, para cada réplica de leitura configurada, se está no rodízio,
+    quantas leituras recebeu e quantas falhas de conexão teve neste worker.
+    """
+    return jsonify(roteador_de_replicas.estatisticas())
+
+
+@interno_bp.route('/consultas-lentas', methods=['GET'])
+def listar_consultas_lentas():
+    """
+    Lista as últimas consultas lentas registradas por este worker (da mais
+    recente para a mais antiga), com a rota de origem e o plano de execução.
+    Aceita 'endpoint' para filtrar e 'limit' para limitar a quantidade.
+    """
+    limite = request.args.get('limit', type=int)
+    endpoint = request.args.get('endpoint')
+
+    registros = consultas_lentas.listar()
+    if endpoint:
+        registros = [r for r in registros if r['endpoint'] == endpoint]
+    if limite:
+        registros = registros[:limite]
+
+    return jsonify({
+        "limiar_ms": consultas_lentas.limiar * 1000,
+        "consultas": registros
+    })
@@ -0,0 +1,85 @@
+from flask import Blueprint, jsonify, request, send_file, url_for
+
+from app.database import db
+from app.models.jobs import CONCLUIDO, Job
+from app.services.jobs import (
+    EXTENSAO_GZIP, TIPOS_DE_ARQUIVO, JobInvalido, executor_de_jobs, validar_job)
+from app.utils.compressao import aceita_gzip
+from app.utils.idempotencia import idempotente
+
+# Tarefas pesadas (exportações e relatórios) executadas fora da requisição
+jobs_bp = Blueprint('jobs', __name__, url_prefix='/jobs')
+
+
+def _job_com_links(job):
+    dados = job.to_dict()
+    dados['url'] = url_for('jobs.obter_job', job_id=job.id)
+    if job.status == CONCLUIDO:
+        dados['resultado'] = url_for('jobs.baixar_resultado_job', job_id=job.id)
+    return dados
+
+
+@jobs_bp.route('', methods=['POST'])
+@idempotente()
+def criar_job():
+    """
+    Cria um job e o coloca na fila, respondendo 202 sem esperar o término:
+    {"tipo": "exportar_alunos", "parametros": {"formato": "csv", "turma_id": 1}}
+
+    O andamento é acompanhado em GET /jobs/<id>.
+    """
+    dados = request.get_json(silent=True)
+    if not dados or 'tipo' not in dados:
+        return jsonify({"erro": "O campo 'tipo' é obrigatório."}), 400
+
+    try:
+        parametros = validar_job(dados['tipo'], dados.get('parametros'))
+    except JobInvalido as e:
+        return jsonify({"erro": str(e)}), 400
+
+    try:
+        job = Job(tipo=dados['tipo'], parametros=parametros)
+        db.session.add(job)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"erro": f"Não foi possível criar o job: {str(e)}"}), 500
+
+    executor_de_jobs.enviar(job.id)
+    db.session.refresh(job)
+
+    resposta = jsonify(_job_com_links(job))
+    resposta.headers['Location'] = url_for('jobs.obter_job', job_id=job.id)
+    return resposta, 202
+
+
+@jobs_bp.route('/<string:job_id>', methods=['GET'])
+def obter_job(job_id):
+    """Retorna o status e o progresso (0-100) do job."""
+    job = db.session.get(Job, job_id)
+    if not job:
+        return jsonify({"erro": "Job não encontrado"}), 404
+    return jsonify(_job_com_links(job))
+
+
+@jobs_bp.route('/<string:job_id>/resultado', methods=['GET'])
+def baixar_resultado_job(job_id):
+    """Baixa o arquivo gerado pelo job, quando ele estiver concluído."""
+    job = db.session.get(Job, job_id)
+    if not job:
+        return jsonify({"erro": "Job não encontrado"}), 404
+    if job.status != CONCLUIDO:
+        return jsonify({"erro": f"O job ainda não foi concluído (status: {job.status})."}), 409
+
+    # Clientes que aceitam gzip recebem a cópia comprimida gravada pelo job
+    extensao = job.arquivo.rsplit('.', 1)[-1]
+    caminho = executor_de_jobs.caminho_do_resultado(job, comprimido=aceita_gzip(request))
+    resposta = send_file(
+        caminho,
+        mimetype=TIPOS_DE_ARQUIVO.get(extensao),
+        as_attachment=True,
+        download_name=f'{job.tipo}.{extensao}')
+    if caminho.endswith(EXTENSAO_GZIP):
+        resposta.headers['Content-Encoding'] = 'gzip'
+    resposta.vary.add('Accept-Encoding')
+    return resposta
@@ -0,0 +1,14 @@
+from flask import Blueprint, Response
+
+from app.utils.metricas import metricas
+
+metricas_bp = Blueprint('metricas', __name__)
+
+
+@metricas_bp.route('/metrics', methods=['GET'])
+def exportar_metricas():
+    """
+    Exporta as métricas deste worker no formato texto do Prometheus:
+    latência, tempo de banco e instruções SQL por rota.
+    """
+    return Response(metricas.exportar(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,58 @@
+from flask import Blueprint, jsonify, request
+
+from app.database import db
+from app.services.relatorios import (
+    AGRUPAMENTOS, atualizar_relatorios, reconstruir_relatorios, relatorio_de_inscricoes)
+from app.utils.idempotencia import idempotente
+
+# Relatórios gerenciais de inscrições (pagos x não pagos)
+relatorios_bp = Blueprint('relatorios', __name__, url_prefix='/relatorios')
+
+
+@relatorios_bp.route('/inscricoes', methods=['GET'])
+def obter_relatorio_inscricoes():
+    """
+    Alunos pagos e não pagos agrupados por vendor, treinamento ou mês de
+    início da turma. Exemplos de uso:
+    - /relatorios/inscricoes?agrupar_por=vendor
+    - /relatorios/inscricoes?agrupar_por=mes&ano=2025
+    - /relatorios/inscricoes?agrupar_por=treinamento&vendor=TechCorp
+
+    Os números vêm da tabela agregada; antes de ler, as turmas alteradas
+    desde a última leitura são recalculadas.
+    """
+    agrupar_por = request.args.get('agrupar_por', 'vendor')
+    if agrupar_por not in AGRUPAMENTOS:
+        return jsonify({"erro": f"'agrupar_por' deve ser um de: {', '.join(AGRUPAMENTOS)}."}), 400
+
+    ano = request.args.get('ano')
+    if ano is not None:
+        if not ano.isdigit():
+            return jsonify({"erro": "O parâmetro 'ano' deve ser um número."}), 400
+        ano = int(ano)
+
+    try:
+        if atualizar_relatorios():
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"erro": f"Não foi possível atualizar os relatórios: {str(e)}"}), 500
+
+    return jsonify(relatorio_de_inscricoes(agrupar_por, ano=ano, vendor=request.args.get('vendor')))
+
+
+@relatorios_bp.route('/atualizar', methods=['POST'])
+@idempotente()
+def reconstruir_relatorio_inscricoes():
+    """
+    Recalcula a tabela agregada inteira a partir de alunos, turmas e
+    treinamentos (ex: depois de uma carga feita direto no banco).
+    """
+    try:
+        linhas = reconstruir_relatorios()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"erro": f"Não foi possível reconstruir os relatórios: {str(e)}"}), 500
+
+    return jsonify({"linhas": linhas}), 200
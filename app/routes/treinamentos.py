@@ -1,11 +1,29 @@
 from flask import Blueprint, jsonify, request
-from datetime import datetime
+from datetime import date, datetime
 from app import db
-from sqlalchemy import extract
+from sqlalchemy import extract, func, select, update
+from sqlalchemy.orm import joinedload
 
 # Importa os modelos necessários
 from app.models.treinamentos import Treinamento
 from app.models.turmas import Turma
+from app.services.agendamento import (
+    AgendamentoInvalido, expandir_recorrencia, inserir_turmas, ler_limite_vagas,
+    ler_lista_de_turmas, treinamentos_inexistentes)
+from app.services.relatorios import marcar_turmas_alteradas
+from app.services.resumo import MAXIMO_TURMAS_POR_RESUMO, resumos_por_turma
+from app.services.busca_instrutor import (
+    LIMITE_MAXIMO as LIMITE_BUSCA_MAXIMO, LIMITE_PADRAO as LIMITE_BUSCA_PADRAO,
+    buscar_por_instrutor)
+from app.utils.etag import AGENDA, CATALOGO, etag_por_versao, registrar_alteracao, versao_lida
+from app.utils.campos import carregar_apenas, colunas_dos_campos, ler_campos, projetar
+from app.utils.exportacao import exportar, formato_de_exportacao
+from app.utils.serializacao import registros_de_linhas
+from app.utils.cache import cache_catalogo
+from app.utils.idempotencia import idempotente
+from app.utils.consultas import MAXIMO_IDS_POR_CONSULTA, buscar_por_ids, orcamento_de_consultas
+from app.utils.parametros import ParametroInvalido, ler_lista_de_ids
+from app.utils.paginacao import CursorInvalido, paginacao_solicitada, paginar_por_chave
 
 # Criação do blueprint
 treinamentos_bp = Blueprint(
@@ -31,27 +49,90 @@ treinamentos_bp = Blueprint(
 
 
 @treinamentos_bp.route('', methods=['GET'])
+@etag_por_versao(CATALOGO)
+@orcamento_de_consultas(1)
 def obter_treinamentos():
-    """Obtém todos os treinamentos do CATÁLOGO."""
-    treinamentos = Treinamento.query.order_by(
-        Treinamento.nome_treinamento).all()
-    return jsonify([t.to_dict() for t in treinamentos])
+    """
+    Obtém todos os treinamentos do CATÁLOGO.
+    Com 'limit' e/ou 'cursor' na URL a resposta é paginada por
+    (nome_treinamento, id) e inclui o 'next_cursor' da próxima página.
+    Com 'fields=id,nome_treinamento' devolve apenas esses campos.
+    """
+    try:
+        campos = ler_campos(request.args, Treinamento)
+    except ParametroInvalido as e:
+        return jsonify({"erro": str(e)}), 400
+
+    if paginacao_solicitada(request.args):
+        try:
+            treinamentos, next_cursor = paginar_por_chave(
+                *paginacao_do_catalogo(campos), request.args)
+        except CursorInvalido as e:
+            return jsonify({"erro": str(e)}), 400
+
+        return jsonify({
+            "itens": [t.to_dict(campos) for t in treinamentos],
+            "next_cursor": next_cursor
+        })
+
+    # O catálogo completo fica em cache com todos os campos; 'fields' só
+    # recorta a resposta, sem criar uma entrada de cache por combinação.
+    # A chave inclui a versão do catálogo que deu origem ao ETag.
+    chave = chave_do_catalogo(versao_lida(CATALOGO))
+    treinamentos = cache_catalogo.obter_ou_calcular(chave, lambda: [
+        t.to_dict() for t in db.session.scalars(consulta_do_catalogo())
+    ])
+    return jsonify(projetar(treinamentos, campos))
+
+
+# Consultas do catálogo, as mesmas no modo asyncio (app/assincrono/rotas.py)
+
+def paginacao_do_catalogo(campos):
+    """Consulta e chave da paginação do catálogo, por (nome_treinamento, id)."""
+    return (select(Treinamento).options(
+                *carregar_apenas(Treinamento, campos, Treinamento.nome_treinamento)),
+            [Treinamento.nome_treinamento, Treinamento.id])
+
+
+def consulta_do_catalogo(vendor=None):
+    """Treinamentos do catálogo: todos, por nome, ou só os de um vendor."""
+    if vendor is None:
+        return select(Treinamento).order_by(Treinamento.nome_treinamento)
+    return select(Treinamento).filter_by(vendor=vendor)
+
+
+def chave_do_catalogo(versao, vendor=None):
+    """Chave no cache_catalogo da consulta_do_catalogo, na versão lida do catálogo."""
+    return ('todos', versao) if vendor is None else ('vendor', vendor, versao)
 
 
 @treinamentos_bp.route('/instrutor/<string:nome_instrutor>', methods=['GET'])
+@etag_por_versao(CATALOGO)
+@orcamento_de_consultas(1)
 def obter_treinamentos_por_instrutor(nome_instrutor):
     """
     Obtém os treinamentos do CATÁLOGO filtrados por um instrutor específico.
+    A busca ignora maiúsculas e acentos ("Joao" encontra "João"), ordena pela
+    semelhança com o nome e aceita 'limit' na URL (padrão 20, máximo 100)
+    e 'fields' para devolver só alguns campos.
     """
-    # A busca é case-insensitive para melhorar a experiência do usuário
-    treinamentos = Treinamento.query.filter(
-        Treinamento.instrutor_sugerido.ilike(f"%{nome_instrutor}%")
-    ).all()
+    try:
+        campos = ler_campos(request.args, Treinamento)
+    except ParametroInvalido as e:
+        return jsonify({"erro": str(e)}), 400
+
+    limite = request.args.get('limit', LIMITE_BUSCA_PADRAO, type=int)
+    if not 1 <= limite <= LIMITE_BUSCA_MAXIMO:
+        return jsonify({"erro": f"O valor para 'limit' deve ser entre 1 e {LIMITE_BUSCA_MAXIMO}."}), 400
+
+    treinamentos = cache_catalogo.obter_ou_calcular(
+        ('instrutor', nome_instrutor, limite, versao_lida(CATALOGO)),
+        lambda: [t.to_dict() for t in buscar_por_instrutor(nome_instrutor, limite)])
 
     if not treinamentos:
         return jsonify({"mensagem": "Nenhum treinamento encontrado para este instrutor"}), 404
 
-    return jsonify([t.to_dict() for t in treinamentos])
+    return jsonify(projetar(treinamentos, campos))
 
 
 @treinamentos_bp.route('', methods=['DELETE'])
@@ -91,7 +172,9 @@ def remover_treinamento_catalogo():
     try:
         # Passo 4: Remoção
         db.session.delete(treinamento)
+        registrar_alteracao(CATALOGO)
         db.session.commit()
+        cache_catalogo.invalidar()
         return jsonify({"mensagem": f"Treinamento '{treinamento.nome_treinamento}' removido com sucesso."}), 200
 
     except Exception as e:
@@ -100,6 +183,7 @@ def remover_treinamento_catalogo():
 
 
 @treinamentos_bp.route('', methods=['POST'])
+@idempotente()
 def criar_treinamento_catalogo():
     """
     Cria um novo TREINAMENTO no catálogo.
@@ -124,7 +208,9 @@ def criar_treinamento_catalogo():
 
         # Adiciona e salva no banco de dados
         db.session.add(novo_treinamento)
+        registrar_alteracao(CATALOGO)
         db.session.commit()
+        cache_catalogo.invalidar()
 
         # Retorna o objeto criado com o status 201 Created
         return jsonify(novo_treinamento.to_dict()), 201
@@ -135,19 +221,156 @@ def criar_treinamento_catalogo():
 
 
 @treinamentos_bp.route('/<string:vendor>', methods=['GET'])
+@etag_por_versao(CATALOGO)
+@orcamento_de_consultas(1)
 def obter_treinamentos_por_vendor(vendor):
     """
-    Obtém os treinamentos do CATÁLOGO filtrados por um vendor.
+    Obtém os treinamentos do CATÁLOGO filtrados por um vendor
+    (aceita 'fields' para devolver só alguns campos).
     """
-    treinamentos = Treinamento.query.filter_by(vendor=vendor).all()
+    try:
+        campos = ler_campos(request.args, Treinamento)
+    except ParametroInvalido as e:
+        return jsonify({"erro": str(e)}), 400
+
+    chave = chave_do_catalogo(versao_lida(CATALOGO), vendor)
+    treinamentos = cache_catalogo.obter_ou_calcular(chave, lambda: [
+        t.to_dict() for t in db.session.scalars(consulta_do_catalogo(vendor))
+    ])
     if not treinamentos:
         return jsonify({"mensagem": "Nenhum treinamento encontrado para este vendor"}), 404
-    return jsonify([t.to_dict() for t in treinamentos])
+    return jsonify(projetar(treinamentos, campos))
 
 
 # --- Rotas de TURMAS (Agendamentos) ---
 
+# Limites aceitos para o filtro 'ano' (o intervalo precisa caber em um date)
+ANO_MINIMO = 1
+ANO_MAXIMO = 9998
+
+
+def _intervalo_de_datas(ano, mes=None):
+    """
+    Converte 'ano' (e opcionalmente 'mes') no intervalo semiaberto
+    [inicio, fim) de datas correspondente.
+    """
+    if not mes:
+        return date(ano, 1, 1), date(ano + 1, 1, 1)
+    if mes == 12:
+        return date(ano, 12, 1), date(ano + 1, 1, 1)
+    return date(ano, mes, 1), date(ano, mes + 1, 1)
+
+
+def filtros_de_agendados(mes=None, ano=None):
+    """
+    Filtros das turmas agendadas: data de início futura e, se informados,
+    o mês e/ou o ano. Levanta ParametroInvalido se estiverem fora da faixa.
+    """
+    # Filtro base: sempre filtra por turmas com data futura
+    filtros = [Turma.data_inicio >= datetime.today().date()]
+
+    # Valida o MÊS e o ANO, se foram fornecidos
+    if mes and not 1 <= mes <= 12:
+        raise ParametroInvalido("O valor para 'mes' deve ser entre 1 e 12.")
+    if ano and not ANO_MINIMO <= ano <= ANO_MAXIMO:
+        raise ParametroInvalido(f"O valor para 'ano' deve ser entre {ANO_MINIMO} e {ANO_MAXIMO}.")
+
+    if ano:
+        # Com o ano conhecido, o filtro vira um intervalo semiaberto
+        # [inicio, fim) sobre a própria coluna, que usa o índice
+        # ix_turmas_data_inicio_status (extract() não usa índice).
+        inicio, fim = _intervalo_de_datas(ano, mes)
+        filtros += [Turma.data_inicio >= inicio, Turma.data_inicio < fim]
+    elif mes:
+        # Mês de qualquer ano não vira um único intervalo. A busca já está
+        # limitada às turmas futuras pelo índice, então o extract() só
+        # filtra essas linhas, e não a tabela inteira.
+        filtros.append(extract('month', Turma.data_inicio) == mes)
+    return filtros
+
+
+def versao_das_vagas(args):
+    """
+    Par ('vagas', soma de Turma.versao_vagas) das turmas que /agendados
+    devolve para estes parâmetros, lido junto com as versões do ETag. Cada
+    reserva ou liberação de vaga incrementa a versão da própria turma, então
+    a soma muda quando o 'vagas_ocupadas' de uma turma listada muda, e só o
+    ETag das listagens que incluem a turma é invalidado. Parâmetros inválidos
+    (resposta 400, sem ETag) somam todas as turmas.
+    """
+    try:
+        if 'ids' in args:
+            filtros = [Turma.id.in_(ler_lista_de_ids(args['ids'], MAXIMO_IDS_POR_CONSULTA))]
+        else:
+            filtros = filtros_de_agendados(args.get('mes', type=int), args.get('ano', type=int))
+    except ParametroInvalido:
+        filtros = []
+    soma = select(func.coalesce(func.sum(Turma.versao_vagas), 0)).where(*filtros)
+    return [('vagas', soma.scalar_subquery())]
+
+
+def consulta_de_turmas(campos, filtros, com_id=False):
+    """
+    SELECT Core das colunas da turma pedidas em 'campos' (todas, se None),
+    sem criar objetos do ORM. O JOIN com treinamentos só entra quando
+    'treinamento_info' é devolvido; 'com_id' garante a coluna id (resumo).
+    """
+    campos = campos or Turma.CAMPOS
+    colunas = colunas_dos_campos(Turma, campos)
+    if com_id and 'id' not in campos:
+        colunas.insert(0, Turma.id)
+
+    if 'treinamento_info' not in campos:
+        consulta = select(*colunas)
+    else:
+        if 'treinamento_id' not in campos:
+            colunas.append(Turma.treinamento_id)
+        consulta = select(*colunas, Treinamento.nome_treinamento, Treinamento.vendor,
+                          Treinamento.instrutor_sugerido).join(Treinamento)
+    return consulta.where(*filtros).order_by(Turma.data_inicio, Turma.id)
+
+
+def montar_turma(campos):
+    """
+    Função que converte uma linha de consulta_de_turmas no mesmo formato do
+    Turma.to_dict(campos). As datas ficam como date: o provider JSON as
+    codifica em ISO 8601.
+    """
+    campos = campos or Turma.CAMPOS
+    colunas = [campo for campo in campos if campo != 'treinamento_info']
+    com_info = 'treinamento_info' in campos
+
+    def montar(linha):
+        mapeamento = linha._mapping
+        dados = {campo: mapeamento[campo] for campo in colunas}
+        if com_info:
+            dados['treinamento_info'] = {
+                'id': linha.treinamento_id,
+                'nome_treinamento': linha.nome_treinamento,
+                'vendor': linha.vendor,
+                'instrutor_sugerido': linha.instrutor_sugerido
+            }
+        return dados
+    return montar
+
+
+def consulta_de_turmas_por_id(campos):
+    """
+    SELECT ORM das turmas para a busca por ids: load_only das colunas
+    pedidas em 'fields' e, só se 'treinamento_info' for devolvido, o
+    treinamento no mesmo SELECT (joinedload), pois o backref é lazy (N+1).
+    """
+    opcoes = carregar_apenas(Turma, campos)
+    if campos is None or 'treinamento_info' in campos:
+        opcoes.append(joinedload(Turma.treinamento))
+    return select(Turma).options(*opcoes)
+
+
 @treinamentos_bp.route('/agendados', methods=['GET'])
+@etag_por_versao(CATALOGO, AGENDA, varia_por_dia=True,
+                 ignorar_se=lambda req: req.args.get('incluir') == 'resumo',
+                 adicionais=lambda req: versao_das_vagas(req.args))
+@orcamento_de_consultas(2)
 def obter_treinamentos_agendados():
     """
     Obtém todas as TURMAS com data de início futura.
@@ -156,37 +379,63 @@ def obter_treinamentos_agendados():
     - /agendados (retorna todas as turmas futuras)
     - /agendados?mes=11 (retorna turmas futuras de Novembro de qualquer ano)
     - /agendados?mes=11&ano=2025 (retorna turmas futuras de Novembro de 2025)
+    - /agendados?incluir=resumo (adiciona o resumo de inscritos/pagos de cada turma)
+    - /agendados?ids=3,1,2 (retorna essas turmas, futuras ou não, na ordem pedida)
+    - /agendados?fields=id,data_inicio,status (busca e devolve só esses campos)
+    Com 'Accept: application/x-ndjson' ou 'text/csv' a lista é exportada em streaming.
     """
+    try:
+        campos = ler_campos(request.args, Turma)
+    except ParametroInvalido as e:
+        return jsonify({"erro": str(e)}), 400
+
+    # Busca em lote por id: uma consulta IN no lugar de uma requisição por turma
+    if 'ids' in request.args:
+        try:
+            ids = ler_lista_de_ids(request.args['ids'], MAXIMO_IDS_POR_CONSULTA)
+        except ParametroInvalido as e:
+            return jsonify({"erro": str(e)}), 400
+
+        encontradas = buscar_por_ids(consulta_de_turmas_por_id(campos), Turma.id, ids)
+        return jsonify({
+            "itens": [encontradas[i].to_dict(campos) for i in ids if i in encontradas],
+            "missing": [i for i in ids if i not in encontradas]
+        })
 
     # 1. Obter os parâmetros opcionais da URL
     mes_filtro = request.args.get('mes', type=int)
     ano_filtro = request.args.get('ano', type=int)
-    hoje = datetime.today().date()
 
     try:
-        # 2. Inicia a query base: sempre filtra por turmas com data futura
-        query = Turma.query.filter(Turma.data_inicio >= hoje)
-
-        # 3. Adiciona o filtro de MÊS, se ele foi fornecido
-        if mes_filtro:
-            # Validação para garantir que o mês é um valor válido
-            if not 1 <= mes_filtro <= 12:
-                return jsonify({"erro": "O valor para 'mes' deve ser entre 1 e 12."}), 400
-            # Adiciona o filtro de mês à query existente
-            query = query.filter(
-                extract('month', Turma.data_inicio) == mes_filtro)
-
-        # 4. Adiciona o filtro de ANO, se ele foi fornecido
-        if ano_filtro:
-            # Adiciona o filtro de ano à query existente
-            query = query.filter(
-                extract('year', Turma.data_inicio) == ano_filtro)
-
-        # 5. Executa a query final (com ou sem os filtros opcionais) e ordena o resultado
-        turmas_agendadas = query.order_by(Turma.data_inicio).all()
-
-        # 6. Retorna a lista de turmas encontradas
-        return jsonify([turma.to_dict() for turma in turmas_agendadas])
+        # 2 a 4. Turmas futuras, com o mês e o ano validados (ver filtros_de_agendados)
+        try:
+            filtros = filtros_de_agendados(mes_filtro, ano_filtro)
+        except ParametroInvalido as e:
+            return jsonify({"erro": str(e)}), 400
+
+        # 5. Exportação em streaming (Accept: application/x-ndjson ou text/csv)
+        formato = formato_de_exportacao(request)
+        if formato:
+            return exportar(consulta_de_turmas(campos, filtros), formato, 'turmas',
+                            montar_turma(campos))
+
+        # 6. Executa a query final (com ou sem os filtros opcionais) e ordena o resultado.
+        #    As linhas vêm direto do SELECT Core, só com as colunas pedidas em
+        #    'fields', sem instanciar objetos Turma (ver consulta_de_turmas).
+        incluir_resumo = request.args.get('incluir') == 'resumo'
+        linhas = db.session.execute(
+            consulta_de_turmas(campos, filtros, com_id=incluir_resumo)).all()
+
+        # 7. Retorna a lista de turmas encontradas
+        resultado = registros_de_linhas(linhas, montar_turma(campos))
+
+        # 8. Resumo de inscritos: uma única consulta agrupada para todas as turmas
+        if incluir_resumo:
+            resumos = resumos_por_turma([linha.id for linha in linhas])
+            for linha, dados in zip(linhas, resultado):
+                dados['resumo'] = resumos.get(linha.id)
+
+        return jsonify(resultado)
 
     except Exception as e:
         return jsonify({"erro": f"Ocorreu um erro ao processar a requisição: {str(e)}"}), 500
@@ -217,7 +466,40 @@ def get_alunos():
 '''
 
 
+@treinamentos_bp.route('/agendados/<int:turma_id>/resumo', methods=['GET'])
+@orcamento_de_consultas(1)
+def obter_resumo_turma(turma_id):
+    """
+    Retorna o total de alunos inscritos na TURMA e quantos já pagaram,
+    sem listar os alunos.
+    """
+    resumo = resumos_por_turma([turma_id]).get(turma_id)
+    if resumo is None:
+        return jsonify({"erro": "Turma não encontrada"}), 404
+    return jsonify(resumo)
+
+
+@treinamentos_bp.route('/agendados/resumo', methods=['GET'])
+@orcamento_de_consultas(1)
+def obter_resumos_turmas():
+    """
+    Versão em lote do resumo: /agendados/resumo?ids=1,2,3.
+    Os resumos seguem a ordem dos ids pedidos; ids sem turma vão para 'nao_encontradas'.
+    """
+    try:
+        ids = ler_lista_de_ids(request.args.get('ids'), MAXIMO_TURMAS_POR_RESUMO)
+    except ParametroInvalido as e:
+        return jsonify({"erro": str(e)}), 400
+
+    resumos = resumos_por_turma(ids)
+    return jsonify({
+        "resumos": [resumos[i] for i in ids if i in resumos],
+        "nao_encontradas": [i for i in ids if i not in resumos]
+    })
+
+
 @treinamentos_bp.route('/agendados', methods=['POST'])
+@idempotente()
 def agendar_treinamento():
     """
     Cria uma nova TURMA (agenda um treinamento do catálogo).
@@ -226,6 +508,11 @@ def agendar_treinamento():
     if not dados:
         return jsonify({"erro": "Corpo da requisição não pode ser vazio"}), 400
 
+    try:
+        limite_vagas = ler_limite_vagas(dados.get('limite_vagas'), "Turma")
+    except AgendamentoInvalido as e:
+        return jsonify({"erro": str(e)}), 400
+
     try:
         treinamento_id = dados['treinamento_id']
         data_inicio_str = dados['data_inicio']
@@ -239,10 +526,12 @@ def agendar_treinamento():
             data_inicio=datetime.fromisoformat(data_inicio_str).date(),
             horario=dados.get('horario'),
             local=dados.get('local'),
-            status=dados.get('status', 'Agendada')
+            status=dados.get('status', 'Agendada'),
+            limite_vagas=limite_vagas
         )
 
         db.session.add(nova_turma)
+        registrar_alteracao(AGENDA)
         db.session.commit()
 
         return jsonify(nova_turma.to_dict()), 201
@@ -254,10 +543,59 @@ def agendar_treinamento():
         return jsonify({"erro": f"Ocorreu um erro: {str(e)}"}), 500
 
 
+@treinamentos_bp.route('/agendados/lote', methods=['POST'])
+@idempotente()
+def agendar_treinamentos_em_lote():
+    """
+    Cria várias TURMAS em uma única transação, a partir de uma lista explícita
+    ('turmas') ou de uma regra de recorrência ('recorrencia'), por exemplo:
+
+    {"recorrencia": {"treinamento_id": 1, "dias_da_semana": ["segunda"],
+                     "inicio": "2026-03-01", "fim": "2026-06-30",
+                     "horario": "09:00 - 17:00", "local": "Sala 1"}}
+    """
+    dados = request.get_json(silent=True)
+    if not dados:
+        return jsonify({"erro": "Corpo da requisição não pode ser vazio"}), 400
+    if ('turmas' in dados) == ('recorrencia' in dados):
+        return jsonify({"erro": "Informe 'turmas' ou 'recorrencia' (apenas um dos dois)."}), 400
+
+    try:
+        if 'recorrencia' in dados:
+            if not isinstance(dados['recorrencia'], dict):
+                return jsonify({"erro": "'recorrencia' deve ser um objeto."}), 400
+            turmas = expandir_recorrencia(dados['recorrencia'])
+        else:
+            turmas = ler_lista_de_turmas(dados['turmas'])
+    except AgendamentoInvalido as e:
+        return jsonify({"erro": str(e)}), 400
+
+    if not turmas:
+        return jsonify({"erro": "A recorrência não gera nenhuma turma no período informado."}), 400
+
+    inexistentes = treinamentos_inexistentes(turmas)
+    if inexistentes:
+        return jsonify({
+            "erro": "Há treinamentos que não existem no catálogo.",
+            "treinamentos_inexistentes": inexistentes
+        }), 404
+
+    try:
+        ids = inserir_turmas(turmas)
+        registrar_alteracao(AGENDA)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"erro": f"Ocorreu um erro ao agendar as turmas: {str(e)}"}), 500
+
+    return jsonify({"criadas": len(ids), "ids": ids}), 201
+
+
 @treinamentos_bp.route('/agendados/<int:turma_id>', methods=['PUT'])
 def atualizar_treinamento_agendado(turma_id):
     """
     Atualiza uma TURMA existente (ex: para cancelar).
+    'limite_vagas' não pode ficar abaixo das vagas já ocupadas (409).
     """
     turma_para_atualizar = Turma.query.get(turma_id)
 
@@ -267,17 +605,42 @@ def atualizar_treinamento_agendado(turma_id):
     dados = request.get_json()
     if not dados:
         return jsonify({"erro": "Corpo da requisição não pode ser vazio"}), 400
+    try:
+        limite_vagas = ler_limite_vagas(dados.get('limite_vagas'), "Turma")
+    except AgendamentoInvalido as e:
+        return jsonify({"erro": str(e)}), 400
 
     if 'status' in dados:
         turma_para_atualizar.status = dados['status']
     if 'data_inicio' in dados:
         turma_para_atualizar.data_inicio = datetime.fromisoformat(
             dados['data_inicio']).date()
+        # Os alunos da turma passam para outro mês nos relatórios
+        marcar_turmas_alteradas(turma_id)
     if 'horario' in dados:
         turma_para_atualizar.horario = dados['horario']
     if 'local' in dados:
         turma_para_atualizar.local = dados['local']
-
+    if limite_vagas is None and 'limite_vagas' in dados:
+        turma_para_atualizar.limite_vagas = None
+    elif limite_vagas is not None:
+        # UPDATE condicional, como a reserva de vagas: uma inscrição
+        # simultânea não consegue deixar a turma acima do novo limite
+        resultado = db.session.execute(
+            update(Turma)
+            .where(Turma.id == turma_id, Turma.vagas_ocupadas <= limite_vagas)
+            .values(limite_vagas=limite_vagas)
+            .execution_options(synchronize_session='fetch'))
+        if resultado.rowcount == 0:
+            db.session.rollback()
+            return jsonify({
+                "erro": f"O limite de vagas ({limite_vagas}) é menor que as "
+                        f"{turma_para_atualizar.vagas_ocupadas} vagas já ocupadas.",
+                "conflito": "limite_abaixo_das_vagas_ocupadas",
+                "vagas_ocupadas": turma_para_atualizar.vagas_ocupadas
+            }), 409
+
+    registrar_alteracao(AGENDA)
     db.session.commit()
 
     return jsonify(turma_para_atualizar.to_dict())
@@ -0,0 +1,160 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert, select
+
+from app.database import db
+from app.models.treinamentos import Treinamento
+from app.models.turmas import Turma
+from app.services.busca_instrutor import remover_acentos
+
+# Limite de turmas criadas por requisição de agendamento em lote
+MAXIMO_TURMAS_POR_LOTE = 1000
+# Maior período aceito em uma regra de recorrência
+MAXIMO_DIAS_RECORRENCIA = 3660
+
+DIAS_DA_SEMANA = {
+    'segunda': 0, 'terca': 1, 'quarta': 2, 'quinta': 3,
+    'sexta': 4, 'sabado': 5, 'domingo': 6,
+}
+
+
+class AgendamentoInvalido(ValueError):
+    """Erro de validação do agendamento em lote."""
+
+
+def _ler_data(valor, campo):
+    """
+    Aceita uma data ("2026-03-02") ou uma data e hora ISO 8601
+    ("2026-03-02T09:00:00"), da qual fica só a data. O valor é lido
+    inteiro: "2026-03-02xx" é recusado.
+    """
+    if isinstance(valor, str):
+        try:
+            return datetime.fromisoformat(valor).date()
+        except ValueError:
+            pass
+    raise AgendamentoInvalido(f"O campo '{campo}' deve ser uma data no formato AAAA-MM-DD.")
+
+
+def _ler_treinamento_id(valor, onde):
+    if isinstance(valor, bool) or not isinstance(valor, int):
+        raise AgendamentoInvalido(f"{onde}: 'treinamento_id' deve ser um número inteiro.")
+    return valor
+
+
+def ler_limite_vagas(valor, onde):
+    if valor is None:
+        return None
+    if isinstance(valor, bool) or not isinstance(valor, int) or valor < 0:
+        raise AgendamentoInvalido(f"{onde}: 'limite_vagas' deve ser um inteiro não negativo.")
+    return valor
+
+
+def _ler_dia_da_semana(valor):
+    if isinstance(valor, int) and 0 <= valor <= 6:
+        return valor
+    nome = remover_acentos(str(valor)).strip().replace('-feira', '')
+    if nome not in DIAS_DA_SEMANA:
+        raise AgendamentoInvalido(
+            f"Dia da semana inválido: '{valor}'. Use {', '.join(DIAS_DA_SEMANA)} ou 0-6.")
+    return DIAS_DA_SEMANA[nome]
+
+
+def expandir_recorrencia(regra):
+    """
+    Expande uma regra como "toda segunda de março a junho" nas turmas
+    correspondentes. Campos da regra:
+
+    - treinamento_id, inicio, fim (obrigatórios; o intervalo inclui as duas datas)
+    - dias_da_semana: lista com nomes ("segunda") ou números (0 = segunda)
+    - intervalo_semanas: repete a cada N semanas (padrão 1)
+    - horario, local, status, limite_vagas: copiados para todas as turmas
+    """
+    faltando = [campo for campo in ('treinamento_id', 'inicio', 'fim', 'dias_da_semana')
+                if campo not in regra]
+    if faltando:
+        raise AgendamentoInvalido(f"Campos obrigatórios ausentes na recorrência: {', '.join(faltando)}.")
+
+    treinamento_id = _ler_treinamento_id(regra['treinamento_id'], "Recorrência")
+    inicio = _ler_data(regra['inicio'], 'inicio')
+    fim = _ler_data(regra['fim'], 'fim')
+    if fim < inicio:
+        raise AgendamentoInvalido("A data 'fim' deve ser igual ou posterior a 'inicio'.")
+    if (fim - inicio).days > MAXIMO_DIAS_RECORRENCIA:
+        raise AgendamentoInvalido(
+            f"O período da recorrência pode ter no máximo {MAXIMO_DIAS_RECORRENCIA} dias.")
+
+    dias = regra['dias_da_semana']
+    if not isinstance(dias, list) or not dias:
+        raise AgendamentoInvalido("'dias_da_semana' deve ser uma lista não vazia.")
+    dias = {_ler_dia_da_semana(dia) for dia in dias}
+
+    intervalo = regra.get('intervalo_semanas', 1)
+    if isinstance(intervalo, bool) or not isinstance(intervalo, int) or intervalo < 1:
+        raise AgendamentoInvalido("'intervalo_semanas' deve ser um inteiro maior que zero.")
+
+    limite_vagas = ler_limite_vagas(regra.get('limite_vagas'), "Recorrência")
+
+    # Semana de referência: a segunda-feira da semana de 'inicio'
+    primeira_segunda = inicio - timedelta(days=inicio.weekday())
+    turmas = []
+    dia = inicio
+    while dia <= fim:
+        semana = (dia - primeira_segunda).days // 7
+        if dia.weekday() in dias and semana % intervalo == 0:
+            turmas.append({
+                'treinamento_id': treinamento_id,
+                'data_inicio': dia,
+                'horario': regra.get('horario'),
+                'local': regra.get('local'),
+                'status': regra.get('status', 'Agendada'),
+                'limite_vagas': limite_vagas,
+            })
+            if len(turmas) > MAXIMO_TURMAS_POR_LOTE:
+                raise AgendamentoInvalido(
+                    f"A recorrência gera mais de {MAXIMO_TURMAS_POR_LOTE} turmas.")
+        dia += timedelta(days=1)
+    return turmas
+
+
+def ler_lista_de_turmas(itens):
+    """Valida a lista explícita de turmas do agendamento em lote."""
+    if not isinstance(itens, list) or not itens:
+        raise AgendamentoInvalido("'turmas' deve ser uma lista não vazia.")
+
+    if len(itens) > MAXIMO_TURMAS_POR_LOTE:
+        raise AgendamentoInvalido(f"Envie no máximo {MAXIMO_TURMAS_POR_LOTE} turmas por requisição.")
+
+    turmas = []
+    for posicao, item in enumerate(itens):
+        if not isinstance(item, dict) or 'treinamento_id' not in item or 'data_inicio' not in item:
+            raise AgendamentoInvalido(
+                f"Turma na posição {posicao}: 'treinamento_id' e 'data_inicio' são obrigatórios.")
+        turmas.append({
+            'treinamento_id': _ler_treinamento_id(
+                item['treinamento_id'], f"Turma na posição {posicao}"),
+            'data_inicio': _ler_data(item['data_inicio'], 'data_inicio'),
+            'horario': item.get('horario'),
+            'local': item.get('local'),
+            'status': item.get('status', 'Agendada'),
+            'limite_vagas': ler_limite_vagas(
+                item.get('limite_vagas'), f"Turma na posição {posicao}"),
+        })
+    return turmas
+
+
+def treinamentos_inexistentes(turmas):
+    """Confere todos os treinamento_id com uma única consulta."""
+    ids = {turma['treinamento_id'] for turma in turmas}
+    existentes = set(db.session.scalars(
+        select(Treinamento.id).where(Treinamento.id.in_(ids))))
+    return sorted(ids - existentes)
+
+
+def inserir_turmas(turmas):
+    """
+    Insere todas as turmas com um único executemany (em lotes pelo driver)
+    e retorna os ids na mesma ordem da lista. Não faz commit.
+    """
+    return list(db.session.scalars(
+        insert(Turma).returning(Turma.id, sort_by_parameter_order=True), turmas))
@@ -0,0 +1,156 @@
+import sqlite3
+import unicodedata
+
+from sqlalchemy import DDL, column, event, func, or_, table
+from sqlalchemy.engine import Engine
+
+from app.database import db
+from app.models.treinamentos import Treinamento
+
+# Quantidade padrão e máxima de resultados da busca por instrutor
+LIMITE_PADRAO = 20
+LIMITE_MAXIMO = 100
+
+# --- SQLite: tabela-sombra FTS5 com tokenizer de trigramas ---
+# O texto é gravado já sem acentos e em minúsculas pela função
+# remover_acentos(), registrada em cada conexão SQLite (ver abaixo).
+TABELA_FTS = 'treinamentos_busca_instrutor'
+
+DDL_SQLITE = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_FTS} "
+    "USING fts5(instrutor, tokenize='trigram')",
+    f"""CREATE TRIGGER IF NOT EXISTS treinamentos_busca_ai AFTER INSERT ON treinamentos
+    BEGIN
+        INSERT INTO {TABELA_FTS}(rowid, instrutor)
+        SELECT new.id, remover_acentos(new.instrutor_sugerido)
+        WHERE new.instrutor_sugerido IS NOT NULL;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS treinamentos_busca_ad AFTER DELETE ON treinamentos
+    BEGIN
+        DELETE FROM {TABELA_FTS} WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS treinamentos_busca_au
+    AFTER UPDATE OF instrutor_sugerido ON treinamentos
+    BEGIN
+        DELETE FROM {TABELA_FTS} WHERE rowid = old.id;
+        INSERT INTO {TABELA_FTS}(rowid, instrutor)
+        SELECT new.id, remover_acentos(new.instrutor_sugerido)
+        WHERE new.instrutor_sugerido IS NOT NULL;
+    END""",
+]
+
+# --- PostgreSQL: índice GIN de trigramas (pg_trgm) sobre o nome sem acentos ---
+INDICE_TRGM = 'ix_treinamentos_instrutor_trgm'
+
+# unaccent() não é IMMUTABLE, por isso o wrapper: só funções imutáveis
+# podem ser usadas em um índice de expressão.
+DDL_POSTGRESQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """CREATE OR REPLACE FUNCTION unaccent_imutavel(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $$ SELECT public.unaccent('public.unaccent', $1) $$""",
+    f"CREATE INDEX IF NOT EXISTS {INDICE_TRGM} ON treinamentos "
+    "USING gin (unaccent_imutavel(lower(instrutor_sugerido)) gin_trgm_ops)",
+]
+
+
+def incluir_no_autogenerate(objeto, nome, tipo, refletido, comparado):
+    """
+    Filtro 'include_object' do Alembic (migrations/env.py): ignora os objetos
+    da busca criados por DDL próprio, fora do metadata — a tabela FTS5 e suas
+    tabelas internas no SQLite e o índice de trigramas no PostgreSQL —, para
+    o autogenerate não propor removê-los.
+    """
+    if not refletido or comparado is not None:
+        return True
+    if tipo == 'table':
+        return nome != TABELA_FTS and not nome.startswith(f'{TABELA_FTS}_')
+    return not (tipo == 'index' and nome == INDICE_TRGM)
+
+
+busca_fts = table(TABELA_FTS, column('rowid'), column('instrutor'), column('rank'))
+
+
+def remover_acentos(texto):
+    """
+    Normaliza um nome para a busca: minúsculas e sem acentos ("João" -> "joao").
+    """
+    if texto is None:
+        return None
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+
+@event.listens_for(Engine, 'connect')
+def _registrar_funcoes_sqlite(dbapi_connection, connection_record):
+    # Os triggers da tabela FTS chamam remover_acentos() dentro do SQLite
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function(
+            'remover_acentos', 1, remover_acentos, deterministic=True)
+
+
+# Cria/remove a estrutura de busca junto com a tabela (db.create_all / db.drop_all)
+for _instrucao in DDL_SQLITE:
+    event.listen(Treinamento.__table__, 'after_create',
+                 DDL(_instrucao).execute_if(dialect='sqlite'))
+for _instrucao in DDL_POSTGRESQL:
+    event.listen(Treinamento.__table__, 'after_create',
+                 DDL(_instrucao.replace('%', '%%')).execute_if(dialect='postgresql'))
+event.listen(Treinamento.__table__, 'before_drop',
+             DDL(f"DROP TABLE IF EXISTS {TABELA_FTS}").execute_if(dialect='sqlite'))
+
+
+def buscar_por_instrutor(nome, limite=LIMITE_PADRAO):
+    """
+    Busca treinamentos pelo instrutor sugerido, sem diferenciar acentos nem
+    maiúsculas, ordenados pela semelhança com o nome buscado.
+    """
+    dialeto = db.session.get_bind().dialect.name
+    if dialeto == 'postgresql':
+        return _buscar_postgresql(nome, limite)
+    if dialeto == 'sqlite':
+        return _buscar_sqlite(nome, limite)
+    return _buscar_generico(nome, limite)
+
+
+def _buscar_sqlite(nome, limite):
+    termo = remover_acentos(nome)
+    query = Treinamento.query.join(busca_fts, busca_fts.c.rowid == Treinamento.id)
+
+    if len(termo) >= 3:
+        # Termo entre aspas: o FTS5 trata como frase (substring de trigramas)
+        frase = '"' + termo.replace('"', '""') + '"'
+        query = query.filter(busca_fts.c.instrutor.op('MATCH')(frase)).order_by(
+            busca_fts.c.rank, Treinamento.nome_treinamento)
+    else:
+        # O trigram precisa de ao menos 3 caracteres; termos curtos varrem a
+        # tabela-sombra, que só tem a coluna do instrutor
+        query = query.filter(busca_fts.c.instrutor.like(
+            f"%{_escapar_like(termo)}%", escape='\\')).order_by(
+            Treinamento.nome_treinamento)
+
+    return query.limit(limite).all()
+
+
+def _buscar_postgresql(nome, limite):
+    coluna = func.unaccent_imutavel(func.lower(Treinamento.instrutor_sugerido))
+    termo = func.unaccent_imutavel(func.lower(nome))
+    semelhanca = func.word_similarity(termo, coluna)
+
+    # Ambos os predicados usam o índice GIN ix_treinamentos_instrutor_trgm
+    return Treinamento.query.filter(
+        or_(coluna.ilike(f"%{_escapar_like(remover_acentos(nome))}%", escape='\\'),
+            termo.op('<%')(coluna))
+    ).order_by(semelhanca.desc(), Treinamento.nome_treinamento).limit(limite).all()
+
+
+def _buscar_generico(nome, limite):
+    # Outros bancos: mantém o ILIKE original, apenas com limite
+    return Treinamento.query.filter(
+        Treinamento.instrutor_sugerido.ilike(f"%{_escapar_like(nome)}%", escape='\\')
+    ).order_by(Treinamento.nome_treinamento).limit(limite).all()
+
+
+def _escapar_like(texto):
+    return texto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
@@ -0,0 +1,193 @@
+import csv
+import io
+import random
+from array import array
+from datetime import date, timedelta
+
+from sqlalchemy import bindparam, case, func, select, text, update
+
+from app.database import db
+from app.models.alunos import Aluno
+from app.models.treinamentos import Treinamento
+from app.models.turmas import Turma
+from app.services.relatorios import reconstruir_relatorios
+from app.utils.etag import AGENDA, CATALOGO, registrar_alteracao
+
+# Linhas por executemany / COPY (cada lote é um commit)
+TAMANHO_LOTE = 10000
+
+VENDORS = ['Microsoft', 'AWS', 'Google Cloud', 'Cisco', 'Oracle', 'Red Hat',
+           'VMware', 'Salesforce', 'IBM', 'Linux Foundation']
+ASSUNTOS = ['Fundamentos', 'Administração', 'Arquitetura', 'Segurança', 'Redes',
+            'DevOps', 'Banco de Dados', 'Análise de Dados', 'Desenvolvimento', 'Automação']
+NIVEIS = ['Básico', 'Intermediário', 'Avançado']
+NOMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Eduarda', 'Fábio', 'Gabriela', 'Heitor',
+         'Isabela', 'João', 'Larissa', 'Marcos', 'Natália', 'Otávio', 'Paula', 'Rafael',
+         'Sofia', 'Thiago', 'Vitória', 'Wagner']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Pereira', 'Ferreira',
+              'Costa', 'Rodrigues', 'Almeida', 'Nascimento', 'Araújo', 'Gonçalves',
+              'Conceição', 'Simões']
+LOCAIS = ['Sala 1', 'Sala 2', 'Sala 3', 'Auditório', 'Online']
+HORARIOS = ['09:00 - 17:00', '08:00 - 12:00', '13:00 - 17:00', '19:00 - 22:00']
+
+
+def _em_lotes(linhas, tamanho):
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _proximo_id(modelo):
+    return (db.session.scalar(select(func.max(modelo.id))) or 0) + 1
+
+
+def _copiar(tabela, colunas, lote):
+    """COPY ... FROM STDIN (psycopg2): bem mais rápido que INSERT no PostgreSQL."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(lote)
+    buffer.seek(0)
+    cursor = db.session.connection().connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {tabela.name} ({', '.join(colunas)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def _inserir(modelo, colunas, linhas, tamanho_lote, avisar):
+    """
+    Grava as tuplas em lotes: COPY no PostgreSQL (com psycopg2) e
+    executemany nos demais bancos. Retorna quantas linhas foram gravadas.
+    """
+    tabela = modelo.__table__
+    conexao = db.session.connection()
+    usar_copy = conexao.dialect.name == 'postgresql' and conexao.dialect.driver == 'psycopg2'
+    total = 0
+    for lote in _em_lotes(linhas, tamanho_lote):
+        if usar_copy:
+            _copiar(tabela, colunas, lote)
+        else:
+            db.session.execute(tabela.insert(), [dict(zip(colunas, linha)) for linha in lote])
+        db.session.commit()
+        total += len(lote)
+        avisar(tabela.name, total)
+    return total
+
+
+def _ajustar_sequencias():
+    # Os ids foram gravados explicitamente; no PostgreSQL as sequências
+    # precisam avançar para os próximos INSERTs não colidirem
+    if db.session.get_bind().dialect.name != 'postgresql':
+        return
+    for tabela in ('treinamentos', 'turmas', 'alunos'):
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{tabela}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 1) FROM {tabela}))"))
+    db.session.commit()
+
+
+def gerar_dados(treinamentos, turmas, alunos, semente=42, tamanho_lote=TAMANHO_LOTE,
+                avisar=lambda tabela, total: None):
+    """
+    Acrescenta ao banco um volume sintético de treinamentos, turmas e alunos
+    relacionados entre si. A mesma 'semente' gera sempre os mesmos dados.
+
+    As turmas ficam entre três anos atrás e um ano à frente (as passadas como
+    'Concluída'); os alunos são distribuídos entre as turmas e 'vagas_ocupadas'
+    já sai igual ao número de inscritos. No fim o agregado dos relatórios é
+    reconstruído e as versões do catálogo e da agenda são incrementadas.
+    """
+    aleatorio = random.Random(semente)
+    hoje = date.today()
+    primeiro_dia = hoje - timedelta(days=3 * 365)
+
+    id_treinamento = _proximo_id(Treinamento)
+    id_turma = _proximo_id(Turma)
+    id_aluno = _proximo_id(Aluno)
+
+    # Sem novos treinamentos/turmas, usa os que já existem no banco
+    treinamento_ids = (range(id_treinamento, id_treinamento + treinamentos) if treinamentos
+                       else db.session.scalars(select(Treinamento.id)).all())
+    turma_ids = (range(id_turma, id_turma + turmas) if turmas
+                 else db.session.scalars(select(Turma.id)).all())
+    if turmas and not treinamento_ids:
+        raise ValueError("Não há treinamentos para associar às turmas.")
+    if alunos and not turma_ids:
+        raise ValueError("Não há turmas para associar aos alunos.")
+
+    # Escolhe a turma de cada aluno antes, para gravar vagas_ocupadas correto
+    escolhas = array('i', (aleatorio.choice(turma_ids) for _ in range(alunos)))
+    ocupadas = {}
+    for turma_id in escolhas:
+        ocupadas[turma_id] = ocupadas.get(turma_id, 0) + 1
+
+    def gerar_treinamentos():
+        for i in range(treinamentos):
+            yield (
+                id_treinamento + i,
+                f"{aleatorio.choice(ASSUNTOS)} {aleatorio.choice(NIVEIS)} {id_treinamento + i}",
+                aleatorio.choice(VENDORS),
+                f"{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)}",
+            )
+
+    _inserir(Treinamento, ['id', 'nome_treinamento', 'vendor', 'instrutor_sugerido'],
+             gerar_treinamentos(), tamanho_lote, avisar)
+
+    def gerar_turmas():
+        for i in range(turmas):
+            turma_id = id_turma + i
+            inicio = primeiro_dia + timedelta(days=aleatorio.randrange(4 * 365))
+            inscritos = ocupadas.get(turma_id, 0)
+            limite = (None if aleatorio.random() < 0.3
+                      else max(inscritos, aleatorio.choice([20, 25, 30, 40])))
+            yield (
+                turma_id,
+                aleatorio.choice(treinamento_ids),
+                inicio,
+                aleatorio.choice(HORARIOS),
+                aleatorio.choice(LOCAIS),
+                'Concluída' if inicio < hoje else 'Agendada',
+                limite,
+                inscritos,
+            )
+
+    _inserir(Turma, ['id', 'treinamento_id', 'data_inicio', 'horario', 'local', 'status',
+                     'limite_vagas', 'vagas_ocupadas'],
+             gerar_turmas(), tamanho_lote, avisar)
+
+    def gerar_alunos():
+        for i, turma_id in enumerate(escolhas):
+            aluno_id = id_aluno + i
+            yield (
+                aluno_id,
+                f"{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)}",
+                f"aluno{aluno_id}@exemplo.com.br",
+                aleatorio.random() < 0.6,
+                turma_id,
+            )
+
+    _inserir(Aluno, ['id', 'nome', 'email', 'pago', 'turma_id'],
+             gerar_alunos(), tamanho_lote, avisar)
+
+    if not turmas and ocupadas:
+        # Alunos novos em turmas existentes: mantém o contador de vagas e
+        # aumenta o limite das turmas que passariam dele
+        colunas = Turma.__table__.c
+        ocupadas_depois = colunas.vagas_ocupadas + bindparam('inscritos')
+        db.session.execute(
+            update(Turma.__table__)
+            .where(colunas.id == bindparam('turma'))
+            .values(vagas_ocupadas=ocupadas_depois,
+                    limite_vagas=case((colunas.limite_vagas < ocupadas_depois, ocupadas_depois),
+                                      else_=colunas.limite_vagas)),
+            [{'turma': turma_id, 'inscritos': n} for turma_id, n in ocupadas.items()])
+
+    _ajustar_sequencias()
+    reconstruir_relatorios()
+    registrar_alteracao(CATALOGO, AGENDA)
+    db.session.commit()
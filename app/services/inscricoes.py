@@ -0,0 +1,427 @@
+import csv
+import io
+import json
+
+from sqlalchemy import Boolean, Integer, String, bindparam, exists, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.database import db, executar_passos
+from app.models.alunos import Aluno
+from app.models.turmas import Turma
+from app.services.relatorios import marcar_turmas_alteradas, passos_da_marcacao
+
+# Quantidade de linhas inseridas por executemany / commit
+TAMANHO_LOTE = 1000
+# O relatório guarda no máximo este número de erros; o restante só é contado
+MAXIMO_ERROS_RELATADOS = 1000
+
+FORMATO_CSV = 'csv'
+FORMATO_NDJSON = 'ndjson'
+
+# Modos de inscrição: 'create' recusa e-mails já cadastrados; 'upsert'
+# atualiza nome e pago do aluno que já está inscrito na mesma turma
+MODO_CRIAR = 'create'
+MODO_UPSERT = 'upsert'
+MODOS = (MODO_CRIAR, MODO_UPSERT)
+
+# Resultados de inscrever_aluno()
+CRIADO = 'criado'
+ATUALIZADO = 'atualizado'
+TURMA_NAO_ENCONTRADA = 'turma_nao_encontrada'
+# Conflitos (409), devolvidos no campo 'conflito' da resposta
+EMAIL_DUPLICADO = 'email_duplicado'
+TURMA_LOTADA = 'turma_lotada'
+INSCRITO_EM_OUTRA_TURMA = 'inscrito_em_outra_turma'
+
+VALORES_VERDADEIROS = {'1', 'true', 't', 'sim', 's', 'yes', 'y'}
+VALORES_FALSOS = {'', '0', 'false', 'f', 'nao', 'não', 'n', 'no'}
+
+
+class LinhaInvalida(ValueError):
+    """Erro de validação de uma linha da importação em lote."""
+
+
+def reservar_vagas(turma_id, quantidade=1):
+    """
+    Reserva vagas na turma com um UPDATE condicional
+    (... WHERE vagas_ocupadas + n <= limite_vagas), sem contar alunos.
+    Como a verificação e o incremento são a mesma instrução, inscrições
+    simultâneas não conseguem passar do limite.
+
+    Retorna quantas vagas foram reservadas (pode ser menos que o pedido se a
+    turma estiver quase cheia) ou None se a turma não existir. Não faz commit:
+    a reserva vale junto com a inserção dos alunos na mesma transação.
+
+    O mesmo UPDATE incrementa Turma.versao_vagas, que entra no ETag das
+    turmas agendadas: só a linha da turma fica travada até o commit, e
+    inscrições em turmas diferentes não esperam umas pelas outras.
+    """
+    return executar_passos(passos_da_reserva(turma_id, quantidade))
+
+
+def passos_da_reserva(turma_id, quantidade=1):
+    """Passos de reservar_vagas (ver app.database.executar_passos)."""
+    while quantidade > 0:
+        resultado = yield reserva_de_vagas(turma_id, quantidade), None
+        if resultado.rowcount:
+            return quantidade
+
+        # Só chega aqui se a turma não existe ou não tem vagas para todos
+        linha = (yield ocupacao_da_turma(turma_id), None).first()
+        if linha is None:
+            return None
+        if linha.limite_vagas is None:
+            # O limite foi removido entre as duas instruções: tenta de novo
+            continue
+        quantidade = min(quantidade - 1, linha.limite_vagas - linha.vagas_ocupadas)
+    return 0
+
+
+# Instruções dos passos (executados também pelo modo asyncio, app/assincrono)
+
+def reserva_de_vagas(turma_id, quantidade):
+    return (update(Turma)
+            .where(Turma.id == turma_id,
+                   or_(Turma.limite_vagas.is_(None),
+                       Turma.vagas_ocupadas + quantidade <= Turma.limite_vagas))
+            .values(vagas_ocupadas=Turma.vagas_ocupadas + quantidade,
+                    versao_vagas=Turma.versao_vagas + 1)
+            .execution_options(synchronize_session=False))
+
+
+def liberacao_de_vagas(turma_id, quantidade):
+    return (update(Turma).where(Turma.id == turma_id)
+            .values(vagas_ocupadas=Turma.vagas_ocupadas - quantidade,
+                    versao_vagas=Turma.versao_vagas + 1)
+            .execution_options(synchronize_session=False))
+
+
+def ocupacao_da_turma(turma_id):
+    return select(Turma.limite_vagas, Turma.vagas_ocupadas).where(Turma.id == turma_id)
+
+
+def liberar_vagas(turma_id, quantidade=1):
+    """Devolve vagas à turma (aluno removido ou inscrição não gravada)."""
+    if quantidade > 0:
+        db.session.execute(liberacao_de_vagas(turma_id, quantidade))
+
+
+def inserir_alunos(linhas):
+    """
+    Insere os alunos em um único executemany, ignorando e-mails que já
+    existam no banco (ON CONFLICT DO NOTHING no PostgreSQL e no SQLite).
+
+    Retorna o conjunto de e-mails efetivamente inseridos, para que quem chamou
+    saiba quais linhas perderam a corrida para outra inscrição concorrente.
+    """
+    if not linhas:
+        return set()
+
+    dialeto = db.session.get_bind().dialect.name
+    if dialeto in ('postgresql', 'sqlite'):
+        modulo = postgresql if dialeto == 'postgresql' else sqlite
+        instrucao = modulo.insert(Aluno).on_conflict_do_nothing(
+            index_elements=['email']).returning(Aluno.email)
+        return set(db.session.scalars(instrucao, linhas))
+
+    db.session.execute(insert(Aluno), linhas)
+    return {linha['email'] for linha in linhas}
+
+
+def _colunas_do_aluno():
+    return [Aluno.__table__.c[campo] for campo in Aluno.CAMPOS]
+
+
+def _com_vaga(turma_id):
+    return exists().where(
+        Turma.id == turma_id,
+        or_(Turma.limite_vagas.is_(None), Turma.vagas_ocupadas < Turma.limite_vagas))
+
+
+def insercao_condicional(dialeto=None):
+    """
+    INSERT INTO alunos (...) SELECT :nome, :email, :pago, :turma_id
+    WHERE EXISTS (turma com vaga) ON CONFLICT (email) DO NOTHING RETURNING ...
+
+    Uma única instrução valida a turma e grava o aluno; e-mail repetido não
+    levanta erro (nem exige rollback), só não devolve linha. Sem 'dialeto',
+    vale o do banco da sessão.
+    """
+    origem = select(bindparam('nome', type_=String), bindparam('email', type_=String),
+                    bindparam('pago', type_=Boolean), bindparam('turma_id', type_=Integer)
+                    ).where(_com_vaga(bindparam('turma_id', type_=Integer)))
+    colunas = ['nome', 'email', 'pago', 'turma_id']
+
+    # Sobre a Table (e não o modelo), para a sessão não tratar os parâmetros
+    # como um INSERT em massa do ORM
+    tabela = Aluno.__table__
+    dialeto = dialeto or db.session.get_bind().dialect.name
+    if dialeto in ('postgresql', 'sqlite'):
+        modulo = postgresql if dialeto == 'postgresql' else sqlite
+        instrucao = modulo.insert(tabela).from_select(colunas, origem).on_conflict_do_nothing(
+            index_elements=['email'])
+    else:
+        instrucao = insert(tabela).from_select(colunas, origem)
+    return instrucao.returning(*_colunas_do_aluno())
+
+
+def atualizacao_da_inscricao(valores):
+    """UPDATE do aluno com este e-mail na mesma turma (modo upsert)."""
+    return (update(Aluno)
+            .where(Aluno.email == valores['email'], Aluno.turma_id == valores['turma_id'])
+            .values(nome=valores['nome'], pago=valores['pago'])
+            .returning(*_colunas_do_aluno())
+            .execution_options(synchronize_session=False))
+
+
+def email_em_uso(email):
+    return select(Aluno.id, Aluno.turma_id).where(Aluno.email == email)
+
+
+def inscrever_aluno(valores, modo=MODO_CRIAR):
+    """
+    Inscreve um aluno ('nome', 'email', 'pago', 'turma_id') e devolve
+    (resultado, linha): CRIADO ou ATUALIZADO com a linha do aluno, ou
+    TURMA_NAO_ENCONTRADA / um dos conflitos, com a linha (id, turma_id) do
+    aluno que já usa o e-mail, quando houver.
+
+    No caminho comum é uma instrução para gravar o aluno (ver
+    insercao_condicional) e a reserva da vaga; no modo upsert, o
+    reenvio de um aluno já inscrito custa só o UPDATE. A verificação do
+    motivo só roda quando nada foi gravado. Não faz commit; em conflito,
+    quem chamou deve fazer rollback.
+    """
+    return executar_passos(
+        passos_da_inscricao(valores, modo, db.session.get_bind().dialect.name))
+
+
+def passos_da_inscricao(valores, modo, dialeto):
+    """
+    Passos de inscrever_aluno (ver app.database.executar_passos), os mesmos
+    da rota POST /alunos/ do modo asyncio.
+    """
+    turma_id = valores['turma_id']
+    if modo == MODO_UPSERT:
+        aluno = (yield atualizacao_da_inscricao(valores), None).first()
+        if aluno is not None:
+            yield from passos_da_marcacao([turma_id], dialeto)
+            return ATUALIZADO, aluno
+
+    aluno = (yield insercao_condicional(dialeto), valores).first()
+    if aluno is not None:
+        # A inserção já conferiu a vaga; o UPDATE condicional garante que
+        # inscrições simultâneas não passem do limite
+        if not (yield from passos_da_reserva(turma_id)):
+            return TURMA_LOTADA, None
+        yield from passos_da_marcacao([turma_id], dialeto)
+        return CRIADO, aluno
+
+    existente = (yield email_em_uso(valores['email']), None).first()
+    if existente is not None:
+        if existente.turma_id != turma_id:
+            return (INSCRITO_EM_OUTRA_TURMA if modo == MODO_UPSERT else EMAIL_DUPLICADO), existente
+        if modo == MODO_UPSERT:
+            # Inscrito por outra requisição entre o UPDATE e o INSERT
+            aluno = (yield atualizacao_da_inscricao(valores), None).first()
+            yield from passos_da_marcacao([turma_id], dialeto)
+            return ATUALIZADO, aluno
+        return EMAIL_DUPLICADO, existente
+
+    if (yield select(Turma.id).where(Turma.id == turma_id), None).scalar() is None:
+        return TURMA_NAO_ENCONTRADA, None
+    return TURMA_LOTADA, None
+
+
+def ler_linhas(stream, formato):
+    """
+    Lê o corpo da requisição linha a linha, sem carregá-lo inteiro na memória.
+    Gera tuplas (numero_da_linha, dict_ou_erro).
+    """
+    if not isinstance(stream, io.BufferedIOBase):
+        stream = io.BufferedReader(stream)
+    texto = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+    if formato == FORMATO_CSV:
+        leitor = csv.DictReader(texto)
+        for registro in leitor:
+            yield leitor.line_num, registro
+        return
+
+    for numero, linha in enumerate(texto, start=1):
+        if not linha.strip():
+            continue
+        try:
+            registro = json.loads(linha)
+        except ValueError:
+            yield numero, LinhaInvalida("JSON inválido.")
+            continue
+        if not isinstance(registro, dict):
+            yield numero, LinhaInvalida("Cada linha deve ser um objeto JSON.")
+            continue
+        yield numero, registro
+
+
+def validar_linha(registro, turmas_existentes):
+    """
+    Converte um registro (do CSV ou do NDJSON) nos valores da tabela 'alunos'.
+    """
+    faltando = [campo for campo in ('nome', 'email', 'turma_id')
+                if registro.get(campo) in (None, '')]
+    if faltando:
+        raise LinhaInvalida(f"Campos obrigatórios ausentes: {', '.join(faltando)}.")
+
+    try:
+        turma_id = int(registro['turma_id'])
+    except (TypeError, ValueError):
+        raise LinhaInvalida("O campo 'turma_id' deve ser um número inteiro.")
+    if turma_id not in turmas_existentes:
+        raise LinhaInvalida(f"A turma com ID {turma_id} não foi encontrada.")
+
+    pago = registro.get('pago', False)
+    if isinstance(pago, str):
+        valor = pago.strip().lower()
+        if valor in VALORES_VERDADEIROS:
+            pago = True
+        elif valor in VALORES_FALSOS:
+            pago = False
+        else:
+            raise LinhaInvalida("O campo 'pago' deve ser verdadeiro ou falso.")
+    elif not isinstance(pago, bool) and pago is not None:
+        raise LinhaInvalida("O campo 'pago' deve ser verdadeiro ou falso.")
+
+    return {
+        'nome': str(registro['nome']).strip(),
+        'email': str(registro['email']).strip(),
+        'turma_id': turma_id,
+        'pago': bool(pago),
+    }
+
+
+class RelatorioImportacao:
+    """Acumula o resultado da importação em lote sem guardar as linhas."""
+
+    def __init__(self):
+        self.total_linhas = 0
+        self.inseridos = 0
+        self.atualizados = 0
+        self.erros = []
+        self.erros_omitidos = 0
+
+    def registrar_erro(self, numero, erro, email=None):
+        if len(self.erros) >= MAXIMO_ERROS_RELATADOS:
+            self.erros_omitidos += 1
+            return
+        item = {'linha': numero, 'erro': erro}
+        if email:
+            item['email'] = email
+        self.erros.append(item)
+
+    def to_dict(self):
+        return {
+            'total_linhas': self.total_linhas,
+            'inseridos': self.inseridos,
+            'atualizados': self.atualizados,
+            'com_erro': len(self.erros) + self.erros_omitidos,
+            'erros': self.erros,
+            'erros_omitidos': self.erros_omitidos,
+        }
+
+
+def importar_alunos(linhas, tamanho_lote=TAMANHO_LOTE, modo=MODO_CRIAR):
+    """
+    Importa os alunos em lotes. As turmas válidas são carregadas uma única
+    vez; cada lote custa uma consulta de e-mails já cadastrados e um
+    executemany, com commit ao final do lote.
+
+    No modo upsert, os alunos já inscritos na mesma turma têm 'nome' e
+    'pago' atualizados em um executemany de UPDATE (reenvio do mesmo arquivo
+    por um parceiro), em vez de virarem erro.
+    """
+    turmas_existentes = set(db.session.scalars(select(Turma.id)))
+    # Só os e-mails ficam em memória, para detectar duplicados dentro do arquivo
+    emails_vistos = set()
+    relatorio = RelatorioImportacao()
+    lote = []
+
+    for numero, registro in linhas:
+        relatorio.total_linhas += 1
+        if isinstance(registro, LinhaInvalida):
+            relatorio.registrar_erro(numero, str(registro))
+            continue
+        try:
+            valores = validar_linha(registro, turmas_existentes)
+        except LinhaInvalida as e:
+            relatorio.registrar_erro(numero, str(e), registro.get('email'))
+            continue
+
+        if valores['email'] in emails_vistos:
+            relatorio.registrar_erro(numero, "E-mail duplicado no arquivo.", valores['email'])
+            continue
+        emails_vistos.add(valores['email'])
+
+        lote.append((numero, valores))
+        if len(lote) >= tamanho_lote:
+            _gravar_lote(lote, relatorio, modo)
+            lote = []
+
+    _gravar_lote(lote, relatorio, modo)
+    return relatorio
+
+
+def _gravar_lote(lote, relatorio, modo=MODO_CRIAR):
+    if not lote:
+        return
+
+    emails = [valores['email'] for _, valores in lote]
+    # e-mail -> turma dos alunos já cadastrados
+    ja_cadastrados = dict(db.session.execute(
+        select(Aluno.email, Aluno.turma_id).where(Aluno.email.in_(emails))).all())
+
+    por_turma = {}
+    atualizar = []
+    for numero, valores in lote:
+        turma_atual = ja_cadastrados.get(valores['email'])
+        if turma_atual is None:
+            por_turma.setdefault(valores['turma_id'], []).append((numero, valores))
+        elif modo != MODO_UPSERT:
+            relatorio.registrar_erro(numero, "E-mail já cadastrado.", valores['email'])
+        elif turma_atual != valores['turma_id']:
+            relatorio.registrar_erro(numero, "E-mail já inscrito em outra turma.", valores['email'])
+        else:
+            atualizar.append(valores)
+
+    if atualizar:
+        tabela = Aluno.__table__
+        db.session.execute(
+            update(tabela)
+            .where(tabela.c.email == bindparam('email_atual'),
+                   tabela.c.turma_id == bindparam('turma_atual'))
+            .values(nome=bindparam('novo_nome'), pago=bindparam('novo_pago')),
+            [{'email_atual': v['email'], 'turma_atual': v['turma_id'],
+              'novo_nome': v['nome'], 'novo_pago': v['pago']} for v in atualizar])
+
+    # Uma reserva (UPDATE condicional) por turma do lote
+    novos = []
+    for turma_id, linhas in por_turma.items():
+        reservadas = reservar_vagas(turma_id, len(linhas)) or 0
+        novos.extend(linhas[:reservadas])
+        for numero, valores in linhas[reservadas:]:
+            relatorio.registrar_erro(numero, "A turma não tem mais vagas disponíveis.", valores['email'])
+
+    inseridos = inserir_alunos([valores for _, valores in novos])
+
+    nao_gravados = {}
+    for numero, valores in novos:
+        if valores['email'] not in inseridos:
+            # Outra inscrição gravou o mesmo e-mail entre a consulta e o insert
+            relatorio.registrar_erro(numero, "E-mail já cadastrado.", valores['email'])
+            nao_gravados[valores['turma_id']] = nao_gravados.get(valores['turma_id'], 0) + 1
+    for turma_id, quantidade in nao_gravados.items():
+        liberar_vagas(turma_id, quantidade)
+    marcar_turmas_alteradas(*{valores['turma_id'] for _, valores in novos
+                              if valores['email'] in inseridos},
+                            *{valores['turma_id'] for valores in atualizar})
+
+    db.session.commit()
+    relatorio.inseridos += len(inseridos)
+    relatorio.atualizados += len(atualizar)
@@ -0,0 +1,279 @@
+import gzip
+import json
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, select, update
+
+from app.database import db
+from app.models.alunos import Aluno
+from app.models.jobs import CONCLUIDO, EXECUTANDO, FALHOU, PENDENTE, Job, agora
+from app.models.treinamentos import Treinamento
+from app.models.turmas import Turma
+from app.services.relatorios import AGRUPAMENTOS, atualizar_relatorios, relatorio_de_inscricoes
+from app.utils import exportacao
+from app.utils.exportacao import FORMATO_CSV, FORMATO_NDJSON, gerar_exportacao
+
+logger = logging.getLogger(__name__)
+
+# Intervalo mínimo, em segundos, entre duas gravações do progresso
+INTERVALO_PROGRESSO = 1.0
+
+# Cópia comprimida de cada resultado: gravada uma vez, baixada várias,
+# então vale o nível máximo
+EXTENSAO_GZIP = '.gz'
+NIVEL_GZIP_RESULTADO = 9
+
+FORMATOS = {'csv': FORMATO_CSV, 'ndjson': FORMATO_NDJSON}
+TIPOS_DE_ARQUIVO = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson', 'json': 'application/json'}
+
+# Tarefas disponíveis: tipo -> (validar(parametros), executar(parametros))
+TAREFAS = {}
+
+
+class JobInvalido(ValueError):
+    """Erro de validação ao criar um job (tipo ou parâmetros inválidos)."""
+
+
+def tarefa(tipo, validar):
+    """
+    Registra uma tarefa. 'validar' recebe os parâmetros do POST e devolve os
+    parâmetros normalizados (ou levanta JobInvalido); a tarefa devolve
+    (blocos_de_texto, extensao, total_de_blocos) para o executor gravar.
+    """
+    def registrar(executar):
+        TAREFAS[tipo] = (validar, executar)
+        return executar
+    return registrar
+
+
+def _ler_formato(parametros):
+    formato = parametros.get('formato', 'csv')
+    if formato not in FORMATOS:
+        raise JobInvalido(f"'formato' deve ser um de: {', '.join(FORMATOS)}.")
+    return formato
+
+
+def _ler_inteiro(parametros, nome):
+    valor = parametros.get(nome)
+    if valor is not None and (isinstance(valor, bool) or not isinstance(valor, int)):
+        raise JobInvalido(f"'{nome}' deve ser um número inteiro.")
+    return valor
+
+
+def _total_de_blocos(consulta):
+    linhas = db.session.scalar(select(func.count()).select_from(consulta.subquery()))
+    return max(1, math.ceil(linhas / exportacao.LINHAS_POR_BUSCA))
+
+
+def _validar_exportacao_alunos(parametros):
+    return {'formato': _ler_formato(parametros),
+            'turma_id': _ler_inteiro(parametros, 'turma_id')}
+
+
+@tarefa('exportar_alunos', _validar_exportacao_alunos)
+def exportar_alunos(parametros):
+    consulta = select(Aluno.id, Aluno.nome, Aluno.email, Aluno.pago, Aluno.turma_id)
+    if parametros.get('turma_id'):
+        consulta = consulta.where(Aluno.turma_id == parametros['turma_id'])
+    total = _total_de_blocos(consulta)
+    blocos, extensao = gerar_exportacao(
+        consulta, FORMATOS[parametros['formato']], chave=(Aluno.id,))
+    return blocos, extensao, total
+
+
+def _validar_exportacao_turmas(parametros):
+    return {'formato': _ler_formato(parametros),
+            'treinamento_id': _ler_inteiro(parametros, 'treinamento_id')}
+
+
+@tarefa('exportar_turmas', _validar_exportacao_turmas)
+def exportar_turmas(parametros):
+    consulta = select(
+        Turma.id, Turma.treinamento_id, Turma.data_inicio, Turma.horario,
+        Turma.local, Turma.status, Turma.limite_vagas, Turma.vagas_ocupadas,
+        Treinamento.nome_treinamento, Treinamento.vendor
+    ).join(Treinamento)
+    if parametros.get('treinamento_id'):
+        consulta = consulta.where(Turma.treinamento_id == parametros['treinamento_id'])
+    total = _total_de_blocos(consulta)
+    blocos, extensao = gerar_exportacao(
+        consulta, FORMATOS[parametros['formato']], chave=(Turma.data_inicio, Turma.id))
+    return blocos, extensao, total
+
+
+def _validar_relatorio(parametros):
+    agrupar_por = parametros.get('agrupar_por', 'vendor')
+    if agrupar_por not in AGRUPAMENTOS:
+        raise JobInvalido(f"'agrupar_por' deve ser um de: {', '.join(AGRUPAMENTOS)}.")
+    return {'agrupar_por': agrupar_por,
+            'ano': _ler_inteiro(parametros, 'ano'),
+            'vendor': parametros.get('vendor')}
+
+
+@tarefa('relatorio_inscricoes', _validar_relatorio)
+def gerar_relatorio_inscricoes(parametros):
+    if atualizar_relatorios():
+        db.session.commit()
+    itens = relatorio_de_inscricoes(
+        parametros['agrupar_por'], ano=parametros.get('ano'), vendor=parametros.get('vendor'))
+    return [json.dumps(itens, ensure_ascii=False)], 'json', 1
+
+
+def validar_job(tipo, parametros):
+    """Confere o tipo e devolve os parâmetros normalizados pela tarefa."""
+    if tipo not in TAREFAS:
+        raise JobInvalido(f"'tipo' deve ser um de: {', '.join(sorted(TAREFAS))}.")
+    if parametros is None:
+        parametros = {}
+    if not isinstance(parametros, dict):
+        raise JobInvalido("'parametros' deve ser um objeto.")
+    validar, _ = TAREFAS[tipo]
+    return validar(parametros)
+
+
+class ExecutorDeJobs:
+    """
+    Executa os jobs em um pool de threads do próprio processo, sem broker
+    externo. O estado fica na tabela 'jobs' e o resultado em um arquivo no
+    diretório de resultados, de onde é baixado por GET /jobs/<id>/resultado.
+
+    Com 0 workers o job roda na própria requisição que o criou (testes e
+    desenvolvimento). Cada processo tem o seu pool: um job só roda no worker
+    que o recebeu, e jobs interrompidos por uma reinicialização ficam com o
+    status em que estavam.
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._executor = None
+        self._pendentes = []
+        self.app = None
+        self.diretorio = None
+
+    def configurar(self, app, workers, diretorio):
+        with self._trava:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self.app = app
+            self.diretorio = diretorio
+            self._executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix='job') if workers > 0 else None
+
+    def enviar(self, job_id):
+        """Agenda a execução de um job já gravado (e com commit) no banco."""
+        if self._executor is None:
+            self._executar(job_id)
+            return
+        with self._trava:
+            self._pendentes = [f for f in self._pendentes if not f.done()]
+            self._pendentes.append(self._executor.submit(self._executar, job_id))
+
+    def aguardar(self):
+        """Espera os jobs enviados terminarem (usado nos testes)."""
+        with self._trava:
+            pendentes, self._pendentes = self._pendentes, []
+        for futuro in pendentes:
+            futuro.result()
+
+    def caminho_do_resultado(self, job, comprimido=False):
+        caminho = os.path.join(self.diretorio, job.arquivo)
+        if comprimido and os.path.exists(caminho + EXTENSAO_GZIP):
+            return caminho + EXTENSAO_GZIP
+        return caminho
+
+    def _executar(self, job_id):
+        with self.app.app_context():
+            job = db.session.get(Job, job_id)
+            if job is None or job.status != PENDENTE:
+                return
+            job.status = EXECUTANDO
+            job.iniciado_em = agora()
+            db.session.commit()
+
+            tipo = job.tipo
+            _, executar = TAREFAS[tipo]
+            try:
+                blocos, extensao, total = executar(job.parametros)
+                arquivo = f'{job_id}.{extensao}'
+                self._gravar(job_id, blocos, arquivo, total)
+
+                job.status = CONCLUIDO
+                job.progresso = 100
+                job.arquivo = arquivo
+                job.concluido_em = agora()
+                db.session.commit()
+            except Exception as e:
+                logger.exception("Job %s (%s) falhou", job_id, tipo)
+                _registrar_falha(job_id, e)
+
+    def _gravar(self, job_id, blocos, arquivo, total):
+        # Grava em arquivos temporários e renomeia no fim, para que um
+        # download nunca encontre o arquivo pela metade. Junto do arquivo
+        # sai uma cópia .gz, comprimida uma vez aqui (fora da requisição) e
+        # servida pronta aos clientes que aceitam gzip.
+        os.makedirs(self.diretorio, exist_ok=True)
+        caminho = os.path.join(self.diretorio, arquivo)
+        temporario = caminho + '.parcial'
+        temporario_gz = caminho + EXTENSAO_GZIP + '.parcial'
+        ultimo_aviso = time.monotonic()
+        try:
+            with open(temporario, 'w', encoding='utf-8', newline='') as saida, \
+                    gzip.open(temporario_gz, 'wt', encoding='utf-8', newline='',
+                              compresslevel=NIVEL_GZIP_RESULTADO) as saida_gz:
+                for gravados, bloco in enumerate(blocos, start=1):
+                    saida.write(bloco)
+                    saida_gz.write(bloco)
+                    if time.monotonic() - ultimo_aviso >= INTERVALO_PROGRESSO:
+                        _informar_progresso(job_id, min(99, gravados * 100 // total))
+                        ultimo_aviso = time.monotonic()
+            os.replace(temporario_gz, caminho + EXTENSAO_GZIP)
+            os.replace(temporario, caminho)
+        finally:
+            for parcial in (temporario, temporario_gz):
+                if os.path.exists(parcial):
+                    os.remove(parcial)
+
+
+def _atualizar_job(job_id, **valores):
+    # Conexão própria, fora da sessão do job
+    with db.engine.begin() as conexao:
+        conexao.execute(update(Job.__table__).where(Job.__table__.c.id == job_id)
+                        .values(**valores))
+
+
+def _informar_progresso(job_id, progresso):
+    """
+    Grava o progresso em outra conexão, fora da sessão do job. As
+    exportações leem em blocos por chave e encerram a leitura entre um bloco
+    e outro, então nem no SQLite a gravação espera o fim do job. O progresso
+    é informativo: uma falha ao gravá-lo não derruba o job.
+    """
+    try:
+        _atualizar_job(job_id, progresso=progresso)
+    except Exception:
+        logger.warning("Não foi possível gravar o progresso do job %s", job_id, exc_info=True)
+
+
+def _registrar_falha(job_id, erro):
+    """
+    Marca o job como FALHOU. A transação do job é desfeita primeiro (ela pode
+    estar inválida ou segurando a trava do banco) e o status vai por uma
+    conexão nova; se nem isso funcionar, o erro só é registrado no log, sem
+    sair da thread do executor nem da requisição (com 0 workers).
+    """
+    try:
+        db.session.rollback()
+    except Exception:
+        logger.exception("Erro ao desfazer a transação do job %s", job_id)
+    try:
+        _atualizar_job(job_id, status=FALHOU, erro=str(erro), concluido_em=agora())
+    except Exception:
+        logger.exception("Não foi possível registrar a falha do job %s", job_id)
+
+
+executor_de_jobs = ExecutorDeJobs()
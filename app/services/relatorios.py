@@ -0,0 +1,158 @@
+from sqlalchemy import case, delete, extract, func, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.database import db, executar_passos
+from app.models.alunos import Aluno
+from app.models.relatorios import RelatorioInscricoes, RelatorioPendente
+from app.models.treinamentos import Treinamento
+from app.models.turmas import Turma
+
+# Chave do pg_advisory_xact_lock que serializa as atualizações do agregado
+TRAVA_ATUALIZACAO = 5_240_701
+
+# Agrupamentos disponíveis nos relatórios: nome -> colunas do agregado
+AGRUPAMENTOS = {
+    'vendor': (RelatorioInscricoes.vendor,),
+    'treinamento': (RelatorioInscricoes.treinamento_id,
+                    RelatorioInscricoes.nome_treinamento,
+                    RelatorioInscricoes.vendor),
+    'mes': (RelatorioInscricoes.ano, RelatorioInscricoes.mes),
+}
+
+_agregado = RelatorioInscricoes.__table__
+_pendentes = RelatorioPendente.__table__
+
+
+def marcar_turmas_alteradas(*turma_ids):
+    """
+    Registra que as inscrições das turmas mudaram, para que a próxima leitura
+    dos relatórios recalcule o agregado delas. Deve ser chamada pelas rotas de
+    escrita antes do commit (ON CONFLICT DO NOTHING evita duplicatas).
+    """
+    executar_passos(passos_da_marcacao(turma_ids, db.session.get_bind().dialect.name))
+
+
+def passos_da_marcacao(turma_ids, dialeto):
+    """Passos de marcar_turmas_alteradas (ver app.database.executar_passos)."""
+    turma_ids = {turma_id for turma_id in turma_ids if turma_id is not None}
+    if not turma_ids:
+        return
+
+    linhas = [{'turma_id': turma_id} for turma_id in turma_ids]
+    if dialeto in ('postgresql', 'sqlite'):
+        yield insercao_de_pendentes(dialeto), linhas
+        return
+
+    existentes = set((yield select(_pendentes.c.turma_id).where(
+        _pendentes.c.turma_id.in_(turma_ids)), None).scalars())
+    novas = [linha for linha in linhas if linha['turma_id'] not in existentes]
+    if novas:
+        yield insert(_pendentes), novas
+
+
+def insercao_de_pendentes(dialeto):
+    """
+    INSERT em relatorio_pendentes que ignora turmas já marcadas
+    (ON CONFLICT DO NOTHING, PostgreSQL e SQLite).
+    """
+    modulo = postgresql if dialeto == 'postgresql' else sqlite
+    return modulo.insert(_pendentes).on_conflict_do_nothing(index_elements=['turma_id'])
+
+
+def _consulta_de_origem():
+    """
+    GROUP BY sobre as tabelas de origem que produz as linhas do agregado:
+    inscritos e pagos por treinamento e mês de início da turma.
+    """
+    ano = extract('year', Turma.data_inicio)
+    mes = extract('month', Turma.data_inicio)
+    pagos = func.coalesce(func.sum(case((Aluno.pago.is_(True), 1), else_=0)), 0)
+    return (
+        select(Turma.treinamento_id, ano, mes, Treinamento.vendor,
+               Treinamento.nome_treinamento, func.count(Aluno.id), pagos)
+        .select_from(Aluno)
+        .join(Turma, Aluno.turma_id == Turma.id)
+        .join(Treinamento, Turma.treinamento_id == Treinamento.id)
+        .group_by(Turma.treinamento_id, ano, mes, Treinamento.vendor,
+                  Treinamento.nome_treinamento)
+    )
+
+
+def _inserir_do_grupo(consulta):
+    colunas = ['treinamento_id', 'ano', 'mes', 'vendor', 'nome_treinamento',
+               'total_inscritos', 'pagos']
+    db.session.execute(insert(_agregado).from_select(colunas, consulta))
+
+
+def _travar_atualizacao():
+    # No PostgreSQL, duas leituras simultâneas poderiam recalcular o mesmo
+    # treinamento e colidir na chave primária; a trava dura até o commit.
+    # O SQLite já serializa as escritas.
+    if db.session.get_bind().dialect.name == 'postgresql':
+        db.session.execute(text('SELECT pg_advisory_xact_lock(:chave)'),
+                           {'chave': TRAVA_ATUALIZACAO})
+
+
+def atualizar_relatorios():
+    """
+    Atualização incremental: recalcula o agregado apenas dos treinamentos
+    que têm turmas pendentes e esvazia a fila de pendências.
+
+    Sem pendências custa uma única consulta (LIMIT 1). Retorna quantas turmas
+    estavam pendentes. Não faz commit.
+    """
+    if db.session.scalar(select(_pendentes.c.turma_id).limit(1)) is None:
+        return 0
+
+    _travar_atualizacao()
+    # DELETE ... RETURNING: só esta transação processa as turmas que removeu
+    turma_ids = db.session.scalars(
+        delete(_pendentes).returning(_pendentes.c.turma_id)).all()
+    if not turma_ids:
+        return 0
+
+    treinamento_ids = set(db.session.scalars(
+        select(Turma.treinamento_id).where(Turma.id.in_(turma_ids)).distinct()))
+    if treinamento_ids:
+        db.session.execute(
+            delete(_agregado).where(_agregado.c.treinamento_id.in_(treinamento_ids)))
+        _inserir_do_grupo(
+            _consulta_de_origem().where(Turma.treinamento_id.in_(treinamento_ids)))
+    return len(turma_ids)
+
+
+def reconstruir_relatorios():
+    """Recalcula o agregado inteiro (carga inicial ou correção). Não faz commit."""
+    _travar_atualizacao()
+    db.session.execute(delete(_pendentes))
+    db.session.execute(delete(_agregado))
+    _inserir_do_grupo(_consulta_de_origem())
+    return db.session.scalar(select(func.count()).select_from(_agregado))
+
+
+def relatorio_de_inscricoes(agrupar_por, ano=None, vendor=None):
+    """
+    Soma o agregado pelo agrupamento pedido ('vendor', 'treinamento' ou 'mes'),
+    com filtros opcionais de ano e vendor. Lê apenas a tabela agregada.
+    """
+    colunas = AGRUPAMENTOS[agrupar_por]
+    total = func.sum(RelatorioInscricoes.total_inscritos).label('total_inscritos')
+    pagos = func.sum(RelatorioInscricoes.pagos).label('pagos')
+    consulta = select(*colunas, total, pagos).group_by(*colunas).order_by(*colunas)
+    if ano is not None:
+        consulta = consulta.where(RelatorioInscricoes.ano == ano)
+    if vendor:
+        consulta = consulta.where(RelatorioInscricoes.vendor == vendor)
+
+    itens = []
+    for linha in db.session.execute(consulta):
+        item = {coluna.key: getattr(linha, coluna.key) for coluna in colunas}
+        item.update({
+            'total_inscritos': linha.total_inscritos,
+            'pagos': linha.pagos,
+            'nao_pagos': linha.total_inscritos - linha.pagos,
+            'percentual_pago': round(100 * linha.pagos / linha.total_inscritos, 2)
+            if linha.total_inscritos else 0.0,
+        })
+        itens.append(item)
+    return itens
@@ -0,0 +1,50 @@
+from sqlalchemy import case, func, select
+
+from app.database import executar_passos
+from app.models.alunos import Aluno
+from app.models.turmas import Turma
+
+# Quantidade máxima de turmas por consulta de resumo em lote
+MAXIMO_TURMAS_POR_RESUMO = 1000
+
+
+def resumos_por_turma(turma_ids):
+    """
+    Calcula, em uma única consulta agrupada, o total de inscritos e quantos
+    alunos já pagaram em cada turma:
+
+        SELECT turmas.id, COUNT(alunos.id), SUM(CASE WHEN alunos.pago ...)
+        FROM turmas LEFT JOIN alunos ... WHERE turmas.id IN (...) GROUP BY turmas.id
+
+    O LEFT JOIN faz as turmas sem alunos aparecerem com zero, e as turmas que
+    não existem simplesmente não aparecem no resultado. A contagem usa o
+    índice ix_alunos_turma_id_pago, sem carregar os alunos.
+
+    Retorna um dict {turma_id: resumo}.
+    """
+    return executar_passos(passos_dos_resumos(turma_ids))
+
+
+def passos_dos_resumos(turma_ids):
+    """Passos de resumos_por_turma (ver app.database.executar_passos)."""
+    if not turma_ids:
+        return {}
+
+    pagos = func.coalesce(func.sum(case((Aluno.pago.is_(True), 1), else_=0)), 0)
+    consulta = (
+        select(Turma.id, func.count(Aluno.id).label('total'), pagos.label('pagos'))
+        .outerjoin(Aluno, Aluno.turma_id == Turma.id)
+        .where(Turma.id.in_(set(turma_ids)))
+        .group_by(Turma.id)
+    )
+
+    linhas = yield consulta, None
+    return {
+        linha.id: {
+            'turma_id': linha.id,
+            'total_inscritos': linha.total,
+            'pagos': linha.pagos,
+            'nao_pagos': linha.total - linha.pagos,
+        }
+        for linha in linhas
+    }
@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Valores padrão, sobrescritos em create_app pelas variáveis de ambiente
+TAMANHO_PADRAO = 256
+TTL_PADRAO = 60
+
+
+class CacheLRU:
+    """
+    Cache em memória do processo, com limite de tamanho (descarta o item
+    usado há mais tempo) e tempo de vida (TTL) por item.
+
+    Cada worker tem o seu próprio cache: a invalidação explícita só limpa o
+    processo atual, e o TTL limita por quanto tempo os outros workers podem
+    devolver um valor antigo.
+    """
+
+    def __init__(self, maximo=TAMANHO_PADRAO, ttl=TTL_PADRAO, relogio=time.monotonic):
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+        self._relogio = relogio
+        self.configurar(maximo, ttl)
+
+    def configurar(self, maximo, ttl):
+        """Ajusta os limites e zera o conteúdo e os contadores."""
+        with self._trava:
+            self.maximo = maximo
+            self.ttl = ttl
+            self._itens.clear()
+            self._geracao = getattr(self, '_geracao', 0) + 1
+            self.acertos = 0
+            self.falhas = 0
+            self.expirados = 0
+            self.descartados = 0
+            self.invalidacoes = 0
+
+    def obter(self, chave):
+        """Retorna (True, valor) se a chave estiver no cache e válida, senão (False, None)."""
+        with self._trava:
+            item = self._itens.get(chave)
+            if item is not None:
+                expira_em, valor = item
+                if expira_em > self._relogio():
+                    self._itens.move_to_end(chave)
+                    self.acertos += 1
+                    return True, valor
+                del self._itens[chave]
+                self.expirados += 1
+            self.falhas += 1
+            return False, None
+
+    def guardar(self, chave, valor, geracao=None):
+        """
+        Guarda o valor. Com 'geracao' (lida antes de calcular o valor), não
+        guarda se houve uma invalidação no meio: o valor pode ser anterior
+        à escrita que invalidou o cache.
+        """
+        if self.maximo <= 0:
+            return
+        with self._trava:
+            if geracao is not None and geracao != self._geracao:
+                return
+            self._itens[chave] = (self._relogio() + self.ttl, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.maximo:
+                self._itens.popitem(last=False)
+                self.descartados += 1
+
+    def obter_ou_calcular(self, chave, calcular):
+        """
+        Devolve o valor em cache ou chama 'calcular()' e guarda o resultado.
+        O cálculo acontece fora da trava, para não serializar as requisições;
+        se o cache for invalidado durante o cálculo, o valor é devolvido mas
+        não é guardado.
+        """
+        encontrado, valor = self.obter(chave)
+        if encontrado:
+            return valor
+        geracao = self._geracao
+        valor = calcular()
+        self.guardar(chave, valor, geracao)
+        return valor
+
+    async def obter_ou_aguardar(self, chave, calcular):
+        """Versão asyncio de obter_ou_calcular: 'calcular()' devolve um awaitable."""
+        encontrado, valor = self.obter(chave)
+        if encontrado:
+            return valor
+        geracao = self._geracao
+        valor = await calcular()
+        self.guardar(chave, valor, geracao)
+        return valor
+
+    def invalidar(self):
+        """Remove todos os itens (chamado pelas rotas de escrita)."""
+        with self._trava:
+            self._itens.clear()
+            self._geracao += 1
+            self.invalidacoes += 1
+
+    def estatisticas(self):
+        with self._trava:
+            consultas = self.acertos + self.falhas
+            return {
+                'itens': len(self._itens),
+                'maximo': self.maximo,
+                'ttl_segundos': self.ttl,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_de_acerto': round(self.acertos / consultas, 4) if consultas else None,
+                'expirados': self.expirados,
+                'descartados': self.descartados,
+                'invalidacoes': self.invalidacoes,
+            }
+
+
+# Cache das leituras do catálogo de treinamentos (tabela pequena e quase só lida)
+cache_catalogo = CacheLRU()
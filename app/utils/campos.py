@@ -0,0 +1,45 @@
+from sqlalchemy.orm import load_only
+
+from app.utils.parametros import ParametroInvalido
+
+
+def ler_campos(args, modelo):
+    """
+    Lê o parâmetro 'fields' (ex: ?fields=id,data_inicio,status) e devolve os
+    campos na ordem de modelo.CAMPOS, ou None se o parâmetro não veio.
+    """
+    texto = args.get('fields')
+    if texto is None:
+        return None
+
+    pedidos = {campo.strip() for campo in texto.split(',') if campo.strip()}
+    desconhecidos = sorted(pedidos - set(modelo.CAMPOS))
+    if not pedidos or desconhecidos:
+        raise ParametroInvalido(
+            f"O parâmetro 'fields' aceita: {', '.join(modelo.CAMPOS)}.")
+    return tuple(campo for campo in modelo.CAMPOS if campo in pedidos)
+
+
+def colunas_dos_campos(modelo, campos):
+    """Atributos de coluna do modelo correspondentes aos campos pedidos."""
+    colunas = modelo.__table__.c
+    return [getattr(modelo, campo) for campo in campos if campo in colunas]
+
+
+def carregar_apenas(modelo, campos, *sempre):
+    """
+    Opções de carga para a consulta ORM buscar só as colunas pedidas
+    (SELECT id, data_inicio, status ...). A chave primária sempre vem junto,
+    assim como as colunas em 'sempre' (ex: a chave da paginação).
+    Retorna uma lista vazia quando o parâmetro 'fields' não foi usado.
+    """
+    if campos is None:
+        return []
+    return [load_only(modelo.id, *colunas_dos_campos(modelo, campos), *sempre)]
+
+
+def projetar(registros, campos):
+    """Recorta dicts já serializados (ex: vindos do cache) nos campos pedidos."""
+    if campos is None:
+        return registros
+    return [{campo: registro[campo] for campo in campos} for registro in registros]
@@ -0,0 +1,143 @@
+import gzip
+import zlib
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # dependência opcional: sem ela, só gzip
+    brotli = None
+
+# Tipos de conteúdo comprimidos (texto: JSON, NDJSON, CSV...)
+TIPOS_COMPRIMIVEIS = ('application/json', 'application/x-ndjson')
+
+# Tamanho dos blocos em que corpos grandes são comprimidos e enviados
+TAMANHO_BLOCO = 64 * 1024
+
+
+def codificacoes_disponiveis():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def codificacao_negociada(requisicao):
+    """
+    Codificação a usar na resposta ('br' ou 'gzip'), conforme o
+    Accept-Encoding do cliente, ou None (compressão desligada ou não aceita).
+    """
+    if not current_app.config.get('COMPRESSAO_HABILITADA'):
+        return None
+    return requisicao.accept_encodings.best_match(codificacoes_disponiveis())
+
+
+def aceita_gzip(requisicao):
+    """Se o cliente aceita gzip (ex: para servir um arquivo já comprimido)."""
+    return (bool(current_app.config.get('COMPRESSAO_HABILITADA'))
+            and requisicao.accept_encodings['gzip'] > 0)
+
+
+def _comprimivel(resposta):
+    tipo = resposta.mimetype or ''
+    return tipo.startswith('text/') or tipo in TIPOS_COMPRIMIVEIS
+
+
+class _Compressor:
+    """Interface comum a gzip e brotli para comprimir um fluxo de blocos."""
+
+    def __init__(self, codificacao, config):
+        self.codificacao = codificacao
+        if codificacao == 'br':
+            self._brotli = brotli.Compressor(quality=config['COMPRESSAO_NIVEL_BROTLI'])
+        else:
+            # wbits=31: formato gzip (cabeçalho e CRC), e não zlib puro
+            self._zlib = zlib.compressobj(config['COMPRESSAO_NIVEL'], zlib.DEFLATED, 31)
+
+    def bloco(self, dados):
+        # O flush a cada bloco entrega ao cliente o que já foi comprimido,
+        # em vez de segurar a saída até o fim do fluxo
+        if self.codificacao == 'br':
+            return self._brotli.process(dados) + self._brotli.flush()
+        return self._zlib.compress(dados) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def fim(self):
+        if self.codificacao == 'br':
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+def _comprimir_tudo(dados, codificacao, config):
+    if codificacao == 'br':
+        return brotli.compress(dados, quality=config['COMPRESSAO_NIVEL_BROTLI'])
+    return gzip.compress(dados, compresslevel=config['COMPRESSAO_NIVEL'])
+
+
+def _comprimir_em_blocos(blocos, compressor):
+    try:
+        for bloco in blocos:
+            if isinstance(bloco, str):
+                bloco = bloco.encode('utf-8')
+            if bloco:
+                saida = compressor.bloco(bloco)
+                if saida:
+                    yield saida
+        yield compressor.fim()
+    finally:
+        # Fecha o iterável original (ex: o cursor do streaming das exportações)
+        fechar = getattr(blocos, 'close', None)
+        if fechar is not None:
+            fechar()
+
+
+def _fatiar(dados):
+    for inicio in range(0, len(dados), TAMANHO_BLOCO):
+        yield dados[inicio:inicio + TAMANHO_BLOCO]
+
+
+def comprimir_resposta(resposta):
+    """Hook after_request: comprime a resposta da requisição atual (ver comprimir)."""
+    return comprimir(resposta, request)
+
+
+def comprimir(resposta, requisicao):
+    """
+    Comprime a resposta com a codificação negociada (br ou gzip), quando o
+    tipo é texto e o corpo passa de COMPRESSAO_MINIMO_BYTES.
+
+    Respostas em streaming são comprimidas bloco a bloco, conforme são
+    geradas. Corpos prontos maiores que TAMANHO_BLOCO também saem em blocos,
+    para o worker não comprimir tudo de uma vez antes de enviar o primeiro
+    byte; os menores são comprimidos inteiros e mantêm o Content-Length.
+    'requisicao' só é usada para negociar a codificação (Accept-Encoding).
+    """
+    config = current_app.config
+    if (resposta.status_code < 200 or resposta.status_code in (204, 206, 304)
+            or resposta.direct_passthrough
+            or 'Content-Encoding' in resposta.headers
+            or not _comprimivel(resposta)):
+        return resposta
+
+    resposta.vary.add('Accept-Encoding')
+    codificacao = codificacao_negociada(requisicao)
+    if codificacao is None or 'no-transform' in resposta.headers.get('Cache-Control', ''):
+        return resposta
+
+    if resposta.is_streamed:
+        blocos = resposta.response
+    else:
+        dados = resposta.get_data()
+        if len(dados) < config['COMPRESSAO_MINIMO_BYTES']:
+            return resposta
+        if len(dados) <= TAMANHO_BLOCO:
+            resposta.set_data(_comprimir_tudo(dados, codificacao, config))
+            resposta.headers['Content-Encoding'] = codificacao
+            return resposta
+        blocos = _fatiar(dados)
+
+    resposta.response = _comprimir_em_blocos(blocos, _Compressor(codificacao, config))
+    resposta.headers.pop('Content-Length', None)
+    resposta.headers['Content-Encoding'] = codificacao
+    return resposta
+
+
+def instalar_compressao(app):
+    """Comprime as respostas da aplicação (ver comprimir)."""
+    app.after_request(comprimir_resposta)
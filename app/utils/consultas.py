@@ -0,0 +1,116 @@
+import inspect
+from contextvars import ContextVar
+from functools import wraps
+
+from flask import current_app
+from sqlalchemy import event
+
+from app.database import db, executar_passos
+
+
+class OrcamentoDeConsultasExcedido(RuntimeError):
+    """Erro levantado quando uma rota executa mais SQL do que o declarado."""
+
+
+# Instruções da rota em verificação, por contexto (thread ou task do modo
+# assíncrono): o listener é um só por engine, então requisições simultâneas
+# não entram na conta umas das outras
+_orcamento = ContextVar('orcamento_de_consultas', default=None)
+
+
+def _registrar_instrucao(conn, cursor, statement, parameters, context, executemany):
+    executadas = _orcamento.get()
+    if executadas is not None:
+        executadas.append(statement)
+
+
+def instalar_orcamento_de_consultas(app, *engines):
+    """
+    Registra (uma vez por engine) o listener usado por orcamento_de_consultas,
+    nos engines da aplicação e nos 'engines' extras (ex: o do modo assíncrono).
+    """
+    with app.app_context():
+        # Todos os engines: com réplicas, os SELECTs da rota vão para elas
+        for engine in [*db.engines.values(), *engines]:
+            if not event.contains(engine, 'before_cursor_execute', _registrar_instrucao):
+                event.listen(engine, 'before_cursor_execute', _registrar_instrucao)
+
+
+def _conferir(view, maximo, executadas):
+    if len(executadas) > maximo:
+        raise OrcamentoDeConsultasExcedido(
+            f"A rota '{view.__name__}' executou {len(executadas)} "
+            f"instruções SQL (orçamento: {maximo}).\n"
+            + "\n".join(executadas))
+
+
+def orcamento_de_consultas(maximo):
+    """
+    Declara quantas instruções SQL uma rota pode executar por requisição.
+
+    O limite só é verificado em modo debug ou de teste: em produção o
+    decorator não faz nada. Se a rota passar do orçamento (por exemplo por
+    causa de um N+1 em um relacionamento lazy), a requisição falha com
+    OrcamentoDeConsultasExcedido, para que a regressão apareça nos testes.
+    Aceita também as funções async do modo assíncrono.
+    """
+    def decorator(view):
+        if inspect.iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapper_assincrono(*args, **kwargs):
+                if not (current_app.debug or current_app.testing):
+                    return await view(*args, **kwargs)
+                executadas = []
+                token = _orcamento.set(executadas)
+                try:
+                    resposta = await view(*args, **kwargs)
+                finally:
+                    _orcamento.reset(token)
+                _conferir(view, maximo, executadas)
+                return resposta
+            return wrapper_assincrono
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            app = current_app._get_current_object()
+            if not (app.debug or app.testing):
+                return view(*args, **kwargs)
+
+            executadas = []
+            token = _orcamento.set(executadas)
+            try:
+                resposta = view(*args, **kwargs)
+            finally:
+                _orcamento.reset(token)
+            _conferir(view, maximo, executadas)
+            return resposta
+        return wrapper
+    return decorator
+
+
+# Maior lista aceita pelos endpoints de busca por ids (?ids=1,2,3)
+MAXIMO_IDS_POR_CONSULTA = 5000
+# Parâmetros reservados para os demais filtros da consulta
+MARGEM_DE_PARAMETROS = 100
+
+
+def buscar_por_ids(consulta, coluna, ids):
+    """
+    Executa a consulta ORM com 'coluna IN (...)' para todos os ids e retorna
+    {id: objeto}. A lista é dividida em blocos que respeitam o limite de
+    parâmetros por instrução do driver (32700 no SQLite e no psycopg2), então
+    alguns milhares de ids continuam sendo uma única ida ao banco.
+    """
+    return executar_passos(
+        passos_da_busca_por_ids(consulta, coluna, ids, db.session.get_bind().dialect))
+
+
+def passos_da_busca_por_ids(consulta, coluna, ids, dialeto):
+    """Passos de buscar_por_ids (ver app.database.executar_passos)."""
+    limite = dialeto.insertmanyvalues_max_parameters - MARGEM_DE_PARAMETROS
+    encontrados = {}
+    for inicio in range(0, len(ids), limite):
+        bloco = ids[inicio:inicio + limite]
+        for objeto in (yield consulta.where(coluna.in_(bloco)), None).scalars().unique():
+            encontrados[getattr(objeto, coluna.key)] = objeto
+    return encontrados
@@ -0,0 +1,181 @@
+import asyncio
+import contextvars
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from sqlalchemy.pool import SingletonThreadPool, StaticPool
+
+from app.database import observadores_de_execucao
+
+logger = logging.getLogger(__name__)
+
+# Valores padrão, sobrescritos em create_app pelas variáveis de ambiente
+LIMIAR_PADRAO_MS = 200
+MAXIMO_PADRAO = 200
+
+# Só estas instruções têm plano de execução (EXPLAIN sem ANALYZE não executa nada)
+INSTRUCOES_COM_PLANO = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+
+
+def redigir_parametros(parametros):
+    """
+    Substitui os valores dos parâmetros pelo tipo, para não gravar dados
+    pessoais (nomes, e-mails) no log: ('a@b.com', 3) -> ['<str>', '<int>'].
+    """
+    if isinstance(parametros, dict):
+        return {chave: f'<{type(valor).__name__}>' for chave, valor in parametros.items()}
+    if isinstance(parametros, (list, tuple)):
+        return [f'<{type(valor).__name__}>' for valor in parametros]
+    return None
+
+
+class RegistroConsultasLentas:
+    """
+    Guarda as últimas consultas lentas das rotas em um buffer circular.
+
+    O plano de execução (EXPLAIN no PostgreSQL, EXPLAIN QUERY PLAN no SQLite)
+    é capturado em uma thread separada, por outra conexão do pool, para não
+    atrasar a requisição que já está lenta.
+    """
+
+    def __init__(self, limiar_ms=LIMIAR_PADRAO_MS, maximo=MAXIMO_PADRAO):
+        self._trava = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='explain')
+        self._pendentes = []
+        self._sequencia = 0
+        # Modo assíncrono: engine síncrono interno -> AsyncEngine, e as tasks
+        # que capturam os planos das suas consultas
+        self._engines_assincronos = {}
+        self._tarefas = set()
+        self.configurar(limiar_ms, maximo)
+
+    def configurar(self, limiar_ms, maximo):
+        with self._trava:
+            self.limiar = limiar_ms / 1000
+            self.registros = deque(maxlen=maximo)
+
+    def registrar_engine_assincrono(self, engine):
+        """
+        Engine asyncio do modo assíncrono: ele só roda dentro do event loop,
+        então o plano das suas consultas lentas é capturado por uma task no
+        próprio loop (mesmo driver e mesmo formato de parâmetros da consulta).
+        """
+        self._engines_assincronos[engine.sync_engine] = engine
+
+    def observar(self, conn, statement, parameters, executemany, duracao, endpoint):
+        if duracao < self.limiar or endpoint is None:
+            return
+
+        with self._trava:
+            self._sequencia += 1
+            registro = {
+                'id': self._sequencia,
+                'registrada_em': datetime.now(timezone.utc).isoformat(),
+                'endpoint': endpoint,
+                'duracao_ms': round(duracao * 1000, 3),
+                'sql': statement,
+                'parametros': None if executemany else redigir_parametros(parameters),
+                'executemany': executemany,
+                'plano': None,
+            }
+            self.registros.append(registro)
+
+        logger.warning("Consulta lenta (%.1f ms) em %s: %s",
+                       registro['duracao_ms'], endpoint, statement)
+
+        if executemany or not statement.lstrip().upper().startswith(INSTRUCOES_COM_PLANO):
+            return
+
+        dialeto = conn.dialect.name
+        prefixo = 'EXPLAIN QUERY PLAN ' if dialeto == 'sqlite' else 'EXPLAIN '
+        sql_plano = prefixo + statement
+
+        engine_assincrono = self._engines_assincronos.get(conn.engine)
+        if engine_assincrono is not None:
+            # Em um contexto vazio: a task não herda a contagem de SQL da
+            # requisição, e o próprio EXPLAIN não entra nela nem neste log
+            tarefa = contextvars.Context().run(
+                asyncio.get_running_loop().create_task, _explicar_no_event_loop(
+                    engine_assincrono, sql_plano, parameters, dialeto, registro))
+            self._tarefas.add(tarefa)
+            tarefa.add_done_callback(self._tarefas.discard)
+            return
+
+        if isinstance(conn.engine.pool, (StaticPool, SingletonThreadPool)):
+            # Pool de conexão única (SQLite em memória): outra conexão não
+            # enxergaria as tabelas e devolvê-la ao pool faria rollback da
+            # transação da requisição, então o plano é lido aqui mesmo.
+            registro['plano'] = _explicar_no_cursor(
+                conn.connection.dbapi_connection, sql_plano, parameters, dialeto)
+            return
+
+        with self._trava:
+            self._pendentes = [f for f in self._pendentes if not f.done()]
+            self._pendentes.append(self._executor.submit(
+                _explicar_em_segundo_plano, conn.engine, sql_plano, parameters,
+                dialeto, registro))
+
+    def aguardar(self):
+        """Espera os planos pendentes serem capturados (usado nos testes)."""
+        with self._trava:
+            pendentes, self._pendentes = self._pendentes, []
+        for futuro in pendentes:
+            futuro.result()
+
+    async def aguardar_no_event_loop(self):
+        """Espera os planos das consultas do modo assíncrono (usado nos testes)."""
+        await asyncio.gather(*self._tarefas)
+
+    def listar(self, limite=None):
+        """Registros do mais recente para o mais antigo."""
+        with self._trava:
+            registros = list(reversed(self.registros))
+        return registros[:limite] if limite else registros
+
+    def limpar(self):
+        with self._trava:
+            self.registros.clear()
+
+
+def _formatar_plano(linhas, dialeto):
+    # SQLite: (id, parent, notused, detail); PostgreSQL: uma coluna "QUERY PLAN"
+    if dialeto == 'sqlite':
+        return '\n'.join(str(linha[-1]) for linha in linhas)
+    return '\n'.join(str(linha[0]) for linha in linhas)
+
+
+def _explicar_no_cursor(dbapi_connection, sql_plano, parametros, dialeto):
+    try:
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(sql_plano, parametros or ())
+            return _formatar_plano(cursor.fetchall(), dialeto)
+        finally:
+            cursor.close()
+    except Exception as e:
+        return f"Não foi possível obter o plano: {e}"
+
+
+def _explicar_em_segundo_plano(engine, sql_plano, parametros, dialeto, registro):
+    try:
+        with engine.connect() as conexao:
+            linhas = conexao.exec_driver_sql(sql_plano, parametros or ()).fetchall()
+        registro['plano'] = _formatar_plano(linhas, dialeto)
+    except Exception as e:
+        registro['plano'] = f"Não foi possível obter o plano: {e}"
+
+
+async def _explicar_no_event_loop(engine, sql_plano, parametros, dialeto, registro):
+    try:
+        async with engine.connect() as conexao:
+            linhas = (await conexao.exec_driver_sql(sql_plano, parametros or ())).fetchall()
+        registro['plano'] = _formatar_plano(linhas, dialeto)
+    except Exception as e:
+        registro['plano'] = f"Não foi possível obter o plano: {e}"
+
+
+consultas_lentas = RegistroConsultasLentas()
+observadores_de_execucao.append(consultas_lentas.observar)
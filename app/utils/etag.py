@@ -0,0 +1,124 @@
+import hashlib
+from datetime import date
+from functools import wraps
+
+from flask import g, make_response, request
+from sqlalchemy import String, cast, literal, select, update
+
+from app.database import db
+from app.utils.compressao import codificacao_negociada
+from app.models.versoes import VersaoRecurso
+
+# Recursos versionados
+CATALOGO = 'catalogo'
+AGENDA = 'agenda'
+
+_tabela = VersaoRecurso.__table__
+
+
+def registrar_alteracao(*recursos):
+    """
+    Incrementa a versão dos recursos na transação atual. Deve ser chamada
+    pelas rotas de escrita antes do commit, para que a nova versão só fique
+    visível junto com os dados alterados.
+    """
+    for recurso in recursos:
+        resultado = db.session.execute(
+            update(_tabela).where(_tabela.c.recurso == recurso)
+            .values(versao=_tabela.c.versao + 1))
+        if resultado.rowcount == 0:
+            db.session.execute(_tabela.insert().values(recurso=recurso, versao=1))
+
+
+def consulta_de_versoes(recursos, adicionais=()):
+    """
+    Uma única consulta à chave primária (sem ORM) com as versões dos recursos.
+
+    'adicionais' são pares (nome, expressão escalar) lidos na mesma consulta
+    (UNION ALL), para versões que não ficam em versoes_recursos (ex: a soma
+    de Turma.versao_vagas das turmas listadas).
+    """
+    consulta = (select(_tabela.c.recurso, _tabela.c.versao)
+                .where(_tabela.c.recurso.in_(recursos)))
+    for nome, expressao in adicionais:
+        consulta = consulta.union_all(select(cast(literal(nome), String), expressao))
+    return consulta
+
+
+def versoes_em_ordem(linhas, recursos):
+    versoes = dict(linhas)
+    return [versoes.get(recurso, 0) for recurso in recursos]
+
+
+def versoes_atuais(recursos, adicionais=()):
+    """Lê as versões dos recursos, na ordem pedida (0 se nunca alterado)."""
+    nomes = list(recursos) + [nome for nome, _ in adicionais]
+    return versoes_em_ordem(
+        db.session.execute(consulta_de_versoes(recursos, adicionais)).all(), nomes)
+
+
+def versao_lida(recurso):
+    """
+    Versão do recurso lida pelo etag_por_versao desta requisição, no mesmo
+    banco (primário ou réplica) que responde a rota. Usada na chave do cache
+    do catálogo: um valor calculado antes de uma escrita, ou em uma réplica
+    atrasada, nunca é servido com o ETag de uma versão mais nova.
+    """
+    versoes = g.get('versoes_lidas', {})
+    if recurso not in versoes:
+        return versoes_atuais([recurso])[0]
+    return versoes[recurso]
+
+
+def calcular_etag(recursos, versoes, requisicao, varia_por_dia=False):
+    """
+    ETag derivado das versões dos recursos, da URL, do formato pedido
+    (Accept) e da compressão negociada (Accept-Encoding).
+    """
+    partes = [f'{r}={v}' for r, v in zip(recursos, versoes)]
+    partes += [requisicao.full_path, requisicao.headers.get('Accept', ''),
+               codificacao_negociada(requisicao) or '']
+    if varia_por_dia:
+        partes.append(date.today().isoformat())
+    return hashlib.sha1('|'.join(partes).encode('utf-8')).hexdigest()
+
+
+def etag_por_versao(*recursos, varia_por_dia=False, ignorar_se=None, adicionais=None):
+    """
+    Adiciona um ETag forte à rota, derivado das versões dos recursos, da URL,
+    do formato pedido (Accept) e da compressão negociada (Accept-Encoding).
+    Se o cliente enviar um If-None-Match que ainda é válido, responde 304
+    sem executar a rota.
+
+    'varia_por_dia' é para rotas cujo resultado depende da data atual
+    (ex: turmas futuras), que mudam na virada do dia mesmo sem escrita.
+
+    'ignorar_se' recebe a requisição e, se retornar True, a rota responde sem
+    ETag — para variações que dependem de dados não versionados.
+
+    'adicionais' recebe a requisição e devolve pares (nome, expressão
+    escalar) com outras versões que entram no ETag (ver consulta_de_versoes).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if ignorar_se is not None and ignorar_se(request):
+                return view(*args, **kwargs)
+
+            extras = adicionais(request) if adicionais is not None else ()
+            nomes = recursos + tuple(nome for nome, _ in extras)
+            versoes = versoes_atuais(recursos, extras)
+            g.versoes_lidas = dict(zip(nomes, versoes))
+            etag = calcular_etag(nomes, versoes, request, varia_por_dia)
+
+            if etag in request.if_none_match:
+                resposta = make_response('', 304)
+                resposta.set_etag(etag)
+                return resposta
+
+            resposta = make_response(view(*args, **kwargs))
+            if resposta.status_code == 200:
+                resposta.set_etag(etag)
+            return resposta
+        return wrapper
+    return decorator
@@ -0,0 +1,118 @@
+import csv
+import io
+
+from flask import Response, current_app, stream_with_context
+
+from app.database import db
+from app.utils.paginacao import depois_de
+
+FORMATO_NDJSON = 'application/x-ndjson'
+FORMATO_CSV = 'text/csv'
+
+# Linhas buscadas do cursor do servidor por vez
+LINHAS_POR_BUSCA = 1000
+
+
+def formato_de_exportacao(requisicao):
+    """
+    Retorna o formato de exportação pedido no cabeçalho Accept
+    (NDJSON ou CSV), ou None para a resposta JSON normal.
+    """
+    formato = requisicao.accept_mimetypes.best_match(
+        ['application/json', FORMATO_NDJSON, FORMATO_CSV])
+    return formato if formato in (FORMATO_NDJSON, FORMATO_CSV) else None
+
+
+def exportar(consulta, formato, nome_arquivo, montar_registro=None):
+    """
+    Transmite o resultado de uma consulta Core (select de colunas) linha a
+    linha, sem criar objetos do ORM nem montar a lista inteira em memória.
+
+    A consulta é executada com um cursor do lado do servidor
+    (stream_results/yield_per), então o primeiro byte sai assim que o
+    primeiro bloco de linhas chega do banco.
+
+    'montar_registro' converte cada linha no objeto do NDJSON; por padrão
+    é usado o próprio mapeamento coluna -> valor. O CSV é sempre plano.
+    """
+    gerador, extensao = gerar_exportacao(consulta, formato, montar_registro)
+    resposta = Response(stream_with_context(gerador), mimetype=formato)
+    resposta.headers['Content-Disposition'] = f'attachment; filename={nome_arquivo}.{extensao}'
+    return resposta
+
+
+def gerar_exportacao(consulta, formato, montar_registro=None, chave=None):
+    """
+    Retorna (gerador, extensao): o gerador produz o arquivo em blocos de
+    texto, um por busca de LINHAS_POR_BUSCA linhas ao banco. Usado tanto
+    pela resposta em streaming quanto pelos jobs que gravam em arquivo.
+
+    Sem 'chave' a consulta é lida de uma vez por um cursor do servidor. Com
+    'chave' (colunas de ordenação únicas, como em paginar_por_chave) cada
+    bloco é uma consulta separada que começa depois da última linha do
+    anterior, e a transação de leitura termina entre os blocos: quem consome
+    o gerador pode gravar no banco entre um bloco e outro.
+    """
+    if chave is None:
+        consulta = consulta.execution_options(
+            stream_results=True, yield_per=LINHAS_POR_BUSCA)
+        blocos = _blocos_do_cursor(consulta)
+    else:
+        blocos = _blocos_por_chave(consulta, chave)
+
+    if formato == FORMATO_CSV:
+        return _gerar_csv(consulta.selected_columns.keys(), blocos), 'csv'
+    return _gerar_ndjson(blocos, montar_registro or _registro_padrao), 'ndjson'
+
+
+def _blocos_do_cursor(consulta):
+    yield from db.session.execute(consulta).partitions()
+
+
+def _blocos_por_chave(consulta, chave):
+    consulta = consulta.order_by(*chave).limit(LINHAS_POR_BUSCA)
+    pagina = consulta
+    while True:
+        bloco = db.session.execute(pagina).all()
+        # Encerra a leitura antes de entregar o bloco
+        db.session.commit()
+        if bloco:
+            yield bloco
+        if len(bloco) < LINHAS_POR_BUSCA:
+            return
+        ultima = bloco[-1]
+        pagina = consulta.where(depois_de(
+            chave, [getattr(ultima, coluna.key) for coluna in chave]))
+
+
+def _registro_padrao(linha):
+    return dict(linha._mapping)
+
+
+def _valor_simples(valor):
+    # Datas saem no mesmo formato do to_dict() (ISO 8601)
+    return valor.isoformat() if hasattr(valor, 'isoformat') else valor
+
+
+def _gerar_ndjson(blocos, montar_registro):
+    # Um bloco de texto por busca ao banco, em vez de um yield por linha.
+    # O provider JSON da aplicação (orjson, se instalado) codifica as datas.
+    codificar = current_app.json.codificar
+    for bloco in blocos:
+        yield ''.join(codificar(montar_registro(linha)) + '\n' for linha in bloco)
+
+
+def _gerar_csv(colunas, blocos):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+
+    escritor.writerow(colunas)
+    for bloco in blocos:
+        for linha in bloco:
+            escritor.writerow([_valor_simples(valor) for valor in linha])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,207 @@
+import hashlib
+import itertools
+import time
+from datetime import timedelta
+from functools import wraps
+
+from flask import current_app, jsonify, make_response, request
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from app.database import db
+from app.models.idempotencia import ChaveIdempotencia
+from app.models.jobs import agora
+
+CABECALHO = 'Idempotency-Key'
+TAMANHO_MAXIMO_CHAVE = 255
+# Cabeçalhos da resposta original devolvidos junto na repetição
+CABECALHOS_GUARDADOS = ('Location',)
+# Uma chave em andamento há mais tempo que isso é de uma requisição que não
+# terminou (ex: worker reiniciado) e pode ser assumida por uma repetição
+ABANDONO_EM_ANDAMENTO = timedelta(minutes=10)
+# A cada quantas chaves novas (por processo) as expiradas são apagadas
+PURGA_A_CADA = 100
+
+_tabela = ChaveIdempotencia.__table__
+_contador = itertools.count(1)
+
+
+def _reservar(chave, rota, impressao):
+    """
+    Grava a chave como 'em andamento' (status nulo) e faz commit, para que
+    as repetições concorrentes a encontrem. Retorna None se esta requisição
+    ficou com a chave, ou a linha já existente.
+    """
+    momento = agora()
+    valores = {'chave': chave, 'rota': rota, 'impressao': impressao, 'criado_em': momento,
+               'expira_em': momento + timedelta(hours=current_app.config['IDEMPOTENCIA_TTL_HORAS'])}
+    dialeto = db.session.get_bind().dialect.name
+    if dialeto in ('postgresql', 'sqlite'):
+        modulo = postgresql if dialeto == 'postgresql' else sqlite
+        instrucao = modulo.insert(_tabela).values(**valores).on_conflict_do_nothing(
+            index_elements=['chave', 'rota'])
+    else:
+        instrucao = insert(_tabela).values(**valores)
+
+    while True:
+        try:
+            reservada = db.session.execute(instrucao.returning(_tabela.c.chave)).first() is not None
+        except IntegrityError:
+            # Bancos sem ON CONFLICT: a chave já existe
+            db.session.rollback()
+            reservada = False
+        if reservada:
+            if next(_contador) % PURGA_A_CADA == 0:
+                db.session.execute(delete(_tabela).where(_tabela.c.expira_em < momento))
+            db.session.commit()
+            return None
+
+        existente = _buscar(chave, rota)
+        if existente is None:
+            continue
+        if existente.expira_em <= momento:
+            db.session.execute(delete(_tabela).where(
+                _tabela.c.chave == chave, _tabela.c.rota == rota,
+                _tabela.c.expira_em <= momento))
+            db.session.commit()
+            continue
+        if existente.status is None and existente.criado_em < momento - ABANDONO_EM_ANDAMENTO:
+            assumida = db.session.execute(
+                update(_tabela)
+                .where(_tabela.c.chave == chave, _tabela.c.rota == rota,
+                       _tabela.c.status.is_(None),
+                       _tabela.c.criado_em == existente.criado_em)
+                .values(**valores))
+            db.session.commit()
+            if assumida.rowcount:
+                return None
+            continue
+        db.session.commit()
+        return existente
+
+
+def _buscar(chave, rota):
+    return db.session.execute(
+        select(_tabela).where(_tabela.c.chave == chave, _tabela.c.rota == rota)).first()
+
+
+def _aguardar(chave, rota):
+    """
+    Espera a requisição que ficou com a chave terminar, consultando a linha
+    com intervalos crescentes. Retorna a linha (com status se terminou a
+    tempo) ou None se a chave foi liberada (a primeira requisição falhou).
+    """
+    prazo = time.monotonic() + current_app.config['IDEMPOTENCIA_ESPERA_SEGUNDOS']
+    intervalo = 0.05
+    while True:
+        # Encerra a transação para a próxima leitura ver o que já foi gravado
+        db.session.commit()
+        time.sleep(intervalo)
+        linha = _buscar(chave, rota)
+        if linha is None or linha.status is not None or time.monotonic() >= prazo:
+            db.session.commit()
+            return linha
+        intervalo = min(intervalo * 2, 0.5)
+
+
+def _gravar(chave, rota, resposta):
+    db.session.execute(
+        update(_tabela).where(_tabela.c.chave == chave, _tabela.c.rota == rota)
+        .values(status=resposta.status_code,
+                corpo=resposta.get_data(),
+                tipo_conteudo=resposta.content_type,
+                cabecalhos={nome: resposta.headers[nome] for nome in CABECALHOS_GUARDADOS
+                            if nome in resposta.headers}))
+    db.session.commit()
+
+
+def _liberar(chave, rota):
+    db.session.execute(delete(_tabela).where(_tabela.c.chave == chave, _tabela.c.rota == rota))
+    db.session.commit()
+
+
+def _impressao(conferir_corpo):
+    """
+    Hash da requisição guardado com a chave: o corpo (se 'conferir_corpo') e
+    a query string, que muda o que a rota faz (ex: ?modo=upsert). Sem query
+    string é só o hash do corpo (ou None), como nas chaves já gravadas.
+    """
+    if not conferir_corpo and not request.query_string:
+        return None
+    impressao = hashlib.sha256(request.get_data() if conferir_corpo else b'')
+    if request.query_string:
+        impressao.update(b'\0' + request.query_string)
+    return impressao.hexdigest()
+
+
+def _repetir(linha):
+    resposta = current_app.response_class(linha.corpo, status=linha.status,
+                                          content_type=linha.tipo_conteudo)
+    resposta.headers.extend(linha.cabecalhos or {})
+    resposta.headers['Idempotent-Replayed'] = 'true'
+    return resposta
+
+
+def idempotente(conferir_corpo=True):
+    """
+    Suporte ao cabeçalho Idempotency-Key em rotas POST.
+
+    A primeira requisição com a chave executa a rota e grava a resposta
+    (status, corpo e Location); as repetições dentro do prazo de expiração
+    recebem a resposta gravada sem executar a rota de novo. Uma repetição que
+    chega enquanto a primeira ainda executa espera por ela (até
+    IDEMPOTENCIA_ESPERA_SEGUNDOS; depois responde 409 com Retry-After).
+
+    Respostas 5xx não são gravadas: a chave é liberada para nova tentativa.
+    Reusar a chave com outro corpo ou outra query string (ex: ?modo=upsert)
+    responde 422. 'conferir_corpo=False' é para rotas que leem o corpo em
+    streaming (ex: importação em lote): nelas só a query string é conferida.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            chave = request.headers.get(CABECALHO)
+            if chave is None:
+                return view(*args, **kwargs)
+            chave = chave.strip()
+            if not chave or len(chave) > TAMANHO_MAXIMO_CHAVE:
+                return jsonify({"erro": f"O cabeçalho '{CABECALHO}' deve ter entre 1 e "
+                                        f"{TAMANHO_MAXIMO_CHAVE} caracteres."}), 400
+
+            rota = request.path
+            impressao = _impressao(conferir_corpo)
+
+            while True:
+                existente = _reservar(chave, rota, impressao)
+                if existente is None:
+                    break
+                if existente.impressao != impressao:
+                    return jsonify({"erro": f"O '{CABECALHO}' já foi usado com outro corpo "
+                                            "ou outros parâmetros de requisição."}), 422
+                if existente.status is None:
+                    existente = _aguardar(chave, rota)
+                    if existente is None:
+                        continue
+                    if existente.status is None:
+                        resposta = jsonify({"erro": "Uma requisição com este "
+                                                    f"'{CABECALHO}' ainda está em andamento."})
+                        resposta.headers['Retry-After'] = '1'
+                        return resposta, 409
+                return _repetir(existente)
+
+            try:
+                resposta = make_response(view(*args, **kwargs))
+            except Exception:
+                db.session.rollback()
+                _liberar(chave, rota)
+                raise
+
+            if resposta.status_code >= 500 or resposta.is_streamed:
+                db.session.rollback()
+                _liberar(chave, rota)
+            else:
+                _gravar(chave, rota, resposta)
+            return resposta
+        return wrapper
+    return decorator
@@ -0,0 +1,146 @@
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, request
+
+from app.database import db, encerrar_contagem_sql, iniciar_contagem_sql, instalar_contadores_sql
+
+# Limites (em segundos) dos buckets de latência e de tempo de banco
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Limites dos buckets de instruções SQL por requisição
+BUCKETS_INSTRUCOES = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+
+class Histograma:
+    """Histograma acumulado no formato do Prometheus (buckets, soma e contagem)."""
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+
+class RegistroDeMetricas:
+    """
+    Guarda as métricas por rota deste processo. Cada requisição faz apenas
+    algumas somas sob uma trava, então pode ficar ligado em produção.
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.zerar()
+
+    def zerar(self):
+        with self._trava:
+            self.requisicoes = {}
+            self.latencia = {}
+            self.tempo_banco = {}
+            self.instrucoes = {}
+
+    def registrar(self, endpoint, metodo, status, duracao, instrucoes, tempo_banco):
+        chave = (endpoint, metodo)
+        with self._trava:
+            chave_status = (endpoint, metodo, str(status))
+            self.requisicoes[chave_status] = self.requisicoes.get(chave_status, 0) + 1
+            self._histograma(self.latencia, chave, BUCKETS_SEGUNDOS).observar(duracao)
+            self._histograma(self.tempo_banco, chave, BUCKETS_SEGUNDOS).observar(tempo_banco)
+            self._histograma(self.instrucoes, chave, BUCKETS_INSTRUCOES).observar(instrucoes)
+
+    @staticmethod
+    def _histograma(tabela, chave, limites):
+        histograma = tabela.get(chave)
+        if histograma is None:
+            histograma = tabela[chave] = Histograma(limites)
+        return histograma
+
+    def exportar(self):
+        """Gera o texto no formato de exposição do Prometheus (versão 0.0.4)."""
+        with self._trava:
+            linhas = [
+                '# HELP http_requests_total Total de requisições por rota, método e status.',
+                '# TYPE http_requests_total counter',
+            ]
+            for (endpoint, metodo, status), total in sorted(self.requisicoes.items()):
+                rotulos = _rotulos(endpoint=endpoint, method=metodo, status=status)
+                linhas.append(f'http_requests_total{{{rotulos}}} {total}')
+
+            _exportar_histogramas(
+                linhas, 'http_request_duration_seconds',
+                'Latência das requisições por rota.', self.latencia)
+            _exportar_histogramas(
+                linhas, 'http_request_db_seconds',
+                'Tempo gasto no banco por requisição.', self.tempo_banco)
+            _exportar_histogramas(
+                linhas, 'http_request_db_statements',
+                'Instruções SQL executadas por requisição.', self.instrucoes)
+        return '\n'.join(linhas) + '\n'
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _rotulos(**valores):
+    return ','.join(f'{nome}="{_escapar(valor)}"' for nome, valor in valores.items())
+
+
+def _formatar_limite(limite):
+    return repr(float(limite))
+
+
+def _exportar_histogramas(linhas, nome, ajuda, tabela):
+    linhas.append(f'# HELP {nome} {ajuda}')
+    linhas.append(f'# TYPE {nome} histogram')
+    for (endpoint, metodo), histograma in sorted(tabela.items()):
+        base = _rotulos(endpoint=endpoint, method=metodo)
+        acumulado = 0
+        for limite, contagem in zip(histograma.limites, histograma.contagens):
+            acumulado += contagem
+            linhas.append(f'{nome}_bucket{{{base},le="{_formatar_limite(limite)}"}} {acumulado}')
+        linhas.append(f'{nome}_bucket{{{base},le="+Inf"}} {histograma.total}')
+        linhas.append(f'{nome}_sum{{{base}}} {histograma.soma}')
+        linhas.append(f'{nome}_count{{{base}}} {histograma.total}')
+
+
+metricas = RegistroDeMetricas()
+
+
+def instalar_metricas(app):
+    """
+    Liga a coleta de métricas na aplicação: hooks de requisição para medir a
+    latência e listeners no engine para contar SQL e tempo de banco.
+
+    A medição termina no teardown, para que respostas em streaming contem
+    também o tempo (e as consultas) do envio do corpo.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            instalar_contadores_sql(engine)
+
+    @app.before_request
+    def _iniciar_medicao():
+        g.inicio_requisicao = time.perf_counter()
+        iniciar_contagem_sql(request.endpoint)
+
+    @app.after_request
+    def _guardar_status(resposta):
+        g.status_resposta = resposta.status_code
+        return resposta
+
+    @app.teardown_request
+    def _registrar_medicao(erro=None):
+        inicio = g.pop('inicio_requisicao', None)
+        if inicio is None:
+            return
+        instrucoes, tempo_banco = encerrar_contagem_sql()
+        status = g.pop('status_resposta', 500)
+        metricas.registrar(
+            request.endpoint or '<sem_rota>', request.method, status,
+            time.perf_counter() - inicio, instrucoes, tempo_banco)
@@ -0,0 +1,118 @@
+import base64
+import json
+
+from sqlalchemy import tuple_
+
+from app.database import executar_passos
+
+# Tamanho de página usado quando apenas o 'cursor' é informado
+LIMITE_PADRAO = 100
+# Teto para evitar que um cliente peça a tabela inteira de uma vez
+LIMITE_MAXIMO = 1000
+
+
+class CursorInvalido(ValueError):
+    """Erro levantado quando o cursor ou o limite recebidos não são válidos."""
+
+
+def paginacao_solicitada(args):
+    """
+    A paginação é opcional: só é aplicada se 'limit' ou 'cursor' estiverem na URL.
+    Sem eles as rotas mantêm a resposta antiga (lista simples).
+    """
+    return 'limit' in args or 'cursor' in args
+
+
+def codificar_cursor(valores):
+    """
+    Transforma os valores da chave de ordenação da última linha da página em
+    um token opaco (base64 url-safe de um JSON).
+    """
+    bruto = json.dumps(list(valores), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(bruto).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor, colunas):
+    """
+    Faz o caminho inverso de 'codificar_cursor', validando o formato e o tipo
+    de cada valor contra a sua coluna (int para 'id', str para
+    'nome_treinamento'): um valor de outro tipo não chega à consulta.
+    """
+    try:
+        preenchimento = '=' * (-len(cursor) % 4)
+        bruto = base64.urlsafe_b64decode(cursor + preenchimento)
+        valores = json.loads(bruto.decode('utf-8'))
+    except (ValueError, TypeError):
+        raise CursorInvalido("O 'cursor' informado é inválido.")
+
+    if not isinstance(valores, list) or len(valores) != len(colunas):
+        raise CursorInvalido("O 'cursor' informado é inválido.")
+    for coluna, valor in zip(colunas, valores):
+        # bool é subclasse de int, mas nunca é um valor válido da chave
+        if isinstance(valor, bool) or not isinstance(valor, coluna.type.python_type):
+            raise CursorInvalido("O 'cursor' informado é inválido.")
+    return valores
+
+
+def obter_limite(args):
+    """
+    Lê o parâmetro 'limit' da URL, aplicando o padrão e o teto.
+    """
+    limite = args.get('limit', LIMITE_PADRAO)
+    try:
+        limite = int(limite)
+    except (TypeError, ValueError):
+        raise CursorInvalido("O valor para 'limit' deve ser um número inteiro.")
+
+    if not 1 <= limite <= LIMITE_MAXIMO:
+        raise CursorInvalido(
+            f"O valor para 'limit' deve ser entre 1 e {LIMITE_MAXIMO}.")
+    return limite
+
+
+def paginar_por_chave(consulta, colunas, args):
+    """
+    Aplica paginação por chave (keyset) ao select() de uma entidade do ORM.
+
+    'colunas' é a chave de ordenação, que precisa ser única (termine sempre
+    com a chave primária). Em vez de OFFSET, a próxima página começa logo
+    depois da última linha vista, então o custo de cada página é o mesmo
+    independente da profundidade — desde que exista um índice nessas colunas.
+
+    Retorna a tupla (linhas, next_cursor). 'next_cursor' é None na última página.
+    """
+    return executar_passos(passos_da_paginacao(consulta, colunas, args))
+
+
+def passos_da_paginacao(consulta, colunas, args):
+    """Passos de paginar_por_chave (ver app.database.executar_passos)."""
+    limite = obter_limite(args)
+    cursor = args.get('cursor')
+
+    if cursor:
+        valores = decodificar_cursor(cursor, colunas)
+        consulta = consulta.where(depois_de(colunas, valores))
+
+    # Busca uma linha a mais só para saber se existe uma próxima página
+    linhas = (yield consulta.order_by(*colunas).limit(limite + 1), None).scalars().all()
+
+    next_cursor = None
+    if len(linhas) > limite:
+        linhas = linhas[:limite]
+        ultima = linhas[-1]
+        next_cursor = codificar_cursor(
+            getattr(ultima, coluna.key) for coluna in colunas)
+
+    return linhas, next_cursor
+
+
+def depois_de(colunas, valores):
+    """
+    Monta o predicado "(c1, c2, ...) > (v1, v2, ...)" como comparação de
+    linhas (row value), que o PostgreSQL usa como início de um intervalo no
+    índice composto; a forma expandida em AND/OR faria a busca percorrer o
+    índice desde o começo. O SQLite aceita a mesma sintaxe desde a 3.15.
+    """
+    if len(colunas) == 1:
+        return colunas[0] > valores[0]
+    return tuple_(*colunas) > tuple_(*valores)
@@ -0,0 +1,27 @@
+class ParametroInvalido(ValueError):
+    """Erro levantado quando um parâmetro da URL não tem o formato esperado."""
+
+
+def ler_lista_de_ids(texto, maximo, nome='ids'):
+    """
+    Converte "3,1,2" em [3, 1, 2], mantendo a ordem e descartando repetidos.
+    """
+    ids = []
+    vistos = set()
+    for parte in (texto or '').split(','):
+        parte = parte.strip()
+        if not parte:
+            continue
+        try:
+            valor = int(parte)
+        except ValueError:
+            raise ParametroInvalido(f"O parâmetro '{nome}' deve ser uma lista de números separados por vírgula.")
+        if valor not in vistos:
+            vistos.add(valor)
+            ids.append(valor)
+
+    if not ids:
+        raise ParametroInvalido(f"Informe ao menos um id em '{nome}'.")
+    if len(ids) > maximo:
+        raise ParametroInvalido(f"O parâmetro '{nome}' aceita no máximo {maximo} ids.")
+    return ids
@@ -0,0 +1,152 @@
+import threading
+import time
+
+from flask import current_app, g, request
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database import db
+
+# Blueprints cujas rotas GET leem das réplicas (as demais ficam no primário)
+BLUEPRINTS_DE_LEITURA = ('treinamentos', 'alunos_bp')
+METODOS_DE_LEITURA = ('GET', 'HEAD')
+# Depois de uma escrita, o cliente lê do primário enquanto este cookie
+# existir, para enxergar o que acabou de gravar mesmo com réplicas atrasadas
+COOKIE_PRIMARIO = 'ler_do_primario'
+
+
+class RoteadorDeReplicas:
+    """
+    Escolhe a réplica de leitura de cada requisição, em round-robin entre
+    as saudáveis.
+
+    A saúde de cada réplica é verificada com um 'SELECT 1' no momento da
+    escolha, no máximo uma vez a cada 'intervalo' segundos. Uma réplica que
+    falha (na verificação ou em uma consulta) fica fora do rodízio até a
+    próxima verificação; sem nenhuma saudável, as leituras vão para o primário.
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.configurar([], 5)
+
+    def configurar(self, nomes, intervalo):
+        with self._trava:
+            self._nomes = list(nomes)
+            self._intervalo = intervalo
+            self._proxima = 0
+            self._estado = {nome: {'saudavel': True, 'verificar_em': 0.0,
+                                   'leituras': 0, 'falhas': 0}
+                            for nome in self._nomes}
+
+    @property
+    def ativo(self):
+        return bool(self._nomes)
+
+    def escolher(self, engines):
+        """Retorna o nome da próxima réplica saudável ou None (usar o primário)."""
+        for _ in range(len(self._nomes)):
+            with self._trava:
+                nome = self._nomes[self._proxima % len(self._nomes)]
+                self._proxima += 1
+                estado = self._estado[nome]
+                verificar = time.monotonic() >= estado['verificar_em']
+                if verificar:
+                    # Evita que outras threads verifiquem a mesma réplica ao mesmo tempo
+                    estado['verificar_em'] = time.monotonic() + self._intervalo
+
+            if verificar:
+                # Uma falha aqui também passa por marcar_falha (evento handle_error)
+                saudavel = _responde(engines[nome])
+                with self._trava:
+                    estado['saudavel'] = saudavel
+
+            with self._trava:
+                if estado['saudavel']:
+                    estado['leituras'] += 1
+                    return nome
+        return None
+
+    def marcar_falha(self, nome):
+        """Tira a réplica do rodízio até a próxima verificação."""
+        with self._trava:
+            estado = self._estado.get(nome)
+            if estado is not None:
+                estado['saudavel'] = False
+                estado['falhas'] += 1
+                estado['verificar_em'] = time.monotonic() + self._intervalo
+
+    def estatisticas(self):
+        with self._trava:
+            return {nome: {'saudavel': estado['saudavel'], 'leituras': estado['leituras'],
+                           'falhas': estado['falhas']}
+                    for nome, estado in self._estado.items()}
+
+
+roteador_de_replicas = RoteadorDeReplicas()
+
+
+def _responde(engine):
+    try:
+        with engine.connect() as conexao:
+            conexao.execute(text('SELECT 1'))
+        return True
+    except SQLAlchemyError:
+        return False
+
+
+def _escolher_banco_de_leitura():
+    if (request.method not in METODOS_DE_LEITURA
+            or request.blueprint not in BLUEPRINTS_DE_LEITURA
+            or request.cookies.get(COOKIE_PRIMARIO)):
+        return
+    nome = roteador_de_replicas.escolher(db.engines)
+    if nome is not None:
+        g.engine_de_leitura = db.engines[nome]
+
+
+def lembrar_escrita(resposta, metodo):
+    """Depois de uma escrita bem-sucedida, marca o cliente para ler do primário."""
+    if metodo not in METODOS_DE_LEITURA and resposta.status_code < 400:
+        resposta.set_cookie(COOKIE_PRIMARIO, '1', httponly=True, samesite='Lax',
+                            max_age=current_app.config['REPLICA_LEITURA_PROPRIA_SEGUNDOS'])
+    return resposta
+
+
+def _lembrar_escrita(resposta):
+    return lembrar_escrita(resposta, request.method)
+
+
+def _encerrar_roteamento(exc):
+    g.pop('engine_de_leitura', None)
+    db.session.info.pop('escreveu', None)
+
+
+def _ouvir_falhas(nome, engine):
+    def marcar(contexto):
+        # Falha de conexão (réplica fora do ar); erros de SQL não contam
+        if contexto.is_disconnect or contexto.connection is None:
+            roteador_de_replicas.marcar_falha(nome)
+
+    event.listen(engine, 'handle_error', marcar)
+
+
+def instalar_replicas(app):
+    """
+    Liga o roteamento de leituras para as réplicas (binds 'replica_N' do
+    SQLALCHEMY_BINDS): as rotas GET dos blueprints de treinamentos e alunos
+    consultam uma réplica; as escritas, as demais rotas e os clientes que
+    acabaram de escrever usam o primário. Sem réplicas, não instala nada.
+    """
+    with app.app_context():
+        nomes = sorted((nome for nome in db.engines if nome and nome.startswith('replica_')),
+                       key=lambda nome: int(nome.rsplit('_', 1)[1]))
+        for nome in nomes:
+            _ouvir_falhas(nome, db.engines[nome])
+    roteador_de_replicas.configurar(nomes, app.config['REPLICA_VERIFICACAO_SEGUNDOS'])
+    if not nomes:
+        return
+
+    app.before_request(_escolher_banco_de_leitura)
+    app.after_request(_lembrar_escrita)
+    app.teardown_request(_encerrar_roteamento)
@@ -0,0 +1,93 @@
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # dependência opcional
+    orjson = None
+
+
+def _padrao(valor):
+    """
+    Tipos que o json não conhece. Datas saem em ISO 8601, como no to_dict(),
+    e não no formato de data HTTP usado pelo provider padrão do Flask.
+    """
+    if isinstance(valor, (date, datetime, time)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    return DefaultJSONProvider.default(valor)
+
+
+class ProvedorJSON(DefaultJSONProvider):
+    """Provider padrão do Flask (json da biblioteca padrão), com datas em ISO 8601."""
+
+    default = staticmethod(_padrao)
+
+    def codificar(self, obj):
+        """
+        Um registro em JSON compacto, com as chaves na ordem em que vieram
+        e sem escapar acentos. Usado nas linhas do NDJSON.
+        """
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=self.default)
+
+
+class ProvedorJSONRapido(ProvedorJSON):
+    """
+    Provider baseado no orjson, que serializa listas grandes bem mais rápido
+    que o json da biblioteca padrão e codifica date/datetime nativamente.
+
+    Mantém o comportamento do Flask: chaves ordenadas (sort_keys), saída
+    indentada em modo debug e uma quebra de linha no fim da resposta.
+    """
+
+    def _opcoes(self, indentar=False):
+        opcoes = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_SUBCLASS
+        if self.sort_keys:
+            opcoes |= orjson.OPT_SORT_KEYS
+        if indentar:
+            opcoes |= orjson.OPT_INDENT_2
+        return opcoes
+
+    def dumps(self, obj, **kwargs):
+        # Argumentos do json.dumps (indent, separators...) não têm
+        # equivalente direto no orjson: nesse caso usa a biblioteca padrão
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._opcoes()).decode()
+
+    def codificar(self, obj):
+        return orjson.dumps(obj, default=self.default,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_SUBCLASS).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indentar = (self.compact is None and self._app.debug) or self.compact is False
+        corpo = orjson.dumps(obj, default=self.default,
+                             option=self._opcoes(indentar) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(corpo, mimetype=self.mimetype)
+
+
+def provedor_json(rapido=True):
+    """Classe do provider a registrar: orjson se pedido e instalado, senão o padrão."""
+    return ProvedorJSONRapido if rapido and orjson is not None else ProvedorJSON
+
+
+def registros_de_linhas(resultado, montar_registro=None):
+    """
+    Converte as linhas de uma consulta Core em dicts, sem instanciar objetos
+    do ORM nem passar pelo to_dict(). Os valores seguem como vieram do banco
+    (datas inclusive) e são codificados pelo provider JSON.
+    """
+    if montar_registro is not None:
+        return [montar_registro(linha) for linha in resultado]
+    chaves = list(resultado.keys())
+    return [dict(zip(chaves, linha)) for linha in resultado]
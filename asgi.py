@@ -0,0 +1,5 @@
+# asgi.py — modo assíncrono da API (ver app/assincrono)
+# uvicorn asgi:app --workers 4
+from app.assincrono import criar_app_asgi
+
+app = criar_app_asgi()
@@ -0,0 +1,91 @@
+"""
+Benchmark de GET /treinamentos/agendados com filtros de mês/ano.
+
+Popula um SQLite temporário com um volume crescente de turmas históricas
+(passadas) e mede a latência da rota. Com o filtro em intervalo de datas e o
+índice ix_turmas_data_inicio_status, a latência deve ficar estável mesmo
+com milhões de turmas antigas.
+
+Uso:
+    python benchmarks/bench_agendados.py --tamanhos 10000 100000 1000000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.models.treinamentos import Treinamento  # noqa: E402
+from app.models.turmas import Turma  # noqa: E402
+
+LOTE = 10000
+
+
+def popular(total, treinamento_id, ja_inseridas):
+    """Insere turmas passadas em lote (executemany) até chegar a 'total'."""
+    base = date(2000, 1, 1)
+    while ja_inseridas < total:
+        quantidade = min(LOTE, total - ja_inseridas)
+        db.session.execute(Turma.__table__.insert(), [
+            {
+                'treinamento_id': treinamento_id,
+                'data_inicio': base + timedelta(days=(ja_inseridas + i) % 9000),
+                'status': 'Concluída',
+            }
+            for i in range(quantidade)
+        ])
+        ja_inseridas += quantidade
+    db.session.commit()
+    return ja_inseridas
+
+
+def medir(client, url, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        response = client.get(url)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        assert response.status_code == 200, response.data
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tamanhos', type=int, nargs='+',
+                        default=[10000, 100000, 1000000])
+    parser.add_argument('--repeticoes', type=int, default=50)
+    args = parser.parse_args()
+
+    caminho = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{caminho}'
+    app = create_app()
+
+    with app.app_context():
+        db.create_all()
+        treinamento = Treinamento(nome_treinamento='Benchmark', vendor='Bench')
+        db.session.add(treinamento)
+        db.session.flush()
+
+        # Algumas turmas futuras, que são o que a rota realmente devolve
+        proximo_ano = date.today().year + 1
+        for mes in range(1, 13):
+            db.session.add(Turma(treinamento_id=treinamento.id,
+                                 data_inicio=date(proximo_ano, mes, 10)))
+        db.session.commit()
+
+        client = app.test_client()
+        url = f'/treinamentos/agendados?mes=3&ano={proximo_ano}'
+        inseridas = 0
+        print(f"{'turmas históricas':>18} | {'mediana (ms)':>12}")
+        for tamanho in sorted(args.tamanhos):
+            inseridas = popular(tamanho, treinamento.id, inseridas)
+            print(f"{tamanho:>18} | {medir(client, url, args.repeticoes):>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
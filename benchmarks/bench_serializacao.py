@@ -0,0 +1,109 @@
+"""
+Benchmark da serialização de listas grandes (100 mil alunos por padrão).
+
+Compara, para a mesma lista de alunos:
+- ORM: objetos Aluno + to_dict() + json da biblioteca padrão (caminho antigo);
+- linhas: SELECT Core + dicts das linhas + json da biblioteca padrão;
+- linhas + orjson: o mesmo, com o ProvedorJSONRapido (padrão da aplicação).
+
+Depois mede as rotas GET /alunos/ e GET /treinamentos/agendados com cada
+provider. Roda contra um SQLite temporário ou contra o banco em --url.
+
+Uso:
+    python benchmarks/bench_serializacao.py
+    python benchmarks/bench_serializacao.py --alunos 100000 --repeticoes 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models.alunos import Aluno  # noqa: E402
+from app.services.carga_sintetica import gerar_dados  # noqa: E402
+from app.utils.serializacao import (  # noqa: E402
+    ProvedorJSON, ProvedorJSONRapido, orjson, registros_de_linhas)
+
+
+def _mediana_ms(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def _responder(app, provedor, montar):
+    app.json = provedor(app)
+    with app.test_request_context():
+        return app.json.response(montar()).get_data()
+
+
+def _via_orm():
+    db.session.expunge_all()
+    return [aluno.to_dict() for aluno in Aluno.query.order_by(Aluno.id)]
+
+
+def _via_linhas():
+    return registros_de_linhas(db.session.execute(
+        select(Aluno.id, Aluno.nome, Aluno.email, Aluno.pago, Aluno.turma_id).order_by(Aluno.id)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Banco a usar (padrão: SQLite temporário)')
+    parser.add_argument('--alunos', type=int, default=100000)
+    parser.add_argument('--turmas', type=int, default=20000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = (
+        args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    os.environ['METRICAS_HABILITADAS'] = 'false'
+    os.environ['CONSULTA_LENTA_MS'] = '0'
+    app = create_app()
+
+    cenarios = [('ORM + to_dict + json', ProvedorJSON, _via_orm),
+                ('linhas + json', ProvedorJSON, _via_linhas)]
+    provedores = [('json', ProvedorJSON)]
+    if orjson is not None:
+        cenarios.append(('linhas + orjson', ProvedorJSONRapido, _via_linhas))
+        provedores.append(('orjson', ProvedorJSONRapido))
+    else:
+        print("Aviso: orjson não instalado; medindo só a biblioteca padrão.\n")
+
+    with app.app_context():
+        db.create_all()
+        if not db.session.scalar(select(Aluno.id).limit(1)):
+            gerar_dados(200, args.turmas, args.alunos)
+        total = db.session.query(Aluno).count()
+        print(f"Banco: {db.engine.dialect.name} | {total} alunos | "
+              f"mediana de {args.repeticoes} repetições\n")
+
+        print(f"{'serialização de /alunos/':<32} | {'ms':>9} | {'ganho':>6}")
+        referencia = None
+        for descricao, provedor, montar in cenarios:
+            ms = _mediana_ms(lambda: _responder(app, provedor, montar), args.repeticoes)
+            referencia = referencia or ms
+            print(f"{descricao:<32} | {ms:>9.1f} | {referencia / ms:>5.1f}x")
+
+        print(f"\n{'rota':<32} | " + ' | '.join(f'{nome:>9}' for nome, _ in provedores))
+        for rota in ('/alunos/', '/treinamentos/agendados'):
+            tempos = []
+            for _, provedor in provedores:
+                app.json = provedor(app)
+                client = app.test_client()
+                tempos.append(_mediana_ms(lambda: client.get(rota), args.repeticoes))
+            print(f"{'GET ' + rota:<32} | " + ' | '.join(f'{ms:>9.1f}' for ms in tempos))
+
+
+if __name__ == '__main__':
+    main()
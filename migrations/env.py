@@ -5,6 +5,8 @@ from flask import current_app
 
 from alembic import context
 
+from app.services.busca_instrutor import incluir_no_autogenerate
+
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -65,7 +67,9 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        # Objetos da busca por instrutor criados fora do metadata
+        include_object=incluir_no_autogenerate
     )
 
     with context.begin_transaction():
@@ -93,6 +97,8 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = incluir_no_autogenerate
 
     connectable = get_engine()
 
@@ -0,0 +1,47 @@
+"""Tabela agregada dos relatórios de inscrições e fila de turmas pendentes
+
+Revision ID: 1c7f5a2e8b93
+Revises: 6b8e2d4f0a19
+Create Date: 2026-10-18 17:12:40.208316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1c7f5a2e8b93'
+down_revision = '6b8e2d4f0a19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('relatorio_inscricoes',
+    sa.Column('treinamento_id', sa.Integer(), nullable=False),
+    sa.Column('ano', sa.Integer(), nullable=False),
+    sa.Column('mes', sa.Integer(), nullable=False),
+    sa.Column('vendor', sa.String(length=100), nullable=False),
+    sa.Column('nome_treinamento', sa.String(length=150), nullable=False),
+    sa.Column('total_inscritos', sa.Integer(), nullable=False),
+    sa.Column('pagos', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('treinamento_id', 'ano', 'mes')
+    )
+    with op.batch_alter_table('relatorio_inscricoes', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_relatorio_inscricoes_vendor'), ['vendor'], unique=False)
+
+    op.create_table('relatorio_pendentes',
+    sa.Column('turma_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('turma_id')
+    )
+    # Carga inicial: todas as turmas existentes entram na fila e o agregado
+    # é montado na primeira leitura dos relatórios
+    op.execute('INSERT INTO relatorio_pendentes (turma_id) SELECT id FROM turmas')
+
+
+def downgrade():
+    op.drop_table('relatorio_pendentes')
+    with op.batch_alter_table('relatorio_inscricoes', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_relatorio_inscricoes_vendor'))
+
+    op.drop_table('relatorio_inscricoes')
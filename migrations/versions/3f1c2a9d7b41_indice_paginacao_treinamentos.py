@@ -0,0 +1,26 @@
+"""Índice para paginação por chave do catálogo
+
+Revision ID: 3f1c2a9d7b41
+Revises: 8092829b759f
+Create Date: 2026-10-18 09:12:40.118230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7b41'
+down_revision = '8092829b759f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('treinamentos', schema=None) as batch_op:
+        batch_op.create_index('ix_treinamentos_nome_treinamento_id', ['nome_treinamento', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('treinamentos', schema=None) as batch_op:
+        batch_op.drop_index('ix_treinamentos_nome_treinamento_id')
@@ -0,0 +1,32 @@
+"""Tabela de versões dos recursos (ETag)
+
+Revision ID: 5e0b7f3a91c2
+Revises: c52b9e18d3a6
+Create Date: 2026-10-18 13:40:09.731552
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e0b7f3a91c2'
+down_revision = 'c52b9e18d3a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    versoes = op.create_table('versoes_recursos',
+    sa.Column('recurso', sa.String(length=50), nullable=False),
+    sa.Column('versao', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('recurso')
+    )
+    op.bulk_insert(versoes, [
+        {'recurso': 'catalogo', 'versao': 0},
+        {'recurso': 'agenda', 'versao': 0},
+    ])
+
+
+def downgrade():
+    op.drop_table('versoes_recursos')
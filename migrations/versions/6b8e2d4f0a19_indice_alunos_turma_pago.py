@@ -0,0 +1,26 @@
+"""Índice em alunos(turma_id, pago) para o resumo das turmas
+
+Revision ID: 6b8e2d4f0a19
+Revises: d9a1f04c6e37
+Create Date: 2026-10-18 16:38:55.017663
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b8e2d4f0a19'
+down_revision = 'd9a1f04c6e37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('alunos', schema=None) as batch_op:
+        batch_op.create_index('ix_alunos_turma_id_pago', ['turma_id', 'pago'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('alunos', schema=None) as batch_op:
+        batch_op.drop_index('ix_alunos_turma_id_pago')
@@ -0,0 +1,40 @@
+"""Tabela de chaves de idempotência (Idempotency-Key)
+
+Revision ID: 7a3d5f1b9c24
+Revises: e4a9c1d27f58
+Create Date: 2026-10-18 19:12:40.218305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a3d5f1b9c24'
+down_revision = 'e4a9c1d27f58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('chaves_idempotencia',
+    sa.Column('chave', sa.String(length=255), nullable=False),
+    sa.Column('rota', sa.String(length=255), nullable=False),
+    sa.Column('impressao', sa.String(length=64), nullable=True),
+    sa.Column('status', sa.Integer(), nullable=True),
+    sa.Column('corpo', sa.LargeBinary(), nullable=True),
+    sa.Column('tipo_conteudo', sa.String(length=100), nullable=True),
+    sa.Column('cabecalhos', sa.JSON(), nullable=True),
+    sa.Column('criado_em', sa.DateTime(), nullable=False),
+    sa.Column('expira_em', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('chave', 'rota')
+    )
+    with op.batch_alter_table('chaves_idempotencia', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_chaves_idempotencia_expira_em'), ['expira_em'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('chaves_idempotencia', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_chaves_idempotencia_expira_em'))
+
+    op.drop_table('chaves_idempotencia')
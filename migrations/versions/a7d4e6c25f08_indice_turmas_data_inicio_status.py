@@ -0,0 +1,26 @@
+"""Índice composto em turmas(data_inicio, status)
+
+Revision ID: a7d4e6c25f08
+Revises: 3f1c2a9d7b41
+Create Date: 2026-10-18 10:03:17.552904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d4e6c25f08'
+down_revision = '3f1c2a9d7b41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('turmas', schema=None) as batch_op:
+        batch_op.create_index('ix_turmas_data_inicio_status', ['data_inicio', 'status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('turmas', schema=None) as batch_op:
+        batch_op.drop_index('ix_turmas_data_inicio_status')
@@ -0,0 +1,26 @@
+"""Versão das vagas de cada turma (ETag das turmas agendadas)
+
+Revision ID: b3e8f2a6d417
+Revises: 7a3d5f1b9c24
+Create Date: 2026-10-18 19:12:44.208731
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e8f2a6d417'
+down_revision = '7a3d5f1b9c24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('turmas', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('versao_vagas', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('turmas', schema=None) as batch_op:
+        batch_op.drop_column('versao_vagas')
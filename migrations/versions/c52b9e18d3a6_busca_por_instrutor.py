@@ -0,0 +1,83 @@
+"""Busca por instrutor: pg_trgm no PostgreSQL e FTS5 no SQLite
+
+Revision ID: c52b9e18d3a6
+Revises: a7d4e6c25f08
+Create Date: 2026-10-18 11:26:45.204871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c52b9e18d3a6'
+down_revision = 'a7d4e6c25f08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialeto = op.get_bind().dialect.name
+
+    if dialeto == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+        op.execute("""
+            CREATE OR REPLACE FUNCTION unaccent_imutavel(text) RETURNS text
+            LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+            AS $$ SELECT public.unaccent('public.unaccent', $1) $$
+        """)
+        op.execute(
+            "CREATE INDEX ix_treinamentos_instrutor_trgm ON treinamentos "
+            "USING gin (unaccent_imutavel(lower(instrutor_sugerido)) gin_trgm_ops)")
+
+    elif dialeto == 'sqlite':
+        # Os triggers chamam remover_acentos(), registrada pela aplicação em
+        # cada conexão (app/services/busca_instrutor.py).
+        op.execute(
+            "CREATE VIRTUAL TABLE treinamentos_busca_instrutor "
+            "USING fts5(instrutor, tokenize='trigram')")
+        op.execute("""
+            CREATE TRIGGER treinamentos_busca_ai AFTER INSERT ON treinamentos
+            BEGIN
+                INSERT INTO treinamentos_busca_instrutor(rowid, instrutor)
+                SELECT new.id, remover_acentos(new.instrutor_sugerido)
+                WHERE new.instrutor_sugerido IS NOT NULL;
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER treinamentos_busca_ad AFTER DELETE ON treinamentos
+            BEGIN
+                DELETE FROM treinamentos_busca_instrutor WHERE rowid = old.id;
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER treinamentos_busca_au
+            AFTER UPDATE OF instrutor_sugerido ON treinamentos
+            BEGIN
+                DELETE FROM treinamentos_busca_instrutor WHERE rowid = old.id;
+                INSERT INTO treinamentos_busca_instrutor(rowid, instrutor)
+                SELECT new.id, remover_acentos(new.instrutor_sugerido)
+                WHERE new.instrutor_sugerido IS NOT NULL;
+            END
+        """)
+        # Popula a tabela-sombra com os treinamentos já existentes
+        op.execute("""
+            INSERT INTO treinamentos_busca_instrutor(rowid, instrutor)
+            SELECT id, remover_acentos(instrutor_sugerido)
+            FROM treinamentos WHERE instrutor_sugerido IS NOT NULL
+        """)
+
+
+def downgrade():
+    dialeto = op.get_bind().dialect.name
+
+    if dialeto == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_treinamentos_instrutor_trgm")
+        op.execute("DROP FUNCTION IF EXISTS unaccent_imutavel(text)")
+
+    elif dialeto == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS treinamentos_busca_au")
+        op.execute("DROP TRIGGER IF EXISTS treinamentos_busca_ad")
+        op.execute("DROP TRIGGER IF EXISTS treinamentos_busca_ai")
+        op.execute("DROP TABLE IF EXISTS treinamentos_busca_instrutor")
@@ -0,0 +1,35 @@
+"""Limite de vagas e contador de vagas ocupadas nas turmas
+
+Revision ID: d9a1f04c6e37
+Revises: 5e0b7f3a91c2
+Create Date: 2026-10-18 15:52:31.604417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a1f04c6e37'
+down_revision = '5e0b7f3a91c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('turmas', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('limite_vagas', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('vagas_ocupadas', sa.Integer(), nullable=False, server_default='0'))
+
+    # Inicializa o contador com os alunos já inscritos
+    op.execute("""
+        UPDATE turmas SET vagas_ocupadas = (
+            SELECT COUNT(*) FROM alunos WHERE alunos.turma_id = turmas.id
+        )
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('turmas', schema=None) as batch_op:
+        batch_op.drop_column('vagas_ocupadas')
+        batch_op.drop_column('limite_vagas')
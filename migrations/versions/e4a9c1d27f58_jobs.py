@@ -0,0 +1,41 @@
+"""Tabela de jobs em segundo plano
+
+Revision ID: e4a9c1d27f58
+Revises: 1c7f5a2e8b93
+Create Date: 2026-10-18 17:54:03.611942
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a9c1d27f58'
+down_revision = '1c7f5a2e8b93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('jobs',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('tipo', sa.String(length=50), nullable=False),
+    sa.Column('parametros', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('progresso', sa.Integer(), nullable=False),
+    sa.Column('erro', sa.Text(), nullable=True),
+    sa.Column('arquivo', sa.String(length=255), nullable=True),
+    sa.Column('criado_em', sa.DateTime(), nullable=False),
+    sa.Column('iniciado_em', sa.DateTime(), nullable=True),
+    sa.Column('concluido_em', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_jobs_status'), ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_jobs_status'))
+
+    op.drop_table('jobs')
@@ -29,46 +29,70 @@ def client(app):
     return app.test_client()
 
 
+class Fabrica:
+    """
+    Cria treinamentos, turmas e alunos no banco de teste, com valores padrão
+    para os campos obrigatórios não informados. Cada chamada faz commit e
+    devolve o objeto ainda ligado à sessão do teste.
+    """
+
+    def __init__(self):
+        self._sequencia = 0
+
+    def _gravar(self, objeto):
+        db.session.add(objeto)
+        db.session.commit()
+        return objeto
+
+    def treinamento(self, **campos):
+        campos = {'nome_treinamento': "Python", 'vendor': "TechCorp", **campos}
+        return self._gravar(Treinamento(**campos))
+
+    def turma(self, treinamento=None, **campos):
+        """Turma futura; sem 'treinamento', cria um novo."""
+        if treinamento is None:
+            treinamento = self.treinamento()
+        campos = {'data_inicio': date(2099, 1, 10), **campos}
+        return self._gravar(Turma(treinamento_id=treinamento.id, **campos))
+
+    def turmas(self, treinamento, datas, **campos):
+        """Uma turma do treinamento por data, em um único commit."""
+        turmas = [Turma(treinamento_id=treinamento.id, data_inicio=data, **campos)
+                  for data in datas]
+        db.session.add_all(turmas)
+        db.session.commit()
+        return turmas
+
+    def aluno(self, turma=None, **campos):
+        """Aluno com nome e e-mail únicos; sem 'turma', cria uma nova."""
+        if turma is None:
+            turma = self.turma()
+        self._sequencia += 1
+        campos = {'nome': f"Aluno {self._sequencia}",
+                  'email': f"aluno{self._sequencia}@email.com", **campos}
+        return self._gravar(Aluno(turma_id=turma.id, **campos))
+
+
 @pytest.fixture
-def treinamento_sample(app):
+def fabrica(app):
+    """Fábrica de treinamentos, turmas e alunos (ver Fabrica)."""
+    return Fabrica()
+
+
+@pytest.fixture
+def treinamento_sample(fabrica):
     """Cria um treinamento de exemplo."""
-    with app.app_context():
-        treinamento = Treinamento(
-            nome_treinamento="Python Básico",
-            vendor="TechCorp",
-            instrutor_sugerido="João Silva"
-        )
-        db.session.add(treinamento)
-        db.session.commit()
-        return treinamento
+    return fabrica.treinamento(nome_treinamento="Python Básico", instrutor_sugerido="João Silva")
 
 
 @pytest.fixture
-def turma_sample(app, treinamento_sample):
+def turma_sample(fabrica, treinamento_sample):
     """Cria uma turma de exemplo."""
-    with app.app_context():
-        turma = Turma(
-            treinamento_id=treinamento_sample.id,
-            data_inicio=date(2024, 6, 15),
-            horario="09:00 - 17:00",
-            local="Sala 1",
-            status="Agendada"
-        )
-        db.session.add(turma)
-        db.session.commit()
-        return turma
+    return fabrica.turma(treinamento_sample, data_inicio=date(2024, 6, 15),
+                         horario="09:00 - 17:00", local="Sala 1", status="Agendada")
 
 
 @pytest.fixture
-def aluno_sample(app, turma_sample):
+def aluno_sample(fabrica, turma_sample):
     """Cria um aluno de exemplo."""
-    with app.app_context():
-        aluno = Aluno(
-            nome="Maria Santos",
-            email="maria@email.com",
-            turma_id=turma_sample.id,
-            pago=False
-        )
-        db.session.add(aluno)
-        db.session.commit()
-        return aluno
\ No newline at end of file
+    return fabrica.aluno(turma_sample, nome="Maria Santos", email="maria@email.com", pago=False)
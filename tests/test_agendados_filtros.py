@@ -0,0 +1,40 @@
+import pytest
+from datetime import date
+from sqlalchemy import text
+from app import db
+
+
+@pytest.fixture
+def turmas_futuras(fabrica):
+    """Cria turmas em dezembro, janeiro e março de anos futuros."""
+    treinamento = fabrica.treinamento()
+    fabrica.turmas(treinamento, [date(2098, 12, 31), date(2099, 1, 1), date(2099, 3, 15),
+                                 date(2100, 3, 1)])
+
+
+class TestFiltrosAgendados:
+    """Testes dos filtros de mês/ano em /treinamentos/agendados."""
+
+    def test_filtro_mes_e_ano(self, client, turmas_futuras):
+        response = client.get('/treinamentos/agendados?mes=12&ano=2098')
+        assert [t['data_inicio'] for t in response.json] == ["2098-12-31"]
+
+    def test_filtro_apenas_ano(self, client, turmas_futuras):
+        response = client.get('/treinamentos/agendados?ano=2099')
+        assert [t['data_inicio'] for t in response.json] == ["2099-01-01", "2099-03-15"]
+
+    def test_filtro_apenas_mes(self, client, turmas_futuras):
+        response = client.get('/treinamentos/agendados?mes=3')
+        assert [t['data_inicio'] for t in response.json] == ["2099-03-15", "2100-03-01"]
+
+    def test_ano_invalido(self, client):
+        response = client.get('/treinamentos/agendados?ano=10000')
+        assert response.status_code == 400
+
+    def test_intervalo_usa_indice(self, app):
+        """O plano do SQLite usa o índice composto para o intervalo de datas."""
+        plano = db.session.execute(text(
+            "EXPLAIN QUERY PLAN SELECT * FROM turmas "
+            "WHERE data_inicio >= '2099-01-01' AND data_inicio < '2099-02-01'"
+        )).fetchall()
+        assert any('ix_turmas_data_inicio_status' in linha[-1] for linha in plano)
@@ -0,0 +1,105 @@
+import json
+import pytest
+from datetime import date
+from app import db
+from app.models.turmas import Turma
+from app.services.agendamento import expandir_recorrencia, AgendamentoInvalido
+
+
+@pytest.fixture
+def treinamento_id(fabrica):
+    return fabrica.treinamento().id
+
+
+def enviar(client, dados):
+    return client.post('/treinamentos/agendados/lote', data=json.dumps(dados),
+                       content_type='application/json')
+
+
+class TestRecorrencia:
+    """Testes da expansão de regras de recorrência."""
+
+    def test_toda_segunda(self):
+        turmas = expandir_recorrencia({
+            "treinamento_id": 1, "dias_da_semana": ["segunda-feira"],
+            "inicio": "2026-03-01", "fim": "2026-03-31"
+        })
+        assert [t['data_inicio'] for t in turmas] == [
+            date(2026, 3, 2), date(2026, 3, 9), date(2026, 3, 16),
+            date(2026, 3, 23), date(2026, 3, 30)]
+
+    def test_quinzenal_varios_dias(self):
+        turmas = expandir_recorrencia({
+            "treinamento_id": 1, "dias_da_semana": ["terça", 3],
+            "inicio": "2026-03-02", "fim": "2026-03-20", "intervalo_semanas": 2
+        })
+        assert [t['data_inicio'] for t in turmas] == [
+            date(2026, 3, 3), date(2026, 3, 5), date(2026, 3, 17), date(2026, 3, 19)]
+
+    def test_dia_invalido(self):
+        with pytest.raises(AgendamentoInvalido):
+            expandir_recorrencia({"treinamento_id": 1, "dias_da_semana": ["feriado"],
+                                  "inicio": "2026-03-01", "fim": "2026-03-31"})
+
+    @pytest.mark.parametrize('inicio', ["2026-03-02xx", "2026-03-0", "02/03/2026", 20260302, None])
+    def test_data_invalida(self, inicio):
+        with pytest.raises(AgendamentoInvalido):
+            expandir_recorrencia({"treinamento_id": 1, "dias_da_semana": ["segunda"],
+                                  "inicio": inicio, "fim": "2026-03-31"})
+
+    def test_data_e_hora_usa_a_data(self):
+        turmas = expandir_recorrencia({"treinamento_id": 1, "dias_da_semana": ["segunda"],
+                                       "inicio": "2026-03-02T09:00:00", "fim": "2026-03-09"})
+        assert [t['data_inicio'] for t in turmas] == [date(2026, 3, 2), date(2026, 3, 9)]
+
+    @pytest.mark.parametrize('intervalo', [True, 0, "2"])
+    def test_intervalo_invalido(self, intervalo):
+        with pytest.raises(AgendamentoInvalido):
+            expandir_recorrencia({"treinamento_id": 1, "dias_da_semana": ["segunda"],
+                                  "inicio": "2026-03-02", "fim": "2026-03-31",
+                                  "intervalo_semanas": intervalo})
+
+
+class TestAgendamentoLote:
+    """Testes de POST /treinamentos/agendados/lote."""
+
+    def test_recorrencia(self, client, treinamento_id):
+        response = enviar(client, {"recorrencia": {
+            "treinamento_id": treinamento_id, "dias_da_semana": ["segunda"],
+            "inicio": "2026-03-01", "fim": "2026-06-30",
+            "horario": "09:00 - 17:00", "local": "Sala 1"
+        }})
+        assert response.status_code == 201
+        assert response.json['criadas'] == 18
+        turmas = Turma.query.order_by(Turma.data_inicio).all()
+        assert [t.id for t in turmas] == response.json['ids']
+        assert all(t.local == "Sala 1" and t.data_inicio.weekday() == 0 for t in turmas)
+
+    def test_lista_explicita(self, client, treinamento_id):
+        response = enviar(client, {"turmas": [
+            {"treinamento_id": treinamento_id, "data_inicio": "2026-05-10"},
+            {"treinamento_id": treinamento_id, "data_inicio": "2026-04-01", "status": "Confirmada"},
+        ]})
+        assert response.status_code == 201
+        ids = response.json['ids']
+        assert db.session.get(Turma, ids[1]).status == "Confirmada"
+
+    def test_treinamento_inexistente_nao_cria_nada(self, client, treinamento_id):
+        response = enviar(client, {"turmas": [
+            {"treinamento_id": treinamento_id, "data_inicio": "2026-05-10"},
+            {"treinamento_id": 999, "data_inicio": "2026-05-11"},
+        ]})
+        assert response.status_code == 404
+        assert response.json['treinamentos_inexistentes'] == [999]
+        assert Turma.query.count() == 0
+
+    def test_data_com_sobra_retorna_400(self, client, treinamento_id):
+        response = enviar(client, {"turmas": [
+            {"treinamento_id": treinamento_id, "data_inicio": "2099-01-01xx"}]})
+        assert response.status_code == 400
+        assert "'data_inicio'" in response.json['erro']
+        assert Turma.query.count() == 0
+
+    def test_turmas_e_recorrencia_juntas(self, client):
+        response = enviar(client, {"turmas": [], "recorrencia": {}})
+        assert response.status_code == 400
@@ -0,0 +1,67 @@
+import io
+import json
+import pytest
+from datetime import date
+from app.models.alunos import Aluno
+from app.services.inscricoes import importar_alunos, ler_linhas, FORMATO_NDJSON
+
+
+@pytest.fixture
+def turma_id(fabrica):
+    """Cria uma turma e um aluno já inscrito (ana@email.com)."""
+    turma = fabrica.turma(data_inicio=date(2030, 1, 10))
+    fabrica.aluno(turma, nome="Ana", email="ana@email.com")
+    return turma.id
+
+
+class TestAlunosBulk:
+    """Testes da inscrição em lote (POST /alunos/bulk)."""
+
+    def test_csv(self, client, turma_id):
+        corpo = (
+            "nome,email,turma_id,pago\n"
+            f"Bruno,bruno@email.com,{turma_id},sim\n"
+            f"Carla,carla@email.com,{turma_id},0\n"
+            f"Ana de novo,ana@email.com,{turma_id},\n"
+            "Davi,davi@email.com,999,\n"
+            f"Bruno 2,bruno@email.com,{turma_id},\n"
+        )
+        response = client.post('/alunos/bulk', data=corpo, content_type='text/csv')
+
+        assert response.status_code == 200
+        assert response.json['total_linhas'] == 5
+        assert response.json['inseridos'] == 2
+        erros = {e['linha']: e['erro'] for e in response.json['erros']}
+        assert erros == {
+            4: "E-mail já cadastrado.",
+            5: "A turma com ID 999 não foi encontrada.",
+            6: "E-mail duplicado no arquivo.",
+        }
+        assert Aluno.query.filter_by(email="bruno@email.com").one().pago is True
+
+    def test_ndjson(self, client, turma_id):
+        linhas = [
+            json.dumps({"nome": "Eva", "email": "eva@email.com", "turma_id": turma_id, "pago": True}),
+            "isto não é json",
+            json.dumps({"nome": "Sem email", "turma_id": turma_id}),
+        ]
+        response = client.post('/alunos/bulk', data="\n".join(linhas),
+                               content_type='application/x-ndjson')
+
+        assert response.json['inseridos'] == 1
+        assert [e['linha'] for e in response.json['erros']] == [2, 3]
+
+    def test_formato_nao_suportado(self, client):
+        response = client.post('/alunos/bulk', data="{}", content_type='application/json')
+        assert response.status_code == 415
+
+    def test_varios_lotes(self, app, turma_id):
+        """Lotes pequenos produzem o mesmo resultado que um lote único."""
+        corpo = "\n".join(
+            json.dumps({"nome": f"Aluno {i}", "email": f"a{i}@email.com", "turma_id": turma_id})
+            for i in range(25)
+        ).encode('utf-8')
+
+        relatorio = importar_alunos(ler_linhas(io.BytesIO(corpo), FORMATO_NDJSON), tamanho_lote=10)
+        assert relatorio.inseridos == 25
+        assert Aluno.query.count() == 26
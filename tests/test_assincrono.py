@@ -0,0 +1,254 @@
+import asyncio
+import json
+import pytest
+from sqlalchemy import select
+from datetime import date
+from app import db
+from app.models.alunos import Aluno
+from app.models.treinamentos import Treinamento
+from app.models.turmas import Turma
+
+pytest.importorskip('aiosqlite')
+pytest.importorskip('a2wsgi')
+
+from app.assincrono import criar_app_asgi  # noqa: E402
+from app.assincrono.banco import url_assincrona  # noqa: E402
+from app.utils.cache import cache_catalogo  # noqa: E402
+from app.utils.consultas import OrcamentoDeConsultasExcedido, orcamento_de_consultas  # noqa: E402
+from app.utils.consultas_lentas import LIMIAR_PADRAO_MS, MAXIMO_PADRAO, consultas_lentas  # noqa: E402
+from app.utils.metricas import metricas  # noqa: E402
+
+
+class Resposta:
+    def __init__(self, mensagens):
+        inicio = mensagens[0]
+        self.status_code = inicio['status']
+        self.headers = {nome.decode(): valor.decode() for nome, valor in inicio['headers']}
+        self.data = b''.join(m.get('body', b'') for m in mensagens[1:])
+
+    @property
+    def json(self):
+        return json.loads(self.data)
+
+
+@pytest.fixture
+def asgi(monkeypatch, tmp_path):
+    """App ASGI sobre um SQLite em arquivo (o aiosqlite não enxerga o :memory: do pytest)."""
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'assincrono.db'}")
+    app = criar_app_asgi()
+    app.app_flask.config['TESTING'] = True
+    with app.app_flask.app_context():
+        db.create_all()
+        treinamento = Treinamento(nome_treinamento="Python", vendor="TechCorp",
+                                  instrutor_sugerido="João")
+        db.session.add(treinamento)
+        db.session.flush()
+        db.session.add_all([
+            Turma(id=1, treinamento_id=treinamento.id, data_inicio=date(2099, 1, 10),
+                  limite_vagas=2, vagas_ocupadas=1),
+            Turma(id=2, treinamento_id=treinamento.id, data_inicio=date(2099, 3, 10))])
+        db.session.add(Aluno(nome="Ana", email="ana@email.com", turma_id=1))
+        db.session.commit()
+
+    # Registra as requisições encaminhadas ao app Flask
+    app.encaminhadas = []
+    sincrono = app.sincrono
+
+    async def encaminhar(scope, receive, send):
+        app.encaminhadas.append(scope['path'])
+        await sincrono(scope, receive, send)
+    app.sincrono = encaminhar
+
+    loop = asyncio.new_event_loop()
+    app.executar = loop.run_until_complete
+    yield app
+    loop.run_until_complete(app.engine.dispose())
+    loop.close()
+
+
+def chamar(app, metodo, caminho, corpo=None, headers=None):
+    """Envia uma requisição HTTP ao app ASGI e junta as mensagens da resposta."""
+    caminho, _, query = caminho.partition('?')
+    headers = dict(headers or {})
+    if corpo is not None:
+        corpo = json.dumps(corpo).encode()
+        headers.setdefault('Content-Type', 'application/json')
+        headers['Content-Length'] = str(len(corpo))
+    scope = {'type': 'http', 'http_version': '1.1', 'method': metodo, 'scheme': 'http',
+             'path': caminho, 'raw_path': caminho.encode(), 'root_path': '',
+             'query_string': query.encode(), 'server': ('localhost', 80),
+             'client': ('127.0.0.1', 5000),
+             'headers': [(nome.lower().encode(), valor.encode()) for nome, valor in headers.items()]}
+    recebidas = [{'type': 'http.request', 'body': corpo or b'', 'more_body': False}]
+    enviadas = []
+
+    async def receive():
+        if recebidas:
+            return recebidas.pop()
+        await asyncio.Event().wait()
+
+    async def send(mensagem):
+        enviadas.append(mensagem)
+
+    app.executar(app(scope, receive, send))
+    return Resposta(enviadas)
+
+
+def comparar(app, metodo, caminho, **kwargs):
+    """Mesma requisição no app Flask e no ASGI: devolve as duas respostas."""
+    sincrona = app.app_flask.test_client().open(
+        caminho, method=metodo, json=kwargs.get('corpo'), headers=kwargs.get('headers'))
+    return sincrona, chamar(app, metodo, caminho, **kwargs)
+
+
+class TestModoAssincrono:
+    """Testes do app ASGI (rotas asyncio e encaminhamento ao app Flask)."""
+
+    def test_url_assincrona(self):
+        assert str(url_assincrona('sqlite:///x.db')) == 'sqlite+aiosqlite:///x.db'
+        assert url_assincrona('postgresql://u:s@localhost/db').drivername == 'postgresql+asyncpg'
+        with pytest.raises(ValueError):
+            url_assincrona('mysql://u:s@localhost/db')
+
+    @pytest.mark.parametrize('caminho', [
+        '/alunos/', '/alunos/?turma_id=1', '/alunos/?turma_id=99', '/alunos/?fields=id,email',
+        '/alunos/?ids=1,99&fields=id,nome', '/alunos/?limit=1', '/alunos/?limit=1&cursor=x',
+        '/treinamentos/agendados', '/treinamentos/agendados?mes=3&fields=id,treinamento_info',
+        '/treinamentos/agendados?ids=2,1,7', '/treinamentos/agendados?incluir=resumo',
+        '/treinamentos', '/treinamentos?fields=vendor', '/treinamentos?limit=1',
+        '/treinamentos/TechCorp', '/treinamentos/Outro',
+        '/treinamentos/agendados/1/resumo', '/treinamentos/agendados/9/resumo',
+        '/treinamentos/agendados/resumo?ids=1,2,9',
+    ])
+    def test_mesmo_json_das_rotas_sincronas(self, asgi, caminho):
+        sincrona, assincrona = comparar(asgi, 'GET', caminho)
+        assert assincrona.status_code == sincrona.status_code
+        assert assincrona.data == sincrona.data
+        assert assincrona.headers.get('etag') == sincrona.headers.get('ETag')
+        assert asgi.encaminhadas == []
+
+    def test_etag_e_304(self, asgi):
+        primeira = chamar(asgi, 'GET', '/treinamentos/agendados')
+        repetida = chamar(asgi, 'GET', '/treinamentos/agendados',
+                          headers={'If-None-Match': primeira.headers['etag']})
+        assert repetida.status_code == 304
+        assert repetida.data == b''
+
+    def test_catalogo_fora_do_cache(self, asgi):
+        cache_catalogo.invalidar()
+        assincrona = chamar(asgi, 'GET', '/treinamentos')
+        assert asgi.encaminhadas == []
+        cache_catalogo.invalidar()
+        sincrona = asgi.app_flask.test_client().get('/treinamentos')
+        assert assincrona.data == sincrona.data
+        repetida = chamar(asgi, 'GET', '/treinamentos',
+                          headers={'If-None-Match': assincrona.headers['etag']})
+        assert repetida.status_code == 304
+
+    def test_inscricao_muda_etag_da_agenda(self, asgi):
+        etag = chamar(asgi, 'GET', '/treinamentos/agendados').headers['etag']
+        chamar(asgi, 'POST', '/alunos/', corpo={"nome": "Bia", "email": "bia@email.com",
+                                                "turma_id": 2})
+        response = chamar(asgi, 'GET', '/treinamentos/agendados', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.json[1]['vagas_ocupadas'] == 1
+
+    def test_inscricao(self, asgi):
+        aluno = {"nome": "Bia", "email": "bia@email.com", "turma_id": 1}
+        criada = chamar(asgi, 'POST', '/alunos/', corpo=aluno)
+        assert criada.status_code == 201
+        assert asgi.encaminhadas == []
+        assert criada.json == {"id": 2, "nome": "Bia", "email": "bia@email.com",
+                               "pago": False, "turma_id": 1}
+
+        lotada = chamar(asgi, 'POST', '/alunos/', corpo={**aluno, "email": "caio@email.com"})
+        assert lotada.status_code == 409 and lotada.json['conflito'] == "turma_lotada"
+
+        duplicada = chamar(asgi, 'POST', '/alunos/', corpo={**aluno, "turma_id": 2})
+        assert duplicada.json['conflito'] == "email_duplicado"
+        assert duplicada.json['turma_id'] == 1
+
+        with asgi.app_flask.app_context():
+            assert db.session.get(Turma, 1).vagas_ocupadas == 2
+
+    def test_idempotency_key_encaminhada(self, asgi):
+        headers = {'Idempotency-Key': 'inscricao-1'}
+        aluno = {"nome": "Bia", "email": "bia@email.com", "turma_id": 2}
+        primeira = chamar(asgi, 'POST', '/alunos/', corpo=aluno, headers=headers)
+        repetida = chamar(asgi, 'POST', '/alunos/', corpo=aluno, headers=headers)
+        assert primeira.status_code == repetida.status_code == 201
+        assert repetida.headers['idempotent-replayed'] == 'true'
+        assert asgi.encaminhadas == ['/alunos/', '/alunos/']
+
+    def test_upsert(self, asgi):
+        response = chamar(asgi, 'POST', '/alunos/?modo=upsert',
+                          corpo={"nome": "Ana Maria", "email": "ana@email.com", "turma_id": 1,
+                                 "pago": True})
+        assert response.status_code == 200
+        assert response.json['pago'] is True
+
+    @pytest.mark.parametrize('caminho, corpo', [
+        ('/alunos/', {"nome": "Sem email"}),
+        ('/alunos/?modo=merge', {"nome": "Bia", "email": "bia@email.com", "turma_id": 1}),
+        ('/alunos/?fields=senha', None),
+        ('/alunos/?ids=a', None),
+        ('/treinamentos/agendados?mes=13', None),
+        ('/treinamentos/agendados/resumo', None),
+        ('/treinamentos/instrutor/Jo', None),
+        ('/alunos/1', None),
+        ('/alunos/bulk', {}),
+    ])
+    def test_demais_casos_encaminhados_ao_flask(self, asgi, caminho, corpo):
+        metodo = 'POST' if corpo is not None else 'GET'
+        sincrona, assincrona = comparar(asgi, metodo, caminho, corpo=corpo)
+        assert assincrona.status_code == sincrona.status_code
+        assert assincrona.data == sincrona.data
+        assert asgi.encaminhadas == [caminho.partition('?')[0]]
+
+    def test_compressao(self, asgi):
+        with asgi.app_flask.app_context():
+            db.session.add_all([Aluno(nome=f"Aluno {i}", email=f"aluno{i}@email.com", turma_id=2)
+                                for i in range(100)])
+            db.session.commit()
+        response = chamar(asgi, 'GET', '/alunos/', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['content-encoding'] == 'gzip'
+        assert response.headers['vary'] == 'Accept-Encoding'
+
+    def test_metricas_com_o_endpoint_do_flask(self, asgi):
+        metricas.zerar()
+        chamar(asgi, 'GET', '/treinamentos/agendados')
+        chamar(asgi, 'GET', '/treinamentos/agendados')
+        texto = chamar(asgi, 'GET', '/metrics').data.decode()
+
+        rotulos = 'endpoint="treinamentos.obter_treinamentos_agendados",method="GET"'
+        assert f'http_requests_total{{{rotulos},status="200"}} 2' in texto
+        # Mesmas 2 instruções por leitura da rota síncrona: versão do ETag + turmas
+        assert f'http_request_db_statements_sum{{{rotulos}}} 4' in texto
+        assert asgi.encaminhadas == ['/metrics']
+
+    def test_consultas_lentas_com_plano(self, asgi):
+        consultas_lentas.configurar(0, 10)
+        try:
+            chamar(asgi, 'GET', '/treinamentos/agendados?ano=2099')
+            asgi.executar(consultas_lentas.aguardar_no_event_loop())
+            registros = consultas_lentas.listar()
+        finally:
+            consultas_lentas.configurar(LIMIAR_PADRAO_MS, MAXIMO_PADRAO)
+
+        # O EXPLAIN da captura do plano não entra no log
+        assert not [r for r in registros if r['sql'].startswith('EXPLAIN')]
+        select_turmas = [r for r in registros
+                         if 'FROM turmas' in r['sql'] and 'versoes_recursos' not in r['sql']]
+        assert select_turmas[0]['endpoint'] == 'treinamentos.obter_treinamentos_agendados'
+        assert 'ix_turmas_data_inicio_status' in select_turmas[0]['plano']
+
+    def test_orcamento_de_consultas(self, asgi):
+        @orcamento_de_consultas(1)
+        async def duas_consultas():
+            async with asgi.sessoes() as sessao:
+                await sessao.execute(select(Turma.id))
+                await sessao.execute(select(Aluno.id))
+
+        with asgi.app_flask.app_context():
+            with pytest.raises(OrcamentoDeConsultasExcedido):
+                asgi.executar(duas_consultas())
@@ -0,0 +1,68 @@
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from app import db
+from app.models.treinamentos import Treinamento
+from app.services.busca_instrutor import TABELA_FTS, incluir_no_autogenerate, remover_acentos
+from app.utils.cache import cache_catalogo
+
+
+@pytest.fixture
+def catalogo_instrutores(fabrica):
+    """Cria treinamentos com instrutores de nomes acentuados."""
+    dados = [
+        ("Python 1", "João Silva"),
+        ("Python 2", "Joao Silveira"),
+        ("Java 1", "Maria Conceição"),
+        ("Go 1", None),
+    ]
+    for nome, instrutor in dados:
+        fabrica.treinamento(nome_treinamento=nome, instrutor_sugerido=instrutor)
+
+
+class TestBuscaInstrutor:
+    """Testes da busca de treinamentos por instrutor."""
+
+    def test_remover_acentos(self):
+        assert remover_acentos("João CONCEIÇÃO") == "joao conceicao"
+
+    def test_busca_ignora_acentos(self, client, catalogo_instrutores):
+        response = client.get('/treinamentos/instrutor/joao')
+        assert response.status_code == 200
+        assert {t['instrutor_sugerido'] for t in response.json} == {"João Silva", "Joao Silveira"}
+
+        response = client.get('/treinamentos/instrutor/Conceicao')
+        assert [t['nome_treinamento'] for t in response.json] == ["Java 1"]
+
+    def test_busca_termo_curto(self, client, catalogo_instrutores):
+        response = client.get('/treinamentos/instrutor/ão')
+        assert {t['nome_treinamento'] for t in response.json} == {"Python 1", "Python 2", "Java 1"}
+
+    def test_busca_respeita_limite(self, client, catalogo_instrutores):
+        response = client.get('/treinamentos/instrutor/Silv?limit=1')
+        assert len(response.json) == 1
+
+    def test_busca_acompanha_atualizacao(self, client, catalogo_instrutores):
+        """Os triggers mantêm a tabela-sombra sincronizada."""
+        treinamento = Treinamento.query.filter_by(nome_treinamento="Go 1").one()
+        treinamento.instrutor_sugerido = "Ana Luíza"
+        db.session.commit()
+
+        response = client.get('/treinamentos/instrutor/luiza')
+        assert [t['nome_treinamento'] for t in response.json] == ["Go 1"]
+
+        db.session.delete(treinamento)
+        db.session.commit()
+        # Escrita direta no banco não passa pelas rotas, que invalidam o cache
+        cache_catalogo.invalidar()
+        response = client.get('/treinamentos/instrutor/luiza')
+        assert response.status_code == 404
+
+    def test_autogenerate_ignora_a_tabela_fts(self, app):
+        """O Alembic não deve propor remover a tabela FTS5 (fora do metadata)."""
+        with db.engine.connect() as conexao:
+            sem_filtro = compare_metadata(MigrationContext.configure(conexao), db.metadata)
+            com_filtro = compare_metadata(MigrationContext.configure(
+                conexao, opts={'include_object': incluir_no_autogenerate}), db.metadata)
+        assert ('remove_table', TABELA_FTS) in [(d[0], d[1].name) for d in sem_filtro]
+        assert com_filtro == []
@@ -0,0 +1,44 @@
+import pytest
+from datetime import date
+
+
+@pytest.fixture
+def dados(fabrica):
+    """Uma turma passada e uma futura, com dois alunos."""
+    treinamento = fabrica.treinamento()
+    passada = fabrica.turma(treinamento, data_inicio=date(2020, 1, 10))
+    futura = fabrica.turma(treinamento, data_inicio=date(2099, 1, 10))
+    alunos = [fabrica.aluno(futura, email=f"a{i}@email.com") for i in range(2)]
+    return passada.id, futura.id, [aluno.id for aluno in alunos]
+
+
+class TestBuscaPorIds:
+    """Testes da busca em lote por ids (?ids=)."""
+
+    def test_alunos_na_ordem_pedida(self, client, dados):
+        _, _, (primeiro, segundo) = dados
+        response = client.get(f'/alunos/?ids={segundo},999,{primeiro},{segundo}')
+        assert [aluno['id'] for aluno in response.json['itens']] == [segundo, primeiro]
+        assert response.json['missing'] == [999]
+
+    def test_turmas_incluem_passadas(self, client, dados):
+        passada, futura, _ = dados
+        response = client.get(f'/treinamentos/agendados?ids={futura},{passada},12345')
+        assert [turma['id'] for turma in response.json['itens']] == [futura, passada]
+        assert response.json['itens'][0]['treinamento_info']['nome_treinamento'] == "Python"
+        assert response.json['missing'] == [12345]
+
+    def test_milhares_de_ids_em_uma_consulta(self, client, dados):
+        """5000 ids cabem no limite de parâmetros do driver e no orçamento de SQL."""
+        _, _, (primeiro, _) = dados
+        ids = ','.join(str(i) for i in range(primeiro, primeiro + 5000))
+        response = client.get(f'/alunos/?ids={ids}')
+        assert response.status_code == 200
+        assert len(response.json['itens']) == 2
+        assert len(response.json['missing']) == 4998
+
+    def test_ids_invalidos(self, client):
+        assert client.get('/alunos/?ids=1,x').status_code == 400
+        assert client.get('/alunos/?ids=').status_code == 400
+        ids = ','.join(str(i) for i in range(1, 5002))
+        assert client.get(f'/treinamentos/agendados?ids={ids}').status_code == 400
@@ -0,0 +1,77 @@
+import json
+from app.utils.cache import CacheLRU
+
+
+class RelogioFalso:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+class TestCacheLRU:
+    """Testes do cache em memória (LRU + TTL)."""
+
+    def test_acerto_e_falha(self):
+        cache = CacheLRU(maximo=10, ttl=60)
+        chamadas = []
+        calcular = lambda: chamadas.append(1) or "valor"
+
+        assert cache.obter_ou_calcular('a', calcular) == "valor"
+        assert cache.obter_ou_calcular('a', calcular) == "valor"
+        assert len(chamadas) == 1
+        assert cache.estatisticas()['acertos'] == 1
+        assert cache.estatisticas()['falhas'] == 1
+
+    def test_ttl_expira(self):
+        relogio = RelogioFalso()
+        cache = CacheLRU(maximo=10, ttl=5, relogio=relogio)
+        cache.guardar('a', 1)
+        relogio.agora = 6
+        assert cache.obter('a') == (False, None)
+        assert cache.estatisticas()['expirados'] == 1
+
+    def test_descarta_menos_usado(self):
+        cache = CacheLRU(maximo=2, ttl=60)
+        cache.guardar('a', 1)
+        cache.guardar('b', 2)
+        cache.obter('a')
+        cache.guardar('c', 3)
+        assert cache.obter('b') == (False, None)
+        assert cache.obter('a') == (True, 1)
+        assert cache.estatisticas()['descartados'] == 1
+
+    def test_invalidacao_durante_calculo_nao_guarda(self):
+        """Um valor calculado antes de uma escrita não fica em cache depois dela."""
+        cache = CacheLRU(maximo=10, ttl=60)
+
+        def calcular_e_escrever():
+            cache.invalidar()  # escrita concorrente terminando no meio do cálculo
+            return "antigo"
+
+        assert cache.obter_ou_calcular('a', calcular_e_escrever) == "antigo"
+        assert cache.obter('a') == (False, None)
+        assert cache.obter_ou_calcular('a', lambda: "novo") == "novo"
+        assert cache.obter('a') == (True, "novo")
+
+
+class TestCacheCatalogo:
+    """Testes do cache nas rotas do catálogo."""
+
+    def test_escrita_invalida_cache(self, client):
+        assert client.get('/treinamentos').json == []
+        client.post('/treinamentos', data=json.dumps({"nome_treinamento": "Go", "vendor": "Google"}),
+                    content_type='application/json')
+        assert len(client.get('/treinamentos').json) == 1
+
+        estatisticas = client.get('/interno/cache').json['catalogo']
+        assert estatisticas['invalidacoes'] == 1
+        assert estatisticas['falhas'] == 2
+
+    def test_leituras_repetidas_usam_cache(self, client):
+        for _ in range(3):
+            client.get('/treinamentos/Google')
+        estatisticas = client.get('/interno/cache').json['catalogo']
+        assert estatisticas['acertos'] == 2
+        assert estatisticas['falhas'] == 1
@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import event
+from app import db
+
+
+@pytest.fixture
+def dados(fabrica):
+    treinamento = fabrica.treinamento(instrutor_sugerido="João Silva")
+    turma = fabrica.turma(treinamento, local="Sala 1")
+    fabrica.aluno(turma, nome="Ana", email="ana@email.com")
+    return turma.id
+
+
+@pytest.fixture
+def instrucoes(app):
+    """Captura o SQL executado durante o teste."""
+    executadas = []
+
+    def capturar(conn, cursor, statement, parameters, context, executemany):
+        executadas.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', capturar)
+    yield executadas
+    event.remove(db.engine, 'before_cursor_execute', capturar)
+
+
+class TestCampos:
+    """Testes do parâmetro 'fields' (sparse fieldsets)."""
+
+    def test_agendados_so_com_campos_pedidos(self, client, dados, instrucoes):
+        response = client.get('/treinamentos/agendados?fields=status,id,data_inicio')
+        assert response.json == [{"id": dados, "data_inicio": "2099-01-10", "status": "Agendada"}]
+
+        # O SELECT só busca essas colunas e não junta o treinamento
+        select_turmas = [sql for sql in instrucoes if 'FROM turmas' in sql][-1]
+        assert 'turmas.local' not in select_turmas
+        assert 'treinamentos' not in select_turmas
+
+    def test_agendados_com_treinamento_info(self, client, dados):
+        response = client.get('/treinamentos/agendados?fields=id,treinamento_info&incluir=resumo')
+        turma = response.json[0]
+        assert set(turma) == {"id", "treinamento_info", "resumo"}
+        assert turma['treinamento_info']['nome_treinamento'] == "Python"
+
+    def test_alunos_paginados_e_por_ids(self, client, dados):
+        paginados = client.get('/alunos/?limit=10&fields=nome').json
+        assert paginados['itens'] == [{"nome": "Ana"}]
+
+        por_ids = client.get('/alunos/?ids=1&fields=email,id').json
+        assert por_ids['itens'] == [{"id": 1, "email": "ana@email.com"}]
+
+    def test_catalogo_recortado(self, client, dados):
+        assert client.get('/treinamentos?fields=vendor').json == [{"vendor": "TechCorp"}]
+        paginado = client.get('/treinamentos?limit=1&fields=id').json
+        assert paginado['itens'] == [{"id": 1}]
+
+    def test_exportacao_csv_com_campos(self, client, dados):
+        response = client.get('/alunos/?fields=id,email', headers={'Accept': 'text/csv'})
+        assert response.data.decode().splitlines() == ['id,email', '1,ana@email.com']
+
+    def test_campo_desconhecido(self, client):
+        response = client.get('/treinamentos/agendados?fields=id,senha')
+        assert response.status_code == 400
+        assert 'data_inicio' in response.json['erro']
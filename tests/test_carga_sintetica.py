@@ -0,0 +1,49 @@
+from sqlalchemy import func, select
+from app import db
+from app.comandos import seed
+from app.models.alunos import Aluno
+from app.models.treinamentos import Treinamento
+from app.models.turmas import Turma
+from app.models.relatorios import RelatorioInscricoes
+from app.services.carga_sintetica import gerar_dados
+
+
+class TestCargaSintetica:
+    """Testes do gerador de dados sintéticos (flask seed)."""
+
+    def test_dados_relacionados_e_consistentes(self, app):
+        gerar_dados(3, 10, 200, tamanho_lote=64)
+
+        assert Treinamento.query.count() == 3
+        assert Turma.query.count() == 10
+        assert Aluno.query.count() == 200
+        # O contador de vagas bate com os alunos e respeita o limite
+        assert db.session.scalar(select(func.sum(Turma.vagas_ocupadas))) == 200
+        for turma in Turma.query.all():
+            assert turma.vagas_ocupadas == turma.alunos.count()
+            assert turma.limite_vagas is None or turma.vagas_ocupadas <= turma.limite_vagas
+        # O agregado dos relatórios já sai atualizado
+        assert db.session.scalar(select(func.sum(RelatorioInscricoes.total_inscritos))) == 200
+
+    def test_semente_reprodutivel(self, app):
+        gerar_dados(2, 4, 20, semente=7)
+        primeira = [(a.nome, a.turma_id, a.pago) for a in Aluno.query.order_by(Aluno.id)]
+        db.session.query(Aluno).delete()
+        db.session.query(Turma).delete()
+        db.session.query(Treinamento).delete()
+        db.session.commit()
+
+        gerar_dados(2, 4, 20, semente=7)
+        segunda = [(a.nome, a.turma_id, a.pago) for a in Aluno.query.order_by(Aluno.id)]
+        assert primeira == segunda
+
+    def test_alunos_em_turmas_existentes(self, app):
+        gerar_dados(1, 3, 10)
+        gerar_dados(0, 0, 30)
+        assert db.session.scalar(select(func.sum(Turma.vagas_ocupadas))) == 40
+
+    def test_comando_seed(self, app):
+        resultado = app.test_cli_runner().invoke(
+            seed, ['--treinamentos', '2', '--turmas', '3', '--alunos', '5'])
+        assert resultado.exit_code == 0, resultado.output
+        assert Aluno.query.count() == 5
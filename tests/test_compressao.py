@@ -0,0 +1,102 @@
+import gzip
+import pytest
+from datetime import date
+from app.services.jobs import executor_de_jobs
+from app.utils.compressao import TAMANHO_BLOCO
+
+
+@pytest.fixture
+def turmas(fabrica):
+    treinamento = fabrica.treinamento(nome_treinamento="Arquitetura de Soluções",
+                                      instrutor_sugerido="João Silva")
+    fabrica.turmas(treinamento, [date(2099, 1, 1 + i % 28) for i in range(400)], local="Sala 1")
+
+
+GZIP = {'Accept-Encoding': 'gzip'}
+
+
+class TestCompressao:
+    """Testes da compressão negociada das respostas."""
+
+    def test_lista_comprimida_com_gzip(self, client, turmas):
+        normal = client.get('/treinamentos/agendados')
+        comprimida = client.get('/treinamentos/agendados', headers=GZIP)
+
+        assert 'Content-Encoding' not in normal.headers
+        assert comprimida.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in comprimida.headers['Vary']
+        assert gzip.decompress(comprimida.data) == normal.data
+        assert len(comprimida.data) * 10 < len(normal.data)
+
+    def test_corpo_pequeno_nao_comprime(self, client, turmas):
+        response = client.get('/treinamentos/agendados?ids=1', headers=GZIP)
+        assert 'Content-Encoding' not in response.headers
+
+    def test_corpo_grande_em_blocos(self, client, turmas):
+        # Acima de TAMANHO_BLOCO o corpo é comprimido em blocos, sem Content-Length
+        assert len(client.get('/treinamentos/agendados').data) > TAMANHO_BLOCO
+        response = client.get('/treinamentos/agendados', headers=GZIP)
+        assert 'Content-Length' not in response.headers
+        assert gzip.decompress(response.data).startswith(b'[')
+
+    def test_pequena_mantem_content_length(self, client, turmas):
+        response = client.get('/treinamentos/agendados?ids=' + ','.join(map(str, range(1, 21))),
+                              headers=GZIP)
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert int(response.headers['Content-Length']) == len(response.data)
+
+    def test_exportacao_em_streaming(self, client, turmas):
+        headers = {'Accept': 'application/x-ndjson', **GZIP}
+        response = client.get('/treinamentos/agendados', headers=headers)
+        assert response.headers['Content-Encoding'] == 'gzip'
+        linhas = gzip.decompress(response.data).decode().splitlines()
+        assert len(linhas) == 400
+
+    def test_etag_por_codificacao(self, client, turmas):
+        etag_normal = client.get('/treinamentos/agendados').headers['ETag']
+        etag_gzip = client.get('/treinamentos/agendados', headers=GZIP).headers['ETag']
+        assert etag_normal != etag_gzip
+
+        response = client.get('/treinamentos/agendados',
+                              headers={'If-None-Match': etag_gzip, **GZIP})
+        assert response.status_code == 304
+
+    def test_desligada_pela_configuracao(self, app, client, turmas):
+        app.config['COMPRESSAO_HABILITADA'] = False
+        response = client.get('/treinamentos/agendados', headers=GZIP)
+        assert 'Content-Encoding' not in response.headers
+
+    @pytest.mark.parametrize('caminho, headers', [
+        # Corpo pronto pequeno: comprimido inteiro, com Content-Length
+        ('/treinamentos/agendados?ids=' + ','.join(map(str, range(1, 21))), {}),
+        # Corpo pronto grande: em blocos
+        ('/treinamentos/agendados', {}),
+        # Exportação em streaming
+        ('/treinamentos/agendados', {'Accept': 'application/x-ndjson'}),
+    ])
+    def test_brotli(self, client, turmas, caminho, headers):
+        brotli = pytest.importorskip('brotli')
+        normal = client.get(caminho, headers=headers)
+        comprimida = client.get(caminho, headers={'Accept-Encoding': 'gzip, br', **headers})
+
+        assert comprimida.headers['Content-Encoding'] == 'br'
+        assert brotli.decompress(comprimida.data) == normal.data
+
+    def test_resultado_de_job_pre_comprimido(self, app, client, fabrica, tmp_path):
+        executor_de_jobs.configurar(app, 0, str(tmp_path))
+        try:
+            fabrica.aluno(fabrica.turma(data_inicio=date(2025, 3, 10)),
+                          nome="Ana", email="ana@email.com")
+
+            job = client.post('/jobs', json={"tipo": "exportar_alunos"}).json
+            normal = client.get(job['resultado'])
+            comprimido = client.get(job['resultado'], headers=GZIP)
+
+            assert 'Content-Encoding' not in normal.headers
+            assert comprimido.headers['Content-Encoding'] == 'gzip'
+            assert gzip.decompress(comprimido.data) == normal.data
+            normal.close()
+            comprimido.close()
+        finally:
+            executor_de_jobs.configurar(app, app.config['JOBS_WORKERS'],
+                                        app.config['JOBS_DIRETORIO'])
@@ -0,0 +1,61 @@
+import pytest
+import threading
+from datetime import date
+from sqlalchemy import text
+from app import db
+from app.models.treinamentos import Treinamento
+from app.models.turmas import Turma
+from app.utils.consultas import orcamento_de_consultas, OrcamentoDeConsultasExcedido
+
+
+class TestOrcamentoDeConsultas:
+    """Testes do orçamento de instruções SQL por rota."""
+
+    def test_agendados_sem_n_mais_1(self, client, fabrica):
+        """Listar várias turmas de vários treinamentos cabe em um único SELECT."""
+        for i in range(3):
+            treinamento = fabrica.treinamento(nome_treinamento=f"Curso {i}")
+            fabrica.turmas(treinamento, [date(2099, 3, dia) for dia in range(1, 5)])
+
+        response = client.get('/treinamentos/agendados')
+        assert response.status_code == 200
+        assert len(response.json) == 12
+        assert all(t['treinamento_info'] is not None for t in response.json)
+
+    def test_orcamento_excedido_falha(self, app):
+        """Uma função que passa do orçamento levanta erro em modo de teste."""
+        @orcamento_de_consultas(1)
+        def duas_consultas():
+            Treinamento.query.all()
+            Turma.query.all()
+
+        with app.test_request_context():
+            with pytest.raises(OrcamentoDeConsultasExcedido):
+                duas_consultas()
+
+    def test_orcamento_ignorado_fora_de_debug(self, app):
+        """Fora de debug/teste o orçamento não é verificado."""
+        @orcamento_de_consultas(0)
+        def uma_consulta():
+            return Treinamento.query.all()
+
+        app.config['TESTING'] = False
+        with app.test_request_context():
+            assert uma_consulta() == []
+
+    def test_orcamento_ignora_outras_threads(self, app):
+        """SQL de requisições simultâneas (outras threads) não entra no orçamento."""
+        def outra_requisicao():
+            with app.app_context(), db.engine.connect() as conexao:
+                for _ in range(3):
+                    conexao.execute(text('SELECT 1'))
+
+        @orcamento_de_consultas(1)
+        def uma_consulta():
+            thread = threading.Thread(target=outra_requisicao)
+            thread.start()
+            thread.join()
+            return Treinamento.query.all()
+
+        with app.test_request_context():
+            assert uma_consulta() == []
@@ -0,0 +1,37 @@
+from datetime import date
+from app.utils.consultas_lentas import consultas_lentas, redigir_parametros
+
+
+class TestConsultasLentas:
+    """Testes do registro de consultas lentas."""
+
+    def test_redigir_parametros(self):
+        assert redigir_parametros(('ana@email.com', 3)) == ['<str>', '<int>']
+        assert redigir_parametros({'email': 'ana@email.com'}) == {'email': '<str>'}
+
+    def test_registra_consulta_com_plano(self, client, fabrica):
+        fabrica.turma(data_inicio=date(2099, 1, 1))
+
+        # Limiar zero: toda instrução das rotas é considerada lenta
+        consultas_lentas.configurar(0, 10)
+        client.get('/treinamentos/agendados?ano=2099')
+        consultas_lentas.aguardar()
+
+        response = client.get('/interno/consultas-lentas?endpoint=treinamentos.obter_treinamentos_agendados')
+        consultas = response.json['consultas']
+        select_turmas = [c for c in consultas
+                         if 'FROM turmas' in c['sql'] and 'versoes_recursos' not in c['sql']]
+        assert len(select_turmas) == 1
+        assert 'ix_turmas_data_inicio_status' in select_turmas[0]['plano']
+        assert all(p.startswith('<') for p in select_turmas[0]['parametros'])
+
+    def test_buffer_circular(self, client):
+        consultas_lentas.configurar(0, 2)
+        for _ in range(3):
+            client.get('/treinamentos/agendados')
+        assert len(consultas_lentas.listar()) == 2
+
+    def test_consultas_rapidas_ignoradas(self, client):
+        consultas_lentas.configurar(10000, 10)
+        client.get('/treinamentos/agendados')
+        assert consultas_lentas.listar() == []
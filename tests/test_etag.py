@@ -0,0 +1,83 @@
+import json
+from datetime import date
+from app.utils.etag import AGENDA, versoes_atuais
+
+
+class TestETag:
+    """Testes do ETag / If-None-Match nas leituras do catálogo e da agenda."""
+
+    def test_catalogo_304_ate_escrita(self, client):
+        response = client.get('/treinamentos')
+        etag = response.headers['ETag']
+        assert etag
+
+        response = client.get('/treinamentos', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+
+        client.post('/treinamentos', data=json.dumps({"nome_treinamento": "Go", "vendor": "Google"}),
+                    content_type='application/json')
+
+        response = client.get('/treinamentos', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert len(response.json) == 1
+
+    def test_etag_varia_por_url_e_formato(self, client):
+        etag_lista = client.get('/treinamentos/agendados').headers['ETag']
+        etag_filtro = client.get('/treinamentos/agendados?ano=2099').headers['ETag']
+        etag_csv = client.get('/treinamentos/agendados', headers={'Accept': 'text/csv'}).headers['ETag']
+        assert len({etag_lista, etag_filtro, etag_csv}) == 3
+
+    def test_agenda_invalida_ao_atualizar_turma(self, client, fabrica):
+        turma = fabrica.turma(data_inicio=date(2099, 1, 1))
+
+        etag = client.get('/treinamentos/agendados').headers['ETag']
+        client.put(f'/treinamentos/agendados/{turma.id}', data=json.dumps({"status": "Cancelada"}),
+                   content_type='application/json')
+
+        response = client.get('/treinamentos/agendados', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.json[0]['status'] == "Cancelada"
+
+    def test_agenda_invalida_ao_inscrever_e_remover_aluno(self, client, fabrica):
+        """vagas_ocupadas está na agenda: inscrições e remoções mudam o ETag."""
+        turma = fabrica.turma(data_inicio=date(2099, 1, 1), limite_vagas=10)
+
+        etag = client.get('/treinamentos/agendados').headers['ETag']
+        criado = client.post('/alunos/', json={"nome": "Ana", "email": "ana@email.com",
+                                               "turma_id": turma.id})
+        assert criado.status_code == 201
+
+        response = client.get('/treinamentos/agendados', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.json[0]['vagas_ocupadas'] == 1
+
+        etag = response.headers['ETag']
+        client.delete(f"/alunos/{criado.json['id']}")
+        response = client.get('/treinamentos/agendados', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.json[0]['vagas_ocupadas'] == 0
+
+    def test_inscricao_so_invalida_listagens_da_turma(self, client, fabrica):
+        """A reserva de vaga não escreve na versão global da agenda."""
+        marco = fabrica.turma(data_inicio=date(2099, 3, 1))
+        fabrica.turma(marco.treinamento, data_inicio=date(2099, 11, 1))
+        agenda = versoes_atuais([AGENDA])
+
+        etag_marco = client.get('/treinamentos/agendados?mes=3').headers['ETag']
+        etag_novembro = client.get('/treinamentos/agendados?mes=11').headers['ETag']
+        client.post('/alunos/', json={"nome": "Ana", "email": "ana@email.com",
+                                      "turma_id": marco.id})
+
+        assert versoes_atuais([AGENDA]) == agenda
+        assert client.get('/treinamentos/agendados?mes=11',
+                          headers={'If-None-Match': etag_novembro}).status_code == 304
+        response = client.get('/treinamentos/agendados?mes=3', headers={'If-None-Match': etag_marco})
+        assert response.status_code == 200
+        assert response.json[0]['vagas_ocupadas'] == 1
+
+    def test_404_sem_etag(self, client):
+        response = client.get('/treinamentos/VendorInexistente')
+        assert response.status_code == 404
+        assert 'ETag' not in response.headers
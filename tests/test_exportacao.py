@@ -0,0 +1,49 @@
+import json
+import pytest
+from datetime import date
+
+
+@pytest.fixture
+def dados(fabrica):
+    """Cria uma turma futura com três alunos."""
+    treinamento = fabrica.treinamento(instrutor_sugerido="João Silva")
+    turma = fabrica.turma(treinamento, data_inicio=date(2099, 5, 2), local="Sala 1")
+    for i in range(3):
+        fabrica.aluno(turma, nome=f"Aluno {i}", email=f"a{i}@email.com", pago=i == 0)
+
+
+class TestExportacao:
+    """Testes da exportação em streaming (NDJSON/CSV)."""
+
+    def test_alunos_ndjson(self, client, dados):
+        response = client.get('/alunos/', headers={'Accept': 'application/x-ndjson'})
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        assert response.is_streamed
+
+        linhas = [json.loads(l) for l in response.get_data(as_text=True).splitlines()]
+        assert [l['email'] for l in linhas] == ["a0@email.com", "a1@email.com", "a2@email.com"]
+        assert linhas[0]['pago'] is True
+
+    def test_alunos_csv(self, client, dados):
+        response = client.get('/alunos/', headers={'Accept': 'text/csv'})
+        linhas = response.get_data(as_text=True).splitlines()
+        assert linhas[0] == "id,nome,email,pago,turma_id"
+        assert len(linhas) == 4
+        assert 'alunos.csv' in response.headers['Content-Disposition']
+
+    def test_alunos_csv_vazio_tem_cabecalho(self, client):
+        response = client.get('/alunos/', headers={'Accept': 'text/csv'})
+        assert response.get_data(as_text=True).strip() == "id,nome,email,pago,turma_id"
+
+    def test_turmas_ndjson_igual_ao_json(self, client, dados):
+        """O registro exportado tem o mesmo formato da listagem JSON."""
+        esperado = client.get('/treinamentos/agendados').json
+        response = client.get('/treinamentos/agendados',
+                              headers={'Accept': 'application/x-ndjson'})
+        exportado = [json.loads(l) for l in response.get_data(as_text=True).splitlines()]
+        assert exportado == esperado
+
+    def test_accept_json_mantem_lista(self, client, dados):
+        response = client.get('/alunos/', headers={'Accept': 'application/json'})
+        assert len(response.json) == 3
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import threading
+import time
+import pytest
+from datetime import timedelta
+from app import db
+from app.models.idempotencia import ChaveIdempotencia
+from app.models.jobs import Job, agora
+from app.models.treinamentos import Treinamento
+from app.services.jobs import executor_de_jobs
+
+
+def corpo(nome="Go"):
+    return json.dumps({"nome_treinamento": nome, "vendor": "Google"})
+
+
+def criar(client, chave, nome="Go"):
+    return client.post('/treinamentos', data=corpo(nome), content_type='application/json',
+                       headers={'Idempotency-Key': chave})
+
+
+@pytest.fixture
+def em_andamento(app):
+    """Simula uma primeira requisição ainda executando (em outro worker)."""
+    momento = agora()
+    db.session.add(ChaveIdempotencia(
+        chave="chave-1", rota="/treinamentos", criado_em=momento,
+        expira_em=momento + timedelta(hours=1),
+        impressao=hashlib.sha256(corpo().encode()).hexdigest()))
+    db.session.commit()
+
+
+class TestIdempotencia:
+    """Testes do cabeçalho Idempotency-Key nas rotas POST."""
+
+    def test_repeticao_devolve_resposta_gravada(self, client):
+        primeira = criar(client, "chave-1")
+        repetida = criar(client, "chave-1")
+
+        assert primeira.status_code == repetida.status_code == 201
+        assert repetida.json == primeira.json
+        assert repetida.headers['Idempotent-Replayed'] == 'true'
+        assert 'Idempotent-Replayed' not in primeira.headers
+        assert Treinamento.query.count() == 1
+
+    def test_chaves_diferentes_executam(self, client):
+        criar(client, "chave-1", nome="Go")
+        criar(client, "chave-2", nome="Rust")
+        assert Treinamento.query.count() == 2
+
+    def test_outro_corpo_com_a_mesma_chave(self, client):
+        criar(client, "chave-1", nome="Go")
+        response = criar(client, "chave-1", nome="Rust")
+        assert response.status_code == 422
+        assert Treinamento.query.count() == 1
+
+    def test_outro_modo_com_a_mesma_chave(self, client, fabrica):
+        turma = fabrica.turma()
+        aluno = {"nome": "Ana", "email": "ana@email.com", "turma_id": turma.id}
+        headers = {'Idempotency-Key': "inscricao-1"}
+
+        criada = client.post('/alunos/', json=aluno, headers=headers)
+        upsert = client.post('/alunos/?modo=upsert', json=aluno, headers=headers)
+        assert criada.status_code == 201
+        assert upsert.status_code == 422
+        assert 'Idempotent-Replayed' not in upsert.headers
+
+    def test_outro_modo_no_lote(self, client, fabrica):
+        turma = fabrica.turma()
+        linhas = f'nome,email,turma_id\nAna,ana@email.com,{turma.id}\n'
+        headers = {'Idempotency-Key': "lote-1"}
+
+        primeira = client.post('/alunos/bulk', data=linhas, content_type='text/csv',
+                               headers=headers)
+        repetida = client.post('/alunos/bulk', data=linhas, content_type='text/csv',
+                               headers=headers)
+        upsert = client.post('/alunos/bulk?modo=upsert', data=linhas, content_type='text/csv',
+                             headers=headers)
+        assert repetida.headers['Idempotent-Replayed'] == 'true'
+        assert repetida.data == primeira.data
+        assert upsert.status_code == 422
+
+    def test_conflito_tambem_e_repetido(self, client, fabrica):
+        turma = fabrica.turma()
+        aluno = {"nome": "Ana", "email": "ana@email.com", "turma_id": turma.id}
+        client.post('/alunos/', json=aluno)
+        headers = {'Idempotency-Key': "inscricao-1"}
+
+        primeira = client.post('/alunos/', json=aluno, headers=headers)
+        repetida = client.post('/alunos/', json=aluno, headers=headers)
+        assert primeira.status_code == repetida.status_code == 409
+        assert repetida.json['conflito'] == "email_duplicado"
+        assert repetida.headers['Idempotent-Replayed'] == 'true'
+
+    def test_location_e_repetido(self, app, client, tmp_path):
+        executor_de_jobs.configurar(app, 0, str(tmp_path))
+        try:
+            headers = {'Idempotency-Key': "job-1"}
+            primeira = client.post('/jobs', json={"tipo": "exportar_alunos"}, headers=headers)
+            repetida = client.post('/jobs', json={"tipo": "exportar_alunos"}, headers=headers)
+        finally:
+            executor_de_jobs.configurar(app, app.config['JOBS_WORKERS'],
+                                        app.config['JOBS_DIRETORIO'])
+        assert repetida.status_code == 202
+        assert repetida.headers['Location'] == primeira.headers['Location']
+        assert Job.query.count() == 1
+
+    def test_chave_expirada_executa_de_novo(self, client):
+        criar(client, "chave-1")
+        db.session.query(ChaveIdempotencia).update({'expira_em': agora() - timedelta(seconds=1)})
+        db.session.commit()
+
+        response = criar(client, "chave-1")
+        assert 'Idempotent-Replayed' not in response.headers
+        assert Treinamento.query.count() == 2
+
+    def test_espera_a_requisicao_em_andamento(self, app, client, em_andamento):
+        def concluir():
+            time.sleep(0.2)
+            with app.app_context():
+                db.session.query(ChaveIdempotencia).update({
+                    'status': 201, 'corpo': b'{"id": 7}', 'tipo_conteudo': 'application/json'})
+                db.session.commit()
+
+        thread = threading.Thread(target=concluir)
+        thread.start()
+        inicio = time.monotonic()
+        response = criar(client, "chave-1")
+        thread.join()
+
+        assert time.monotonic() - inicio >= 0.2
+        assert response.status_code == 201
+        assert response.json == {"id": 7}
+        assert Treinamento.query.count() == 0
+
+    def test_requisicao_abandonada_e_assumida(self, client, em_andamento):
+        db.session.query(ChaveIdempotencia).update({'criado_em': agora() - timedelta(hours=1)})
+        db.session.commit()
+
+        response = criar(client, "chave-1")
+        assert response.status_code == 201
+        assert 'Idempotent-Replayed' not in response.headers
+
+    def test_desiste_de_esperar(self, app, client, em_andamento):
+        app.config['IDEMPOTENCIA_ESPERA_SEGUNDOS'] = 0.1
+        response = criar(client, "chave-1")
+        assert response.status_code == 409
+        assert response.headers['Retry-After'] == '1'
+
+    def test_chave_invalida(self, client):
+        assert criar(client, "x" * 300).status_code == 400
+
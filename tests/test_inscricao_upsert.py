@@ -0,0 +1,111 @@
+import pytest
+from datetime import date
+from sqlalchemy import event
+from app import db
+from app.models.turmas import Turma
+from app.models.alunos import Aluno
+
+
+@pytest.fixture
+def turmas(fabrica):
+    """Duas turmas com limite de duas vagas; ana@email.com inscrita na primeira."""
+    primeira = fabrica.turma(limite_vagas=2, vagas_ocupadas=1)
+    segunda = fabrica.turma(primeira.treinamento, data_inicio=date(2099, 2, 10), limite_vagas=2)
+    fabrica.aluno(primeira, nome="Ana", email="ana@email.com")
+    return primeira.id, segunda.id
+
+
+@pytest.fixture
+def instrucoes(app):
+    """Captura o SQL executado durante o teste."""
+    executadas = []
+
+    def capturar(conn, cursor, statement, parameters, context, executemany):
+        executadas.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', capturar)
+    yield executadas
+    event.remove(db.engine, 'before_cursor_execute', capturar)
+
+
+def inscrever(client, turma_id, modo=None, **dados):
+    url = '/alunos/' + (f'?modo={modo}' if modo else '')
+    return client.post(url, json={"nome": "Ana Maria", "email": "ana@email.com",
+                                  "turma_id": turma_id, **dados})
+
+
+class TestInscricao:
+    """Testes dos modos create/upsert da inscrição e dos conflitos tipados."""
+
+    def test_email_duplicado_sem_excecao(self, client, turmas, instrucoes):
+        primeira, _ = turmas
+        response = inscrever(client, primeira)
+
+        assert response.status_code == 409
+        assert response.json['conflito'] == "email_duplicado"
+        assert response.json['aluno_id'] == 1
+        # Só o INSERT condicional e a verificação do motivo; nenhuma vaga reservada
+        assert not any(sql.startswith('UPDATE turmas') for sql in instrucoes)
+        assert db.session.get(Turma, primeira).vagas_ocupadas == 1
+
+    def test_insercao_em_uma_instrucao(self, client, turmas, instrucoes):
+        primeira, _ = turmas
+        response = inscrever(client, primeira, email="bia@email.com")
+
+        assert response.status_code == 201
+        assert response.json == {"id": 2, "nome": "Ana Maria", "email": "bia@email.com",
+                                 "pago": False, "turma_id": primeira}
+        insercoes = [sql for sql in instrucoes if sql.startswith('INSERT INTO alunos')]
+        assert len(insercoes) == 1
+        assert 'WHERE EXISTS' in insercoes[0] and 'ON CONFLICT' in insercoes[0]
+        assert not any(sql.startswith('SELECT') for sql in instrucoes)
+
+    def test_upsert_atualiza_na_mesma_turma(self, client, turmas):
+        primeira, _ = turmas
+        response = inscrever(client, primeira, modo='upsert', pago=True)
+
+        assert response.status_code == 200
+        assert response.json['nome'] == "Ana Maria" and response.json['pago'] is True
+        assert Aluno.query.count() == 1
+        assert db.session.get(Turma, primeira).vagas_ocupadas == 1
+
+    def test_upsert_cria_aluno_novo(self, client, turmas):
+        _, segunda = turmas
+        response = inscrever(client, segunda, modo='upsert', email="bia@email.com")
+        assert response.status_code == 201
+        assert db.session.get(Turma, segunda).vagas_ocupadas == 1
+
+    def test_upsert_em_outra_turma(self, client, turmas):
+        _, segunda = turmas
+        response = inscrever(client, segunda, modo='upsert')
+        assert response.status_code == 409
+        assert response.json['conflito'] == "inscrito_em_outra_turma"
+        assert response.json['turma_id'] == turmas[0]
+
+    def test_turma_lotada_tipada(self, client, turmas):
+        primeira, _ = turmas
+        assert inscrever(client, primeira, email="bia@email.com").status_code == 201
+        response = inscrever(client, primeira, email="caio@email.com")
+        assert response.status_code == 409
+        assert response.json['conflito'] == "turma_lotada"
+
+    def test_modo_invalido(self, client, turmas):
+        assert inscrever(client, turmas[0], modo='merge').status_code == 400
+
+    def test_lote_upsert(self, client, turmas):
+        primeira, segunda = turmas
+        corpo = ("nome,email,turma_id,pago\n"
+                 f"Ana Paula,ana@email.com,{primeira},sim\n"
+                 f"Bia,bia@email.com,{segunda},\n")
+        response = client.post('/alunos/bulk?modo=upsert', data=corpo, content_type='text/csv')
+
+        assert response.json['inseridos'] == 1
+        assert response.json['atualizados'] == 1
+        ana = Aluno.query.filter_by(email="ana@email.com").one()
+        assert (ana.nome, ana.pago) == ("Ana Paula", True)
+        assert db.session.get(Turma, primeira).vagas_ocupadas == 1
+
+        # Sem upsert, o mesmo arquivo reenviado só gera erros
+        response = client.post('/alunos/bulk', data=corpo, content_type='text/csv')
+        assert response.json['inseridos'] == 0
+        assert response.json['com_erro'] == 2
@@ -0,0 +1,146 @@
+import pytest
+from datetime import date
+from sqlalchemy import select
+from app import create_app, db
+from app.models.jobs import Job
+from app.models.treinamentos import Treinamento
+from app.services import jobs
+from app.services.jobs import executor_de_jobs
+from app.utils import exportacao
+
+
+@pytest.fixture
+def executor(app, tmp_path):
+    """Executor síncrono (0 workers) gravando os resultados em um diretório temporário."""
+    executor_de_jobs.configurar(app, 0, str(tmp_path))
+    yield executor_de_jobs
+    executor_de_jobs.configurar(app, app.config['JOBS_WORKERS'], app.config['JOBS_DIRETORIO'])
+
+
+@pytest.fixture
+def alunos(fabrica):
+    turma = fabrica.turma(data_inicio=date(2025, 3, 10))
+    fabrica.aluno(turma, nome="Ana", email="ana@email.com", pago=True)
+    fabrica.aluno(turma, nome="Bruno", email="bruno@email.com")
+    return turma.id
+
+
+class TestJobs:
+    """Testes dos jobs em segundo plano."""
+
+    def test_exportacao_csv(self, client, executor, alunos):
+        response = client.post('/jobs', json={"tipo": "exportar_alunos",
+                                              "parametros": {"formato": "csv", "turma_id": alunos}})
+        assert response.status_code == 202
+        assert response.headers['Location'] == f"/jobs/{response.json['id']}"
+
+        job = client.get(response.headers['Location']).json
+        assert job['status'] == 'concluido'
+        assert job['progresso'] == 100
+
+        arquivo = client.get(job['resultado'])
+        assert arquivo.mimetype == 'text/csv'
+        linhas = arquivo.data.decode().splitlines()
+        assert linhas[0] == 'id,nome,email,pago,turma_id'
+        assert len(linhas) == 3
+
+    def test_relatorio(self, client, executor, alunos):
+        # Os alunos da fixture foram gravados direto no banco, sem marcar pendências
+        client.post('/relatorios/atualizar')
+        response = client.post('/jobs', json={"tipo": "relatorio_inscricoes",
+                                              "parametros": {"agrupar_por": "vendor"}})
+        arquivo = client.get(response.json['resultado'])
+        assert arquivo.json == [{"vendor": "TechCorp", "total_inscritos": 2, "pagos": 1,
+                                 "nao_pagos": 1, "percentual_pago": 50.0}]
+
+    def test_validacao(self, client, executor):
+        assert client.post('/jobs', json={"tipo": "desconhecido"}).status_code == 400
+        assert client.post('/jobs', json={"tipo": "exportar_alunos",
+                                          "parametros": {"formato": "xlsx"}}).status_code == 400
+        assert client.get('/jobs/naoexiste').status_code == 404
+
+    def test_pool_de_threads(self, app, client, alunos, tmp_path):
+        """Com workers o POST responde antes do término; o resultado fica disponível depois."""
+        executor_de_jobs.configurar(app, 1, str(tmp_path))
+        try:
+            response = client.post('/jobs', json={"tipo": "exportar_turmas",
+                                                  "parametros": {"formato": "ndjson"}})
+            assert response.status_code == 202
+            executor_de_jobs.aguardar()
+            job = client.get(response.headers['Location']).json
+            assert job['status'] == 'concluido'
+            assert client.get(job['resultado']).data.decode().count('\n') == 1
+        finally:
+            executor_de_jobs.configurar(app, 0, str(tmp_path))
+
+
+@pytest.fixture
+def app_em_arquivo(monkeypatch, tmp_path):
+    """App sobre um SQLite em arquivo (um escritor por vez, como em desenvolvimento)."""
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'jobs.db'}")
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        executor_de_jobs.configurar(app, 0, str(tmp_path / 'resultados'))
+        yield app
+        executor_de_jobs.configurar(app, app.config['JOBS_WORKERS'], app.config['JOBS_DIRETORIO'])
+        db.session.remove()
+
+
+class TestJobsEmArquivo:
+    """Jobs em um SQLite em arquivo, onde a leitura em streaming trava o banco."""
+
+    @pytest.fixture
+    def app(self, app_em_arquivo):
+        # A fábrica grava no banco em arquivo
+        return app_em_arquivo
+
+    def test_progresso_nao_trava_o_job(self, app_em_arquivo, fabrica, monkeypatch):
+        monkeypatch.setattr(jobs, 'INTERVALO_PROGRESSO', 0)
+        monkeypatch.setattr(exportacao, 'LINHAS_POR_BUSCA', 2)
+        fabrica.turmas(fabrica.treinamento(), [date(2025, 3, dia) for dia in range(1, 11)])
+
+        client = app_em_arquivo.test_client()
+        response = client.post('/jobs', json={"tipo": "exportar_turmas"})
+        assert response.status_code == 202
+        job = client.get(response.headers['Location']).json
+        assert job['status'] == 'concluido'
+        assert client.get(job['resultado']).data.decode().count('\n') == 11
+
+    def test_progresso_gravado_durante_a_exportacao(self, app_em_arquivo, fabrica, monkeypatch):
+        monkeypatch.setattr(jobs, 'INTERVALO_PROGRESSO', 0)
+        monkeypatch.setattr(exportacao, 'LINHAS_POR_BUSCA', 2)
+        fabrica.turmas(fabrica.treinamento(), [date(2025, 3, dia) for dia in range(1, 11)])
+
+        # Lê o progresso gravado, por outra conexão, a cada aviso do job
+        lidos = []
+        informar = jobs._informar_progresso
+
+        def espiar(job_id, progresso):
+            informar(job_id, progresso)
+            with db.engine.connect() as conexao:
+                lidos.append(conexao.scalar(
+                    select(Job.progresso).where(Job.id == job_id)))
+        monkeypatch.setattr(jobs, '_informar_progresso', espiar)
+
+        client = app_em_arquivo.test_client()
+        response = client.post('/jobs', json={"tipo": "exportar_turmas", "parametros": {"formato": "ndjson"}})
+        assert lidos == [20, 40, 60, 80, 99]
+        assert client.get(response.headers['Location']).json['progresso'] == 100
+
+    def test_falha_nunca_fica_executando(self, app_em_arquivo, monkeypatch):
+        def falhar(parametros):
+            # Deixa a sessão do job no meio de uma transação com escrita
+            db.session.add(Treinamento(nome_treinamento="Temporário", vendor="X"))
+            db.session.flush()
+            raise RuntimeError("disco cheio")
+        monkeypatch.setitem(jobs.TAREFAS, 'exportar_turmas', (lambda p: p, falhar))
+
+        client = app_em_arquivo.test_client()
+        response = client.post('/jobs', json={"tipo": "exportar_turmas"})
+        assert response.status_code == 202
+        job = client.get(response.headers['Location']).json
+        assert job['status'] == 'falhou'
+        assert job['erro'] == "disco cheio"
+        assert Treinamento.query.count() == 0
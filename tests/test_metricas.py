@@ -0,0 +1,43 @@
+import json
+from app.utils.metricas import Histograma, metricas
+
+
+class TestMetricas:
+    """Testes das métricas por rota em /metrics."""
+
+    def test_histograma_buckets(self):
+        histograma = Histograma((1, 5))
+        for valor in (0, 1, 3, 10):
+            histograma.observar(valor)
+        assert histograma.contagens == [2, 1, 1]
+        assert histograma.total == 4
+
+    def test_metrics_por_rota(self, client):
+        metricas.zerar()
+        client.get('/treinamentos/agendados')
+        client.get('/treinamentos/agendados')
+        client.post('/treinamentos', data=json.dumps({"nome_treinamento": "Go", "vendor": "Google"}),
+                    content_type='application/json')
+
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        texto = response.get_data(as_text=True)
+
+        assert ('http_requests_total{endpoint="treinamentos.obter_treinamentos_agendados",'
+                'method="GET",status="200"} 2') in texto
+        assert ('http_request_duration_seconds_count{endpoint="treinamentos.obter_treinamentos_agendados",'
+                'method="GET"} 2') in texto
+        assert '# TYPE http_request_db_statements histogram' in texto
+
+        # Cada leitura de /agendados faz 2 instruções: versão do ETag + SELECT das turmas
+        assert ('http_request_db_statements_sum{endpoint="treinamentos.obter_treinamentos_agendados",'
+                'method="GET"} 4') in texto
+
+    def test_streaming_conta_sql_do_corpo(self, client):
+        metricas.zerar()
+        response = client.get('/alunos/', headers={'Accept': 'text/csv'})
+        response.get_data()
+        response.close()
+        texto = client.get('/metrics').get_data(as_text=True)
+        assert 'http_request_db_statements_sum{endpoint="alunos_bp.get_alunos",method="GET"} 1' in texto
@@ -0,0 +1,82 @@
+import pytest
+from datetime import date
+from app.utils.paginacao import codificar_cursor
+
+
+@pytest.fixture
+def catalogo(fabrica):
+    """Cria cinco treinamentos, dois deles com o mesmo nome."""
+    nomes = ["Docker", "AWS", "Python", "AWS", "Kubernetes"]
+    for i, nome in enumerate(nomes):
+        fabrica.treinamento(nome_treinamento=nome, vendor=f"Vendor {i}")
+
+
+@pytest.fixture
+def muitos_alunos(fabrica):
+    """Cria uma turma com sete alunos."""
+    turma = fabrica.turma(data_inicio=date(2030, 1, 10))
+    for _ in range(7):
+        fabrica.aluno(turma)
+
+
+class TestPaginacao:
+    """Testes da paginação por chave (cursor)."""
+
+    def test_alunos_sem_limit_mantem_lista(self, client, muitos_alunos):
+        """Sem 'limit'/'cursor' a resposta continua sendo uma lista simples."""
+        response = client.get('/alunos/')
+        assert response.status_code == 200
+        assert len(response.json) == 7
+
+    def test_alunos_percorre_todas_as_paginas(self, client, muitos_alunos):
+        """Segue o 'next_cursor' até o fim sem repetir nem perder alunos."""
+        vistos = []
+        response = client.get('/alunos/?limit=3')
+        while True:
+            assert response.status_code == 200
+            assert len(response.json['itens']) <= 3
+            vistos.extend(a['id'] for a in response.json['itens'])
+            cursor = response.json['next_cursor']
+            if cursor is None:
+                break
+            response = client.get(f'/alunos/?limit=3&cursor={cursor}')
+
+        assert len(vistos) == 7
+        assert vistos == sorted(vistos)
+
+    def test_catalogo_ordenado_por_nome_e_id(self, client, catalogo):
+        """O catálogo paginado respeita a ordem (nome_treinamento, id), inclusive com nomes repetidos."""
+        response = client.get('/treinamentos?limit=2')
+        primeira = response.json
+        assert [t['nome_treinamento'] for t in primeira['itens']] == ["AWS", "AWS"]
+
+        response = client.get(f"/treinamentos?limit=2&cursor={primeira['next_cursor']}")
+        segunda = response.json
+        assert [t['nome_treinamento'] for t in segunda['itens']] == ["Docker", "Kubernetes"]
+
+        response = client.get(f"/treinamentos?limit=2&cursor={segunda['next_cursor']}")
+        assert [t['nome_treinamento'] for t in response.json['itens']] == ["Python"]
+        assert response.json['next_cursor'] is None
+
+    def test_cursor_invalido(self, client):
+        """Um cursor malformado retorna 400."""
+        response = client.get('/alunos/?cursor=nao-e-um-cursor')
+        assert response.status_code == 400
+        assert "cursor" in response.json['erro']
+
+    @pytest.mark.parametrize('valores', [[[1]], [{"a": 1}], [None], ["1"], [True], [1.5]])
+    def test_cursor_com_tipo_errado(self, client, muitos_alunos, valores):
+        """Valores de outro tipo que a coluna da chave retornam 400, e não 500."""
+        response = client.get(f'/alunos/?cursor={codificar_cursor(valores)}')
+        assert response.status_code == 400
+        assert "cursor" in response.json['erro']
+
+    @pytest.mark.parametrize('valores', [[1, 1], ["AWS", "1"], ["AWS", None], [None, 1]])
+    def test_cursor_do_catalogo_com_tipo_errado(self, client, catalogo, valores):
+        response = client.get(f'/treinamentos?cursor={codificar_cursor(valores)}')
+        assert response.status_code == 400
+
+    def test_limit_fora_do_intervalo(self, client):
+        """Um 'limit' acima do teto retorna 400."""
+        response = client.get('/treinamentos?limit=100000')
+        assert response.status_code == 400
@@ -0,0 +1,45 @@
+from sqlalchemy import create_engine, text
+from app.database import PoolComTelemetria, opcoes_do_engine, telemetria_pool
+
+
+class TestPool:
+    """Testes da configuração e telemetria do pool de conexões."""
+
+    def test_opcoes_padrao_postgresql(self, monkeypatch):
+        for nome in ('DB_POOL_SIZE', 'DB_MAX_OVERFLOW', 'DB_POOL_TIMEOUT',
+                     'DB_POOL_RECYCLE', 'DB_POOL_PRE_PING'):
+            monkeypatch.delenv(nome, raising=False)
+        opcoes = opcoes_do_engine('postgresql://u:s@localhost/db')
+        assert opcoes['poolclass'] is PoolComTelemetria
+        assert opcoes['pool_size'] == 5
+        assert opcoes['pool_pre_ping'] is True
+        assert opcoes['pool_recycle'] == 1800
+
+    def test_opcoes_pelo_ambiente(self, monkeypatch):
+        monkeypatch.setenv('DB_POOL_SIZE', '20')
+        monkeypatch.setenv('DB_MAX_OVERFLOW', '0')
+        monkeypatch.setenv('DB_POOL_PRE_PING', 'false')
+        opcoes = opcoes_do_engine('postgresql://u:s@localhost/db')
+        assert opcoes['pool_size'] == 20
+        assert opcoes['max_overflow'] == 0
+        assert opcoes['pool_pre_ping'] is False
+
+    def test_sqlite_sem_opcoes_de_tamanho(self):
+        opcoes = opcoes_do_engine('sqlite:///:memory:')
+        assert 'pool_size' not in opcoes
+
+    def test_telemetria_registra_checkouts(self, tmp_path):
+        telemetria_pool.zerar()
+        engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}",
+                               poolclass=PoolComTelemetria, pool_size=2)
+        for _ in range(3):
+            with engine.connect() as conexao:
+                conexao.execute(text("SELECT 1"))
+        engine.dispose()
+        assert telemetria_pool.to_dict()['checkouts'] == 3
+
+    def test_rota_interna(self, client):
+        response = client.get('/interno/pool')
+        assert response.status_code == 200
+        assert 'status' in response.json
+        assert 'espera' in response.json
@@ -0,0 +1,80 @@
+import pytest
+from datetime import date
+from app.models.relatorios import RelatorioPendente
+
+
+@pytest.fixture
+def turmas(fabrica):
+    """Dois treinamentos de vendors diferentes, com turmas em meses distintos."""
+    python = fabrica.treinamento()
+    redes = fabrica.treinamento(nome_treinamento="Redes", vendor="NetCo")
+    marco = fabrica.turma(python, data_inicio=date(2025, 3, 10))
+    abril = fabrica.turma(python, data_inicio=date(2025, 4, 10))
+    redes_marco = fabrica.turma(redes, data_inicio=date(2025, 3, 20))
+    return marco.id, abril.id, redes_marco.id
+
+
+def inscrever(client, turma_id, email, pago=False):
+    response = client.post('/alunos/', json={
+        "nome": "Aluno", "email": email, "turma_id": turma_id, "pago": pago})
+    assert response.status_code == 201
+    return response.json['id']
+
+
+class TestRelatorios:
+    """Testes dos relatórios agregados de inscrições."""
+
+    def test_por_vendor(self, client, turmas):
+        marco, abril, redes_marco = turmas
+        inscrever(client, marco, "a@email.com", pago=True)
+        inscrever(client, abril, "b@email.com")
+        inscrever(client, redes_marco, "c@email.com", pago=True)
+
+        response = client.get('/relatorios/inscricoes?agrupar_por=vendor')
+        assert response.json == [
+            {"vendor": "NetCo", "total_inscritos": 1, "pagos": 1, "nao_pagos": 0, "percentual_pago": 100.0},
+            {"vendor": "TechCorp", "total_inscritos": 2, "pagos": 1, "nao_pagos": 1, "percentual_pago": 50.0},
+        ]
+        # A leitura consumiu a fila de pendências
+        assert RelatorioPendente.query.count() == 0
+
+    def test_por_mes_e_treinamento(self, client, turmas):
+        marco, abril, redes_marco = turmas
+        inscrever(client, marco, "a@email.com")
+        inscrever(client, redes_marco, "b@email.com")
+        inscrever(client, abril, "c@email.com")
+
+        por_mes = client.get('/relatorios/inscricoes?agrupar_por=mes&ano=2025').json
+        assert [(item['mes'], item['total_inscritos']) for item in por_mes] == [(3, 2), (4, 1)]
+
+        por_treinamento = client.get(
+            '/relatorios/inscricoes?agrupar_por=treinamento&vendor=TechCorp').json
+        assert len(por_treinamento) == 1
+        assert por_treinamento[0]['nome_treinamento'] == "Python"
+        assert por_treinamento[0]['total_inscritos'] == 2
+
+    def test_atualizacao_incremental(self, client, turmas):
+        """Pagamento, mudança de data e exclusão aparecem na leitura seguinte."""
+        marco, abril, _ = turmas
+        aluno_id = inscrever(client, marco, "a@email.com")
+        inscrever(client, marco, "b@email.com")
+        client.get('/relatorios/inscricoes?agrupar_por=mes')
+
+        client.put(f'/alunos/{aluno_id}', json={"pago": True})
+        client.put(f'/treinamentos/agendados/{marco}', json={"data_inicio": "2025-05-01"})
+        por_mes = client.get('/relatorios/inscricoes?agrupar_por=mes').json
+        assert [(item['mes'], item['total_inscritos'], item['pagos']) for item in por_mes] == [(5, 2, 1)]
+
+        client.delete(f'/alunos/{aluno_id}')
+        por_mes = client.get('/relatorios/inscricoes?agrupar_por=mes').json
+        assert [(item['mes'], item['total_inscritos'], item['pagos']) for item in por_mes] == [(5, 1, 0)]
+
+    def test_reconstrucao_completa(self, client, turmas):
+        marco, _, _ = turmas
+        inscrever(client, marco, "a@email.com")
+        response = client.post('/relatorios/atualizar')
+        assert response.json == {"linhas": 1}
+
+    def test_agrupamento_invalido(self, client):
+        assert client.get('/relatorios/inscricoes?agrupar_por=cor').status_code == 400
+        assert client.get('/relatorios/inscricoes?ano=abc').status_code == 400
@@ -0,0 +1,124 @@
+import pytest
+from datetime import date
+from sqlalchemy import insert
+from app import create_app, db
+from app.models.alunos import Aluno
+from app.models.treinamentos import Treinamento
+from app.models.turmas import Turma
+from app.models.versoes import VersaoRecurso
+from app.utils.replicas import COOKIE_PRIMARIO, roteador_de_replicas
+
+
+def povoar(engine, nome_aluno):
+    """Cria um treinamento, uma turma e um aluno direto no banco do engine."""
+    with engine.begin() as conexao:
+        conexao.execute(insert(Treinamento.__table__).values(
+            id=1, nome_treinamento="Python", vendor="TechCorp"))
+        conexao.execute(insert(Turma.__table__).values(
+            id=1, treinamento_id=1, data_inicio=date(2099, 1, 10), limite_vagas=10))
+        conexao.execute(insert(Aluno.__table__).values(
+            nome=nome_aluno, email=f"{nome_aluno.lower()}@email.com", turma_id=1))
+
+
+def criar_app(monkeypatch, tmp_path, *replicas):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'primario.db'}")
+    monkeypatch.setenv('DATABASE_REPLICA_URLS', ','.join(replicas))
+    # Cada bind registra um MetaData no 'db' global; desfeito no fim do teste
+    monkeypatch.setattr(db, 'metadatas', dict(db.metadatas))
+    app = create_app()
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture
+def app_com_replicas(monkeypatch, tmp_path):
+    """Primário e duas réplicas em arquivos SQLite, cada um com um aluno diferente."""
+    app = criar_app(monkeypatch, tmp_path, f"sqlite:///{tmp_path / 'replica_a.db'}",
+                    f"sqlite:///{tmp_path / 'replica_b.db'}")
+    with app.app_context():
+        for nome, aluno in ((None, "Primario"), ('replica_0', "ReplicaA"),
+                            ('replica_1', "ReplicaB")):
+            db.metadata.create_all(db.engines[nome])
+            povoar(db.engines[nome], aluno)
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def nomes(response):
+    return [aluno['nome'] for aluno in response.json]
+
+
+class TestReplicas:
+    """Testes do roteamento das leituras para as réplicas."""
+
+    def test_leituras_em_round_robin(self, app_com_replicas):
+        client = app_com_replicas.test_client()
+        lidos = [nomes(client.get('/alunos/')) for _ in range(4)]
+        assert lidos == [["ReplicaA"], ["ReplicaB"], ["ReplicaA"], ["ReplicaB"]]
+        assert roteador_de_replicas.estatisticas()['replica_0']['leituras'] == 2
+
+    def test_escrita_no_primario_e_leitura_propria(self, app_com_replicas):
+        client = app_com_replicas.test_client()
+        response = client.post('/alunos/', json={"nome": "Novo", "email": "novo@email.com",
+                                                 "turma_id": 1})
+        assert response.status_code == 201
+        assert COOKIE_PRIMARIO in response.headers['Set-Cookie']
+
+        # Com o cookie, o cliente que escreveu lê do primário
+        assert nomes(client.get('/alunos/')) == ["Primario", "Novo"]
+        # Outros clientes continuam nas réplicas
+        assert nomes(app_com_replicas.test_client().get('/alunos/')) in (["ReplicaA"], ["ReplicaB"])
+
+    def test_outros_blueprints_usam_o_primario(self, app_com_replicas):
+        client = app_com_replicas.test_client()
+        client.get('/relatorios/inscricoes')
+        assert roteador_de_replicas.estatisticas()['replica_0']['leituras'] == 0
+
+    def test_replica_fora_do_ar_sai_do_rodizio(self, monkeypatch, tmp_path):
+        app = criar_app(monkeypatch, tmp_path, "sqlite:////diretorio/inexistente/replica.db",
+                        f"sqlite:///{tmp_path / 'replica_b.db'}")
+        with app.app_context():
+            db.metadata.create_all(db.engines['replica_1'])
+            povoar(db.engines['replica_1'], "ReplicaB")
+
+        client = app.test_client()
+        assert [nomes(client.get('/alunos/')) for _ in range(3)] == [["ReplicaB"]] * 3
+        estatisticas = roteador_de_replicas.estatisticas()
+        assert estatisticas['replica_0']['saudavel'] is False
+        assert estatisticas['replica_0']['falhas'] == 1
+
+    def test_sem_replicas_saudaveis_le_do_primario(self, monkeypatch, tmp_path):
+        app = criar_app(monkeypatch, tmp_path, "sqlite:////diretorio/inexistente/replica.db")
+        with app.app_context():
+            db.metadata.create_all(db.engine)
+            povoar(db.engine, "Primario")
+        assert nomes(app.test_client().get('/alunos/')) == ["Primario"]
+
+    def test_cache_do_catalogo_com_replica_atrasada(self, monkeypatch, tmp_path):
+        """O cache preenchido por uma réplica atrasada não é servido com o ETag novo."""
+        app = criar_app(monkeypatch, tmp_path, f"sqlite:///{tmp_path / 'replica.db'}")
+        with app.app_context():
+            for nome in (None, 'replica_0'):
+                db.metadata.create_all(db.engines[nome])
+                povoar(db.engines[nome], "Aluno")
+            replica = db.engines['replica_0']
+
+        client = app.test_client()
+        assert client.post('/treinamentos', json={"nome_treinamento": "Go",
+                                                  "vendor": "Google"}).status_code == 201
+        # Outro cliente (sem o cookie) lê da réplica, que ainda não tem o 'Go'
+        outro = app.test_client()
+        antiga = outro.get('/treinamentos')
+        assert [t['nome_treinamento'] for t in antiga.json] == ["Python"]
+
+        # A réplica alcança o primário
+        with replica.begin() as conexao:
+            conexao.execute(insert(Treinamento.__table__).values(
+                id=2, nome_treinamento="Go", vendor="Google"))
+            conexao.execute(insert(VersaoRecurso.__table__).values(recurso='catalogo', versao=1))
+
+        response = outro.get('/treinamentos', headers={'If-None-Match': antiga.headers['ETag']})
+        assert response.status_code == 200
+        assert [t['nome_treinamento'] for t in response.json] == ["Go", "Python"]
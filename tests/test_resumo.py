@@ -0,0 +1,40 @@
+import pytest
+from datetime import date
+
+
+@pytest.fixture
+def turmas(fabrica):
+    """Cria duas turmas: a primeira com 3 alunos (1 pago), a segunda vazia."""
+    cheia = fabrica.turma()
+    vazia = fabrica.turma(cheia.treinamento, data_inicio=date(2099, 2, 10))
+    for i in range(3):
+        fabrica.aluno(cheia, pago=i == 0)
+    return cheia.id, vazia.id
+
+
+class TestResumoTurma:
+    """Testes do resumo de inscritos por turma."""
+
+    def test_resumo_uma_turma(self, client, turmas):
+        cheia, _ = turmas
+        response = client.get(f'/treinamentos/agendados/{cheia}/resumo')
+        assert response.json == {"turma_id": cheia, "total_inscritos": 3, "pagos": 1, "nao_pagos": 2}
+
+    def test_resumo_turma_inexistente(self, client):
+        assert client.get('/treinamentos/agendados/999/resumo').status_code == 404
+
+    def test_resumo_em_lote(self, client, turmas):
+        cheia, vazia = turmas
+        response = client.get(f'/treinamentos/agendados/resumo?ids={vazia},999,{cheia}')
+        assert [r['turma_id'] for r in response.json['resumos']] == [vazia, cheia]
+        assert response.json['resumos'][0]['total_inscritos'] == 0
+        assert response.json['nao_encontradas'] == [999]
+
+    def test_resumo_ids_invalidos(self, client):
+        assert client.get('/treinamentos/agendados/resumo?ids=1,abc').status_code == 400
+
+    def test_agendados_com_resumo(self, client, turmas):
+        """O resumo na listagem cabe no orçamento de 2 instruções (sem N+1)."""
+        response = client.get('/treinamentos/agendados?incluir=resumo')
+        assert [t['resumo']['total_inscritos'] for t in response.json] == [3, 0]
+        assert 'ETag' not in response.headers
@@ -0,0 +1,80 @@
+import json
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from app import create_app
+from app.models.turmas import Turma
+from app.models.alunos import Aluno
+from app.utils.serializacao import ProvedorJSON, ProvedorJSONRapido, orjson
+
+
+@pytest.fixture
+def dados(fabrica):
+    treinamento = fabrica.treinamento(nome_treinamento="Segurança", instrutor_sugerido="João Silva")
+    turmas = [fabrica.turma(treinamento, data_inicio=date(2099, 1, dia), local="Sala 1",
+                            limite_vagas=10 if dia == 5 else None)
+              for dia in (10, 5)]
+    fabrica.aluno(turmas[0], nome="Ana", email="ana@email.com", pago=True)
+    fabrica.aluno(turmas[1], nome="Élio", email="elio@email.com")
+    return turmas[0].id
+
+
+def _com_provedor(app, provedor):
+    app.json = provedor(app)
+    return app.test_client()
+
+
+class TestProvedorJSON:
+    """Testes dos providers JSON (biblioteca padrão e orjson)."""
+
+    def test_datas_em_iso(self, app):
+        with app.test_request_context():
+            corpo = app.json.response({"dia": date(2099, 1, 10),
+                                       "quando": datetime(2099, 1, 10, 8, 30),
+                                       "valor": Decimal("10.50")}).get_data(as_text=True)
+        assert json.loads(corpo) == {"dia": "2099-01-10", "quando": "2099-01-10T08:30:00",
+                                     "valor": "10.50"}
+
+    def test_json_rapido_desligado(self, monkeypatch):
+        monkeypatch.setenv('DATABASE_URL', 'sqlite:///:memory:')
+        monkeypatch.setenv('JSON_RAPIDO', 'false')
+        assert type(create_app().json) is ProvedorJSON
+
+    @pytest.mark.skipif(orjson is None, reason="orjson não instalado")
+    def test_orjson_registrado_por_padrao(self, app):
+        assert isinstance(app.json, ProvedorJSONRapido)
+        assert app.json.loads('{"a": [1, 2]}') == {"a": [1, 2]}
+
+    @pytest.mark.skipif(orjson is None, reason="orjson não instalado")
+    @pytest.mark.parametrize('url', [
+        '/treinamentos/agendados',
+        '/treinamentos/agendados?fields=id,data_inicio,treinamento_info&incluir=resumo',
+        '/alunos/',
+        '/alunos/?turma_id=1&fields=nome,pago',
+    ])
+    def test_mesma_resposta_nos_dois_providers(self, app, dados, url):
+        padrao = _com_provedor(app, ProvedorJSON).get(url)
+        rapido = _com_provedor(app, ProvedorJSONRapido).get(url)
+        assert rapido.status_code == padrao.status_code == 200
+        assert rapido.json == padrao.json
+
+    @pytest.mark.skipif(orjson is None, reason="orjson não instalado")
+    def test_ndjson_sem_escapar_acentos(self, app, dados):
+        response = _com_provedor(app, ProvedorJSONRapido).get(
+            '/alunos/', headers={'Accept': 'application/x-ndjson'})
+        assert '"nome":"Élio"' in response.get_data(as_text=True)
+
+
+class TestListasPorLinhas:
+    """As listas montadas das linhas do SELECT seguem o formato do to_dict()."""
+
+    def test_agendados_igual_ao_to_dict(self, client, dados):
+        response = client.get('/treinamentos/agendados')
+        esperado = [turma.to_dict() for turma in
+                    Turma.query.order_by(Turma.data_inicio, Turma.id)]
+        assert response.json == esperado
+        assert response.json[0]['data_inicio'] == "2099-01-05"
+
+    def test_alunos_igual_ao_to_dict(self, client, dados):
+        response = client.get('/alunos/')
+        assert response.json == [aluno.to_dict() for aluno in Aluno.query.order_by(Aluno.id)]
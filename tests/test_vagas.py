@@ -0,0 +1,94 @@
+import json
+import pytest
+from app import db
+from app.models.turmas import Turma
+from app.models.alunos import Aluno
+
+
+@pytest.fixture
+def turma_id(fabrica):
+    """Cria uma turma com limite de duas vagas."""
+    return fabrica.turma(limite_vagas=2).id
+
+
+def inscrever(client, turma_id, email):
+    return client.post('/alunos/', data=json.dumps({"nome": "Aluno", "email": email, "turma_id": turma_id}),
+                       content_type='application/json')
+
+
+class TestVagas:
+    """Testes do controle de vagas das turmas."""
+
+    def test_turma_lotada(self, client, turma_id):
+        assert inscrever(client, turma_id, "a@email.com").status_code == 201
+        assert inscrever(client, turma_id, "b@email.com").status_code == 201
+
+        response = inscrever(client, turma_id, "c@email.com")
+        assert response.status_code == 409
+        assert "limite de vagas" in response.json['erro']
+        assert db.session.get(Turma, turma_id).vagas_ocupadas == 2
+
+    def test_turma_inexistente(self, client):
+        response = inscrever(client, 999, "a@email.com")
+        assert response.status_code == 404
+
+    def test_email_duplicado_nao_ocupa_vaga(self, client, turma_id):
+        inscrever(client, turma_id, "a@email.com")
+        assert inscrever(client, turma_id, "a@email.com").status_code == 409
+        assert db.session.get(Turma, turma_id).vagas_ocupadas == 1
+
+    def test_remover_aluno_libera_vaga(self, client, turma_id):
+        inscrever(client, turma_id, "a@email.com")
+        aluno_id = inscrever(client, turma_id, "b@email.com").json['id']
+        client.delete(f'/alunos/{aluno_id}')
+        assert inscrever(client, turma_id, "c@email.com").status_code == 201
+
+    def test_lote_respeita_vagas(self, client, turma_id):
+        corpo = "nome,email,turma_id\n" + "".join(
+            f"Aluno {i},a{i}@email.com,{turma_id}\n" for i in range(4))
+        response = client.post('/alunos/bulk', data=corpo, content_type='text/csv')
+
+        assert response.json['inseridos'] == 2
+        assert [e['erro'] for e in response.json['erros']] == [
+            "A turma não tem mais vagas disponíveis."] * 2
+        assert db.session.get(Turma, turma_id).vagas_ocupadas == 2
+        assert Aluno.query.count() == 2
+
+    def test_sem_limite(self, client, turma_id):
+        turma = db.session.get(Turma, turma_id)
+        turma.limite_vagas = None
+        db.session.commit()
+        for i in range(5):
+            assert inscrever(client, turma_id, f"a{i}@email.com").status_code == 201
+        assert db.session.get(Turma, turma_id).vagas_ocupadas == 5
+
+    @pytest.mark.parametrize('limite', ["10", -1, 2.5, True])
+    def test_limite_invalido(self, client, turma_id, limite):
+        response = client.put(f'/treinamentos/agendados/{turma_id}', json={"limite_vagas": limite})
+        assert response.status_code == 400
+        assert "'limite_vagas'" in response.json['erro']
+
+        response = client.post('/treinamentos/agendados', json={
+            "treinamento_id": 1, "data_inicio": "2099-02-01", "limite_vagas": limite})
+        assert response.status_code == 400
+        assert Turma.query.count() == 1
+
+    def test_limite_abaixo_das_vagas_ocupadas(self, client, turma_id):
+        inscrever(client, turma_id, "a@email.com")
+        inscrever(client, turma_id, "b@email.com")
+
+        response = client.put(f'/treinamentos/agendados/{turma_id}',
+                              json={"limite_vagas": 1, "local": "Sala 9"})
+        assert response.status_code == 409
+        assert response.json['conflito'] == "limite_abaixo_das_vagas_ocupadas"
+        assert response.json['vagas_ocupadas'] == 2
+        turma = db.session.get(Turma, turma_id)
+        assert (turma.limite_vagas, turma.local) == (2, None)
+
+        response = client.put(f'/treinamentos/agendados/{turma_id}', json={"limite_vagas": 3})
+        assert response.status_code == 200
+        assert response.json['limite_vagas'] == 3
+
+        response = client.put(f'/treinamentos/agendados/{turma_id}', json={"limite_vagas": None})
+        assert response.status_code == 200
+        assert response.json['limite_vagas'] is None